@@ -5,13 +5,30 @@ import matplotlib.pyplot as plt
 from colorama import init, Fore, Style
 from tabulate import tabulate
 
+# Perfilador y constructor de filtros comunes en la raíz del repositorio: ejecutar con PYTHONPATH=..
+from Problema_2_3 import iniciar
+from Problema_7_2 import ConstructorConsultas
+
 # Inicializar colorama
 init(autoreset=True)
 
+# Perfilado opcional: PERFILAR=1 o --profile (incluye el tiempo de dibujar tablas)
+perfil = iniciar("parcial_1")
+tabulate = perfil.cronometrar("render")(tabulate)
+
 
 class BaseDatos:
+    # Lista blanca de columnas para búsquedas en articulos
+    FILTROS = ConstructorConsultas("articulos", columnas_texto=("nombre", "categoria", "descripcion"),
+                                   columnas_rango=("id", "cantidad", "precio_unitario", "fecha"),
+                                   orden="categoria, nombre")
+    # Totales corrientes: (tabla, monto de cada fila, columna acumulada, columna de conteo)
+    TOTALES = (("articulos", "{f}.cantidad * {f}.precio_unitario", "presupuesto", "articulos"),
+               ("gastos", "{f}.monto", "gastado", "gastos"))
+    MES = "COALESCE(strftime('%Y-%m', {f}fecha), 'sin fecha')"
+
     def __init__(self, nombre_db="presupuesto.db"):
-        self.conn = sqlite3.connect(nombre_db)
+        self.conn = perfil.conectar_sqlite(nombre_db)
         self.cursor = self.conn.cursor()
         self._crear_tablas()
 
@@ -75,8 +92,89 @@ class BaseDatos:
                                 CURRENT_TIMESTAMP
                             )
                             ''')
+        # Índices NOCASE: permiten que LIKE 'x%' e igualdad usen índice en lugar de recorrer la tabla
+        for columna in ("nombre", "categoria"):
+            self.cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_articulos_{columna} ON articulos ({columna} COLLATE NOCASE)')
+
+        # Libro de totales: una fila con el saldo global y una por (mes, categoría).
+        # Los triggers los ajustan en la misma transacción que cada INSERT/UPDATE/DELETE,
+        # así el reporte lee unas pocas filas en vez de sumar las tablas completas.
+        self.cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS balance
+                            (
+                                id          INTEGER PRIMARY KEY CHECK (id = 1),
+                                presupuesto REAL    NOT NULL DEFAULT 0,
+                                gastado     REAL    NOT NULL DEFAULT 0,
+                                articulos   INTEGER NOT NULL DEFAULT 0,
+                                gastos      INTEGER NOT NULL DEFAULT 0
+                            )
+                            ''')
+        self.cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS resumen_mensual
+                            (
+                                mes         TEXT    NOT NULL,
+                                categoria   TEXT    NOT NULL COLLATE NOCASE,
+                                presupuesto REAL    NOT NULL DEFAULT 0,
+                                gastado     REAL    NOT NULL DEFAULT 0,
+                                articulos   INTEGER NOT NULL DEFAULT 0,
+                                gastos      INTEGER NOT NULL DEFAULT 0,
+                                PRIMARY KEY (mes, categoria)
+                            )
+                            ''')
+        for tabla, monto, columna, conteo in self.TOTALES:
+            for evento, filas in (("INSERT", ("NEW",)), ("DELETE", ("OLD",)), ("UPDATE", ("OLD", "NEW"))):
+                cuerpo = "".join(self._ajuste(fila, monto, columna, conteo) for fila in filas)
+                self.cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS trg_{tabla}_{evento.lower()} AFTER {evento} ON {tabla} BEGIN {cuerpo} END')
         self.conn.commit()
 
+        # Bases creadas antes del libro de totales: se calcula una vez a partir de los datos
+        if not self.cursor.execute('SELECT 1 FROM balance').fetchone():
+            self.reconstruir_totales()
+
+    def _ajuste(self, fila, monto, columna, conteo):
+        """SQL del trigger que suma (NEW) o resta (OLD) una fila al saldo y a su mes/categoría."""
+        signo = "-" if fila == "OLD" else "+"
+        monto = monto.format(f=fila)
+        mes = self.MES.format(f=f"{fila}.")
+        sql = f'''
+            INSERT INTO resumen_mensual (mes, categoria, {columna}, {conteo})
+            VALUES ({mes}, {fila}.categoria, {signo}({monto}), {signo}1)
+            ON CONFLICT (mes, categoria) DO UPDATE
+                SET {columna} = {columna} + excluded.{columna}, {conteo} = {conteo} + excluded.{conteo};
+            UPDATE balance SET {columna} = {columna} {signo} ({monto}), {conteo} = {conteo} {signo} 1 WHERE id = 1;'''
+        if fila == "OLD":
+            sql += f'''
+            DELETE FROM resumen_mensual
+            WHERE mes = {mes} AND categoria = {fila}.categoria AND articulos = 0 AND gastos = 0;'''
+        return sql
+
+    def reconstruir_totales(self):
+        """Recalcula balance y resumen_mensual desde las tablas (migración o para descartar redondeos acumulados)."""
+        mes = self.MES.format(f="")
+        try:
+            self.cursor.execute('DELETE FROM resumen_mensual')
+            self.cursor.execute('''
+                INSERT OR REPLACE INTO balance (id, presupuesto, gastado, articulos, gastos)
+                SELECT 1,
+                       (SELECT COALESCE(SUM(cantidad * precio_unitario), 0) FROM articulos),
+                       (SELECT COALESCE(SUM(monto), 0) FROM gastos),
+                       (SELECT COUNT(*) FROM articulos),
+                       (SELECT COUNT(*) FROM gastos)''')
+            self.cursor.execute(f'''
+                INSERT INTO resumen_mensual (mes, categoria, presupuesto, gastado, articulos, gastos)
+                SELECT mes, categoria, SUM(presupuesto), SUM(gastado), SUM(articulos), SUM(gastos)
+                FROM (SELECT {mes} AS mes, categoria, cantidad * precio_unitario AS presupuesto,
+                             0 AS gastado, 1 AS articulos, 0 AS gastos FROM articulos
+                      UNION ALL
+                      SELECT {mes}, categoria, 0, monto, 0, 1 FROM gastos)
+                GROUP BY mes, categoria COLLATE NOCASE''')
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
     def ejecutar(self, query, params=None):
         """Método genérico para ejecutar queries"""
         try:
@@ -97,9 +195,19 @@ class BaseDatos:
             (nombre, categoria, cantidad, precio, descripcion)
         )
 
-    def obtener_articulos(self, filtro=None, valor=None):
+    def construir_consulta(self, filtros):
+        """
+        Compila [(columna, operador, valor), ...] a (sql, params) con Problema_7_2:
+        igual, prefijo (usa índice), contiene, desde, hasta; ValueError fuera de la lista blanca.
+        """
+        return self.FILTROS.compilar(filtros)
+
+    def obtener_articulos(self, filtro=None, valor=None, modo="contiene", filtros=None):
+        filtros = list(filtros or [])
         if filtro and valor:
-            return self.ejecutar(f'SELECT * FROM articulos WHERE {filtro} LIKE ?', (f'%{valor}%',))
+            filtros.insert(0, (filtro, modo, valor))
+        if filtros:
+            return self.ejecutar(*self.construir_consulta(filtros))
         return self.ejecutar('SELECT * FROM articulos ORDER BY categoria, nombre')
 
     def actualizar_articulo(self, id_articulo, nombre, categoria, cantidad, precio, descripcion):
@@ -122,6 +230,51 @@ class BaseDatos:
             return self.ejecutar('SELECT * FROM gastos WHERE categoria=? ORDER BY fecha DESC', (categoria,))
         return self.ejecutar('SELECT * FROM gastos ORDER BY fecha DESC')
 
+    def balance(self):
+        """Saldo global leído del libro de totales (una fila, sin recorrer articulos ni gastos)."""
+        presupuesto, gastado, articulos, gastos = self.ejecutar(
+            'SELECT presupuesto, gastado, articulos, gastos FROM balance WHERE id = 1')[0]
+        return {"presupuesto": round(presupuesto, 2), "gastado": round(gastado, 2),
+                "balance": round(presupuesto - gastado, 2), "articulos": articulos, "gastos": gastos}
+
+    @staticmethod
+    def _mes_anterior(mes):
+        """'2025-01' -> '2024-12': el mes calendario anterior, no la fila anterior."""
+        anio, numero = map(int, mes.split("-"))
+        return f"{anio - (numero == 1)}-{(numero - 2) % 12 + 1:02d}"
+
+    def tendencia_mensual(self, meses=12):
+        """
+        Últimos `meses` meses con presupuesto, gasto, balance y variación del gasto
+        contra el mes calendario anterior (None si ese mes no tiene movimientos).
+        """
+        filas = self.ejecutar(
+            "SELECT mes, SUM(presupuesto), SUM(gastado) FROM resumen_mensual "
+            "WHERE mes != 'sin fecha' GROUP BY mes ORDER BY mes DESC LIMIT ?", (meses,))
+        filas.reverse()
+        previos = sorted({self._mes_anterior(mes) for mes, _, _ in filas})
+        gasto_previo = dict(self.ejecutar(
+            f"SELECT mes, SUM(gastado) FROM resumen_mensual WHERE mes IN ({', '.join('?' * len(previos))}) "
+            f"GROUP BY mes", previos)) if previos else {}
+        tendencia = []
+        for mes, presupuesto, gastado in filas:
+            anterior = gasto_previo.get(self._mes_anterior(mes))
+            tendencia.append({"mes": mes, "presupuesto": round(presupuesto, 2), "gastado": round(gastado, 2),
+                              "balance": round(presupuesto - gastado, 2),
+                              "variacion_gasto": round((gastado - anterior) / anterior * 100, 1) if anterior else None})
+        return tendencia
+
+    def presupuesto_vs_gasto(self, mes=None):
+        """Por categoría: presupuesto (artículos) contra gasto real, total o de un mes 'AAAA-MM'."""
+        filtro, params = ('WHERE mes = ?', (mes,)) if mes else ('', None)
+        filas = self.ejecutar(
+            f'SELECT categoria, SUM(presupuesto), SUM(gastado) FROM resumen_mensual {filtro} '
+            f'GROUP BY categoria ORDER BY categoria', params)
+        return [{"categoria": categoria, "presupuesto": round(presupuesto, 2), "gastado": round(gastado, 2),
+                 "disponible": round(presupuesto - gastado, 2),
+                 "porcentaje": round(gastado / presupuesto * 100, 1) if presupuesto else None}
+                for categoria, presupuesto, gastado in filas]
+
     def cerrar(self):
         if hasattr(self, 'conn'):
             self.conn.close()
@@ -185,8 +338,9 @@ class GestorPresupuesto:
 
         opcion = self.input_validado("Buscar por: 1)Nombre 2)Categoría: ", lambda x: x in opciones)
         valor = self.input_validado("Valor a buscar: ")
+        desde_inicio = input(f"{Fore.WHITE}¿Coincidir desde el inicio? (s/n): ").lower() == 's'
 
-        resultados = self.db.obtener_articulos(opciones[opcion], valor)
+        resultados = self.db.obtener_articulos(opciones[opcion], valor, "prefijo" if desde_inicio else "contiene")
         self._mostrar_articulos(resultados, f"Búsqueda por {opciones[opcion]}")
 
     def editar_articulo(self):
@@ -307,17 +461,12 @@ class GestorPresupuesto:
         print(f"\n{Fore.GREEN}{Style.BRIGHT}TOTAL GASTOS: ${total:.2f}")
 
     def visualizar_gastos(self):
-        gastos = self.db.obtener_gastos()
-        if not gastos:
+        # Gasto por categoría sale del libro de totales, no de recorrer todos los gastos
+        categorias = {c["categoria"]: c["gastado"] for c in self.db.presupuesto_vs_gasto() if c["gastado"]}
+        if not categorias:
             print(f"{Fore.YELLOW}No hay gastos para visualizar")
             return
 
-        # Agrupar por categoría
-        categorias = {}
-        for gasto in gastos:
-            cat = gasto[3]
-            categorias[cat] = categorias.get(cat, 0) + gasto[2]
-
         # Crear gráfico
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
 
@@ -339,16 +488,14 @@ class GestorPresupuesto:
     def reporte_completo(self):
         print(f"\n{Fore.CYAN}{Style.BRIGHT}--- REPORTE COMPLETO ---")
 
-        articulos = self.db.obtener_articulos()
-        gastos = self.db.obtener_gastos()
-
-        # Estadísticas generales
-        total_presupuesto = sum(a[3] * a[4] for a in articulos) if articulos else 0
-        total_gastos = sum(g[2] for g in gastos) if gastos else 0
-        balance = total_presupuesto - total_gastos
+        # Estadísticas generales: lectura directa de los totales corrientes
+        resumen = self.db.balance()
+        total_presupuesto = resumen["presupuesto"]
+        total_gastos = resumen["gastado"]
+        balance = resumen["balance"]
 
         print(f"\n{Fore.CYAN}📊 RESUMEN GENERAL:")
-        print(f"Artículos registrados: {len(articulos)}")
+        print(f"Artículos registrados: {resumen['articulos']}")
         print(f"Presupuesto total: ${total_presupuesto:.2f}")
         print(f"Gastos totales: ${total_gastos:.2f}")
         print(f"Balance: ${balance:.2f}")
@@ -360,6 +507,21 @@ class GestorPresupuesto:
         else:
             print(f"{Fore.YELLOW}⚖️ Presupuesto equilibrado")
 
+        tendencia = self.db.tendencia_mensual(6)
+        if tendencia:
+            print(f"\n{Fore.CYAN}📈 TENDENCIA MENSUAL:")
+            datos = [[t["mes"], f"${t['presupuesto']:.2f}", f"${t['gastado']:.2f}", f"${t['balance']:.2f}",
+                      f"{t['variacion_gasto']:+.1f}%" if t["variacion_gasto"] is not None else "-"] for t in tendencia]
+            print(tabulate(datos, headers=["Mes", "Presupuesto", "Gastado", "Balance", "Δ gasto"], tablefmt="fancy_grid"))
+
+        categorias = self.db.presupuesto_vs_gasto()
+        if categorias:
+            print(f"\n{Fore.CYAN}🏷 PRESUPUESTO VS. GASTO POR CATEGORÍA:")
+            datos = [[c["categoria"], f"${c['presupuesto']:.2f}", f"${c['gastado']:.2f}", f"${c['disponible']:.2f}",
+                      f"{c['porcentaje']:.0f}%" if c["porcentaje"] is not None else "-"] for c in categorias]
+            print(tabulate(datos, headers=["Categoría", "Presupuesto", "Gastado", "Disponible", "Usado"],
+                           tablefmt="fancy_grid"))
+
     def ejecutar(self):
         opciones = {
             "1": self.registrar_articulo, "2": self.buscar_articulos, "3": self.editar_articulo,
@@ -367,6 +529,7 @@ class GestorPresupuesto:
             "7": self.registrar_gasto, "8": self.ver_gastos, "9": self.visualizar_gastos,
             "10": self.reporte_completo, "11": self._salir
         }
+        opciones = {clave: perfil.cronometrar("accion")(accion) for clave, accion in opciones.items()}
 
         print(f"{Fore.CYAN}{Style.BRIGHT}¡Bienvenido al Sistema de Presupuesto!")
 
@@ -1,9 +1,53 @@
 from dataclasses import dataclass
 
-@dataclass
+FIELDS = ("title", "author", "genre", "read")
+_FIELDS_SET = frozenset(FIELDS)
+
+
+@dataclass(slots=True)
 class Book:
+    # slots=True: sin __dict__ por instancia, menos memoria y acceso a atributos más rápido
     id: int
     title: str
     author: str
     genre: str
-    read: bool
\ No newline at end of file
+    read: bool = False
+
+    @classmethod
+    def from_row(cls, row):
+        """Camino rápido desde una fila (id, title, author, genre, read) ya validada por la base."""
+        return cls(row[0], row[1], row[2], row[3], bool(row[4]))
+
+    @classmethod
+    def from_dict(cls, data, book_id=0):
+        """Libro nuevo desde datos del cliente; lanza ValueError si faltan campos o tienen mal tipo."""
+        if not isinstance(data, dict):
+            raise ValueError("Invalid data")
+        faltantes = [c for c in ("title", "author", "genre") if c not in data]
+        if faltantes:
+            raise ValueError(f"Missing fields: {', '.join(faltantes)}")
+        title, author, genre, read = data["title"], data["author"], data["genre"], data.get("read", False)
+        # Camino rápido para el caso normal: tipos exactos y ninguna clave extra
+        if not (type(title) is str and type(author) is str and type(genre) is str and type(read) is bool
+                and title.strip() and author.strip() and genre.strip() and data.keys() <= _FIELDS_SET):
+            validate_changes(data)  # lanza ValueError con el motivo concreto
+        return cls(book_id, title, author, genre, read)
+
+    def to_dict(self):
+        return {"id": self.id, "title": self.title, "author": self.author, "genre": self.genre, "read": self.read}
+
+
+def validate_changes(data):
+    """
+    Devuelve solo los cambios válidos. Lanza ValueError con claves desconocidas
+    (incluido "id", que nunca se modifica) o con valores del tipo equivocado.
+    """
+    if not data.keys() <= _FIELDS_SET:
+        desconocidas = set(data) - _FIELDS_SET
+        raise ValueError(f"Unknown fields: {', '.join(sorted(map(str, desconocidas)))}")
+    for campo in ("title", "author", "genre"):
+        if campo in data and (not isinstance(data[campo], str) or not data[campo].strip()):
+            raise ValueError(f"'{campo}' must be a non-empty string")
+    if "read" in data and not isinstance(data["read"], bool):
+        raise ValueError("'read' must be a boolean")
+    return data
@@ -1,31 +1,182 @@
-books_db = []
-next_id = 1
+import os
+import sqlite3
+import threading
 
-def add_book(book_data):
-    global next_id
-    book = {
-        "id": next_id,
-        "title": book_data["title"],
-        "author": book_data["author"],
-        "genre": book_data["genre"],
-        "read": book_data.get("read", False)
-    }
-    books_db.append(book)
-    next_id += 1
+try:
+    from models import Book, FIELDS, validate_changes
+except ImportError:  # cargado fuera de la carpeta (Problema_2_1): el archivo real de models
+    from Problema_10 import Book, FIELDS, validate_changes
+
+# Almacén durable: SQLite en modo WAL, compartido por todos los workers/hilos.
+# Los ids los asigna SQLite (AUTOINCREMENT) dentro de la transacción de la
+# inserción, así dos procesos nunca reciben el mismo id ni se reutiliza uno borrado.
+DB_PATH = os.getenv("BOOKS_DB", "books.db")
+# NORMAL: sobrevive a la caída del proceso; FULL: también a un corte de energía
+SYNCHRONOUS = os.getenv("BOOKS_DB_SYNC", "NORMAL").upper()
+COLUMNAS = "id, title, author, genre, read"
+
+_local = threading.local()
+
+
+def _conectar(path=None):
+    path = path or DB_PATH
+    # "file:...?mode=memory&cache=shared" permite una base en memoria compartida (pruebas)
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False,
+                           uri=path.startswith("file:"))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+    conn.execute("PRAGMA busy_timeout = 10000")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            genre TEXT NOT NULL,
+            read INTEGER NOT NULL DEFAULT 0
+        )""")
+    return conn
+
+
+def get_conn():
+    """Una conexión por hilo (sqlite3 no comparte conexiones entre hilos de forma segura)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        close_conn()
+        conn = _local.conn = _conectar()
+        _local.path = DB_PATH
+    return conn
+
+
+def close_conn():
+    """Cierra la conexión de este hilo (antes de crear procesos o de cambiar de base)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+    _local.conn = _local.path = None
+
+
+def _book(fila):
+    return Book.from_row(fila) if fila else None
+
+
+def _leer(conn, book_id):
+    return _book(conn.execute(f"SELECT {COLUMNAS} FROM books WHERE id = ?", (book_id,)).fetchone())
+
+
+class _transaccion:
+    """BEGIN IMMEDIATE ... COMMIT: toma el bloqueo de escritura al inicio, sin carreras."""
+
+    def __enter__(self):
+        self.conn = get_conn()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, tipo, *exc):
+        self.conn.execute("ROLLBACK" if tipo else "COMMIT")
+
+
+def _insertar(conn, book_data):
+    """Acepta un Book (ya validado) o un dict del cliente (se valida); devuelve el Book con su id."""
+    book = book_data if isinstance(book_data, Book) else Book.from_dict(book_data)
+    book.id = conn.execute("INSERT INTO books (title, author, genre, read) VALUES (?, ?, ?, ?)",
+                           (book.title, book.author, book.genre, int(book.read))).lastrowid
     return book
 
+
+def _actualizar(conn, book_id, data):
+    cambios = validate_changes(data)
+    if cambios:
+        asignaciones = ", ".join(f"{k} = ?" for k in cambios)
+        conn.execute(f"UPDATE books SET {asignaciones} WHERE id = ?", (*cambios.values(), book_id))
+    return _leer(conn, book_id)
+
+
+def add_book(book_data):
+    """Lanza ValueError si los datos no forman un libro válido."""
+    with _transaccion() as conn:
+        return _insertar(conn, book_data)
+
+
+def add_books(items):
+    """Inserta muchos libros en una sola transacción (un solo fsync)."""
+    with _transaccion() as conn:
+        return [_insertar(conn, book_data) for book_data in items]
+
+
 def get_book(book_id):
-    return next((b for b in books_db if b["id"] == book_id), None)
+    return _leer(get_conn(), book_id)
+
+
+def list_books():
+    return [Book.from_row(f) for f in get_conn().execute(f"SELECT {COLUMNAS} FROM books ORDER BY id")]
+
+
+def iter_books(fields=None, lote=1000):
+    """
+    Recorre los libros por id sin cargarlos todos: lee de a `lote` filas.
+    Sin fields devuelve objetos Book; con fields, dicts solo con esas columnas.
+    """
+    columnas = None if not fields else [c for c in fields if c == "id" or c in FIELDS]
+    if columnas == []:
+        raise ValueError("Ningún campo válido en fields")
+    cursor = get_conn().execute(f"SELECT {', '.join(columnas) if columnas else COLUMNAS} FROM books ORDER BY id")
+    convertir_read = columnas is not None and "read" in columnas
+    while True:
+        filas = cursor.fetchmany(lote)
+        if not filas:
+            break
+        if columnas is None:
+            yield from map(Book.from_row, filas)
+            continue
+        for fila in filas:
+            book = dict(zip(columnas, fila))
+            if convertir_read:
+                book["read"] = bool(book["read"])
+            yield book
+
 
 def update_book(book_id, data):
-    book = get_book(book_id)
-    if book:
-        book.update(data)
-    return book
+    """Lanza ValueError con claves desconocidas (incluido "id") o valores inválidos."""
+    with _transaccion() as conn:
+        return _actualizar(conn, book_id, data or {})
+
 
 def delete_book(book_id):
-    global books_db
-    book = get_book(book_id)
-    if book:
-        books_db = [b for b in books_db if b["id"] != book_id]
+    with _transaccion() as conn:
+        book = _leer(conn, book_id)
+        if book:
+            conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
     return book
+
+
+def update_books(items):
+    """
+    Aplica muchos cambios en una sola transacción. items: dicts con "id" y los campos a cambiar.
+    Devuelve, en el mismo orden, el libro actualizado o None si no existía.
+    Un item inválido lanza ValueError y deshace todo el lote.
+    """
+    with _transaccion() as conn:
+        return [_actualizar(conn, data["id"], {k: v for k, v in data.items() if k != "id"}) for data in items]
+
+
+def delete_books(ids):
+    """Borra muchos libros en una sola transacción; devuelve el libro borrado o None por id."""
+    resultados = []
+    with _transaccion() as conn:
+        for book_id in ids:
+            book = _leer(conn, book_id)
+            if book:
+                conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+            resultados.append(book)
+    return resultados
+
+
+def clear_books():
+    """Borra todos los libros (pruebas y benchmarks); los ids siguen sin reutilizarse."""
+    with _transaccion() as conn:
+        conn.execute("DELETE FROM books")
+
+
+def checkpoint():
+    """Vuelca el WAL a la base principal (lo hace SQLite solo cada ~1000 páginas)."""
+    get_conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
@@ -1,35 +1,250 @@
-from flask import Flask, jsonify, request
-from db import add_book, get_book, update_book, delete_book
+import json
+from itertools import chain
+from flask import Flask, Response, jsonify, request, stream_with_context
+from db import add_book, get_book, update_book, delete_book, add_books, update_books, delete_books
+from models import Book, validate_changes
+import db
 
 app = Flask(__name__)
 
+try:
+    import orjson
+except ImportError:  # sin orjson se usa json de la biblioteca estándar
+    orjson = None
+
+NDJSON = "application/x-ndjson"
+LOTE = 1000  # items por transacción en las operaciones en lote
+
+
+class _LineaInvalida:
+    """Línea NDJSON que no es JSON; se responde con su número de línea."""
+    __slots__ = ("linea",)
+
+    def __init__(self, linea):
+        self.linea = linea
+
+
+def _es_id(valor):
+    # bool es subclase de int: true/false no son ids
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def _a_dict(obj):
+    if isinstance(obj, Book):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} no es serializable")
+
+
+def _dumps(obj):
+    """bytes JSON; orjson serializa varias veces más rápido que json.dumps."""
+    if isinstance(obj, Book):
+        obj = obj.to_dict()  # orjson con un dict es ~2x más rápido que con el dataclass
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_a_dict).encode("utf-8")
+
+
+def _arreglo_json(items):
+    """Genera un arreglo JSON por partes: '[', items separados por ',', ']'."""
+    yield b"["
+    for i, item in enumerate(items):
+        yield b"," + _dumps(item) if i else _dumps(item)
+    yield b"]"
+
+
+def _en_trozos(partes, tamano=64 * 1024):
+    """Agrupa piezas pequeñas en trozos de ~64 KB: menos escrituras al socket."""
+    buffer, largo = [], 0
+    for parte in partes:
+        buffer.append(parte)
+        largo += len(parte)
+        if largo >= tamano:
+            yield b"".join(buffer)
+            buffer, largo = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+# ---------- Lotes: entrada, proceso por tramos y respuesta ----------
+
+def _lineas_ndjson(stream):
+    """Lee el cuerpo línea a línea, sin cargarlo completo en memoria."""
+    for numero, linea in enumerate(stream, 1):
+        linea = linea.strip()
+        if linea:
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                yield _LineaInvalida(numero)
+
+
+def _items_entrada():
+    """Arreglo JSON en el cuerpo o, con Content-Type application/x-ndjson, un item por línea."""
+    if request.mimetype == NDJSON:
+        return _lineas_ndjson(request.stream)
+    data = request.get_json(silent=True)
+    return iter(data) if isinstance(data, list) else None
+
+
+def _en_lotes(items):
+    lote = []
+    for item in items:
+        lote.append(item)
+        if len(lote) == LOTE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _procesar(items, operacion):
+    """Aplica `operacion` por tramos de LOTE items (una transacción cada uno) y numera los resultados."""
+    indice = 0
+    for lote in _en_lotes(items):
+        # Las líneas ilegibles no llegan a la operación; su error ocupa su lugar en el orden
+        validos = operacion([item for item in lote if not isinstance(item, _LineaInvalida)])
+        for item in lote:
+            if isinstance(item, _LineaInvalida):
+                resultado = {"status": 400, "id": None, "line": item.linea, "error": "Invalid JSON"}
+            else:
+                resultado = next(validos)
+            yield {"index": indice, **resultado}
+            indice += 1
+
+
+def _responder(resultados):
+    """NDJSON en streaming si el cliente lo pide o lo envió; si no, un solo JSON con el resumen."""
+    if request.mimetype == NDJSON or NDJSON in request.headers.get("Accept", ""):
+        lineas = (_dumps(r) + b"\n" for r in resultados)
+        return Response(stream_with_context(lineas), mimetype=NDJSON)
+    resultados = list(resultados)
+    correctos = sum(1 for r in resultados if r["status"] < 300)
+    cuerpo = {"results": resultados, "succeeded": correctos, "failed": len(resultados) - correctos}
+    return Response(_dumps(cuerpo), mimetype="application/json"), 200
+
+
+def _libro_o_error(data):
+    """(Book, None) si los datos son válidos; (None, mensaje) si no."""
+    try:
+        return Book.from_dict(data), None
+    except ValueError as e:
+        return None, str(e)
+
+
+def _error_cambio(data):
+    if not isinstance(data, dict) or not _es_id(data.get("id")):
+        return "Invalid data"
+    try:
+        validate_changes({k: v for k, v in data.items() if k != "id"})
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def _crear_lote(lote):
+    validados = [_libro_o_error(data) for data in lote]
+    creados = iter(add_books(book for book, error in validados if book))
+    for book, error in validados:
+        if book:
+            yield {"status": 201, "book": next(creados)}
+        else:
+            yield {"status": 400, "error": error}
+
+
+def _actualizar_lote(lote):
+    errores = [_error_cambio(data) for data in lote]
+    actualizados = iter(update_books(d for d, error in zip(lote, errores) if not error))
+    for data, error in zip(lote, errores):
+        if error:
+            yield {"status": 400, "error": error}
+            continue
+        book = next(actualizados)
+        yield {"status": 200, "book": book} if book else {"status": 404, "id": data["id"], "error": "Book not found"}
+
+
+def _borrar_lote(lote):
+    ids = [i for i in lote if _es_id(i)]
+    borrados = iter(delete_books(ids))
+    for book_id in lote:
+        if not _es_id(book_id):
+            yield {"status": 400, "id": book_id, "error": "Invalid id"}
+        elif next(borrados):
+            yield {"status": 200, "id": book_id}
+        else:
+            yield {"status": 404, "id": book_id, "error": "Book not found"}
+
 @app.route("/books", methods=["GET"])
 def list_books():
-    from db import books_db
-    return jsonify(books_db), 200
+    # Respuesta en streaming: el primer byte sale antes de leer toda la tabla y la
+    # memoria no crece con el número de libros. ?fields=id,title limita las columnas;
+    # ?format=ndjson (o Accept: application/x-ndjson) envía un libro por línea.
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()] or None
+    try:
+        libros = db.iter_books(fields)
+        primero = next(libros, None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    libros = chain([primero], libros) if primero is not None else iter(())
+    if request.args.get("format") == "ndjson" or NDJSON in request.headers.get("Accept", ""):
+        partes = (_dumps(b) + b"\n" for b in libros)
+        return Response(stream_with_context(_en_trozos(partes)), mimetype=NDJSON)
+    return Response(stream_with_context(_en_trozos(_arreglo_json(libros))), mimetype="application/json")
+
+@app.route("/books/batch", methods=["POST"])
+def create_books():
+    items = _items_entrada()
+    if items is None:
+        return jsonify({"error": "Expected a JSON array or NDJSON body"}), 400
+    return _responder(_procesar(items, _crear_lote))
+
+
+@app.route("/books/batch", methods=["PATCH"])
+def edit_books():
+    items = _items_entrada()
+    if items is None:
+        return jsonify({"error": "Expected a JSON array or NDJSON body"}), 400
+    return _responder(_procesar(items, _actualizar_lote))
+
+
+@app.route("/books", methods=["DELETE"])
+def remove_books():
+    # ?ids=1,2,3; para listas enormes también se acepta un arreglo JSON o NDJSON de ids en el cuerpo
+    if request.args.get("ids"):
+        ids = (int(i) if i.strip().isdigit() else i for i in request.args["ids"].split(","))
+    else:
+        ids = _items_entrada()
+        if ids is None:
+            return jsonify({"error": "Use ?ids=1,2,3 or send the ids in the body"}), 400
+    return _responder(_procesar(ids, _borrar_lote))
+
 
 @app.route("/books/<int:book_id>", methods=["GET"])
 def get_single_book(book_id):
     book = get_book(book_id)
     if not book:
         return jsonify({"error": "Book not found"}), 404
-    return jsonify(book), 200
+    return jsonify(book.to_dict()), 200
 
 @app.route("/books", methods=["POST"])
 def create_book():
-    data = request.json
-    if not data or "title" not in data or "author" not in data:
-        return jsonify({"error": "Invalid data"}), 400
-    book = add_book(data)
-    return jsonify(book), 201
+    book, error = _libro_o_error(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+    book = add_book(book)
+    return jsonify(book.to_dict()), 201
 
 @app.route("/books/<int:book_id>", methods=["PUT"])
 def edit_book(book_id):
-    data = request.json
-    book = update_book(book_id, data)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid data"}), 400
+    try:
+        book = update_book(book_id, data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     if not book:
         return jsonify({"error": "Book not found"}), 404
-    return jsonify(book), 200
+    return jsonify(book.to_dict()), 200
 
 @app.route("/books/<int:book_id>", methods=["DELETE"])
 def remove_book(book_id):
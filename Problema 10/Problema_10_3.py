@@ -68,5 +68,20 @@ def delete_book(book_id):
         flash("Error al eliminar libro")
     return redirect(url_for("index"))
 
+@app.route("/delete-selected", methods=["POST"])
+def delete_selected():
+    # Una sola llamada a la API para todos los libros marcados
+    ids = request.form.getlist("ids")
+    if not ids:
+        flash("No se seleccionó ningún libro")
+        return redirect(url_for("index"))
+    resp = requests.delete(f"{API_URL}/books", params={"ids": ",".join(ids)})
+    if resp.status_code == 200:
+        resumen = resp.json()
+        flash(f"{resumen['succeeded']} libro(s) eliminado(s), {resumen['failed']} con error")
+    else:
+        flash("Error al eliminar libros")
+    return redirect(url_for("index"))
+
 if __name__ == "__main__":
     app.run(debug=True, port=8000)
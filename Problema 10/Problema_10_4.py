@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import db
+
+LOTE = 10_000
+# spawn: los hijos no heredan conexiones SQLite abiertas (usarlas tras fork() no es seguro)
+_ctx = multiprocessing.get_context("spawn")
+
+
+def _libro(i):
+    return {"title": f"Libro {i}", "author": f"Autor {i % 1000}", "genre": "Prueba", "read": i % 2 == 0}
+
+
+def _usar(ruta):
+    db.DB_PATH = ruta
+
+
+# ---------- Escritura ----------
+
+def escritura_individual(n):
+    inicio = time.perf_counter()
+    for i in range(n):
+        db.add_book(_libro(i))
+    return n / (time.perf_counter() - inicio)
+
+
+def escritura_por_lotes(n):
+    inicio = time.perf_counter()
+    for desde in range(0, n, LOTE):
+        db.add_books(_libro(i) for i in range(desde, min(n, desde + LOTE)))
+    return n / (time.perf_counter() - inicio)
+
+
+# ---------- Recuperación ----------
+
+def _escribir_y_caer(ruta, n):
+    """Escribe n libros y termina sin cerrar ni hacer checkpoint (como un kill -9)."""
+    _usar(ruta)
+    db.get_conn().execute("PRAGMA wal_autocheckpoint = 0")  # todo queda en el WAL
+    for desde in range(0, n, LOTE):
+        db.add_books(_libro(i) for i in range(desde, min(n, desde + LOTE)))
+    os._exit(0)
+
+
+def _abrir_y_contar(ruta, cola):
+    # Conexión nueva en un proceso nuevo: la primera lectura reconstruye el índice del WAL
+    inicio = time.perf_counter()
+    conn = sqlite3.connect(ruta)
+    total, maximo = conn.execute("SELECT count(*), max(id) FROM books").fetchone()
+    ultimo = conn.execute("SELECT id FROM books WHERE id = ?", (maximo,)).fetchone()
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    cola.put((segundos, total, ultimo is not None))
+
+
+def recuperacion(ruta, n_en_wal):
+    db.close_conn()  # si el padre siguiera conectado, el hijo no tendría nada que recuperar
+    proceso = _ctx.Process(target=_escribir_y_caer, args=(ruta, n_en_wal))
+    proceso.start()
+    proceso.join()
+    wal = os.path.getsize(ruta + "-wal") if os.path.exists(ruta + "-wal") else 0
+    cola = _ctx.Queue()
+    proceso = _ctx.Process(target=_abrir_y_contar, args=(ruta, cola))
+    proceso.start()
+    resultado = cola.get()
+    proceso.join()
+    return (*resultado, wal)
+
+
+# ---------- Varios procesos escribiendo ----------
+
+def _escritor(ruta, k):
+    _usar(ruta)
+    for i in range(k):
+        db.add_book(_libro(i))
+
+
+def ids_concurrentes(ruta, procesos, k):
+    db.close_conn()
+    escritores = [_ctx.Process(target=_escritor, args=(ruta, k)) for _ in range(procesos)]
+    for p in escritores:
+        p.start()
+    for p in escritores:
+        p.join()
+    _usar(ruta)
+    total, distintos = db.get_conn().execute("SELECT count(*), count(DISTINCT id) FROM books").fetchone()
+    return total, distintos
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_10_4.py [n_libros]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    carpeta = tempfile.mkdtemp(prefix="books_bench_")
+
+    _usar(os.path.join(carpeta, "individual.db"))
+    print(f"✍️ add_book (una transacción por libro): {escritura_individual(min(n, 20_000)):,.0f} libros/s")
+
+    _usar(os.path.join(carpeta, "lotes.db"))
+    print(f"📦 add_books en lotes de {LOTE}: {escritura_por_lotes(n):,.0f} libros/s ({n:,} libros)")
+
+    # Recuperación: base con n libros ya volcados + un WAL sin checkpoint de n/10 libros
+    db.checkpoint()
+    ruta = os.path.join(carpeta, "lotes.db")
+    segundos, total, ok, wal = recuperacion(ruta, max(1, n // 10))
+    assert ok and total == n + max(1, n // 10), f"recuperados {total} libros"
+    print(f"♻️ Reapertura tras caída con WAL de {wal / 2**20:.1f} MiB: {segundos * 1000:.0f} ms "
+          f"({total:,} libros intactos)")
+
+    ruta = os.path.join(carpeta, "concurrente.db")
+    total, distintos = ids_concurrentes(ruta, procesos=8, k=500)
+    assert total == distintos == 8 * 500, f"{total} filas, {distintos} ids distintos"
+    print(f"🔢 8 procesos x 500 inserciones: {total} libros, ningún id repetido")
+    print(f"📁 Archivos de prueba en {carpeta}")
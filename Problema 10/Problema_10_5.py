@@ -0,0 +1,90 @@
+import http.client
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import db
+
+PUERTO = 8110
+MODOS = {
+    # nombre -> ruta pedida; "jsonify" es la respuesta anterior (lista completa en memoria)
+    "jsonify (anterior)": "/books",
+    "arreglo en streaming": "/books",
+    "ndjson en streaming": "/books?format=ndjson",
+    "streaming ?fields=id,title": "/books?fields=id,title",
+}
+
+
+def _servidor(ruta_db, modo):
+    from flask import Flask, jsonify
+    from werkzeug.serving import make_server
+
+    db.DB_PATH = ruta_db
+    if modo == "jsonify (anterior)":
+        app = Flask(__name__)
+        app.add_url_rule("/books", "list_books", lambda: (jsonify([b.to_dict() for b in db.list_books()]), 200))
+    else:
+        from app import app
+    make_server("127.0.0.1", PUERTO, app, threaded=True).serve_forever()
+
+
+def _pico_rss_mb(pid):
+    """VmHWM: el máximo de memoria residente que alcanzó el proceso (Linux)."""
+    with open(f"/proc/{pid}/status") as archivo:
+        for linea in archivo:
+            if linea.startswith("VmHWM:"):
+                return int(linea.split()[1]) / 1024
+    return float("nan")
+
+
+def _esperar_servidor():
+    for _ in range(100):
+        try:
+            http.client.HTTPConnection("127.0.0.1", PUERTO, timeout=1).connect()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("El servidor no arrancó")
+
+
+def medir(ruta_db, modo, ruta):
+    servidor = multiprocessing.Process(target=_servidor, args=(ruta_db, modo), daemon=True)
+    servidor.start()
+    try:
+        _esperar_servidor()
+        rss_base = _pico_rss_mb(servidor.pid)
+        conn = http.client.HTTPConnection("127.0.0.1", PUERTO, timeout=600)
+        inicio = time.perf_counter()
+        conn.request("GET", ruta)
+        respuesta = conn.getresponse()
+        total = len(respuesta.read(1))
+        ttfb = time.perf_counter() - inicio
+        while True:
+            trozo = respuesta.read(1 << 20)
+            if not trozo:
+                break
+            total += len(trozo)
+        duracion = time.perf_counter() - inicio
+        return ttfb, duracion, total, _pico_rss_mb(servidor.pid) - rss_base
+    finally:
+        servidor.terminate()
+        servidor.join()
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_10_5.py [n_libros]   (requiere Flask; orjson opcional)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ruta_db = os.path.join(tempfile.mkdtemp(prefix="books_stream_"), "books.db")
+    db.DB_PATH = ruta_db
+    for desde in range(0, n, 10_000):
+        db.add_books({"title": f"Libro {i}", "author": f"Autor {i % 1000}", "genre": "Prueba", "read": i % 2 == 0}
+                     for i in range(desde, min(n, desde + 10_000)))
+    db.checkpoint()
+    print(f"📚 {n:,} libros en {ruta_db}")
+
+    for modo, ruta in MODOS.items():
+        ttfb, duracion, total, rss = medir(ruta_db, modo, ruta)
+        print(f"📊 {modo:28} TTFB {ttfb * 1000:8.1f} ms | total {duracion:6.2f}s | "
+              f"{total / 2**20:7.1f} MiB | pico RSS +{rss:7.1f} MiB")
@@ -0,0 +1,82 @@
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from models import Book
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@dataclass
+class BookSinSlots:
+    """La misma clase sin slots, para ver cuánto ahorra slots=True."""
+    id: int
+    title: str
+    author: str
+    genre: str
+    read: bool = False
+
+
+def _filas(n):
+    # Las cadenas se comparten entre representaciones: se mide solo el contenedor
+    return [(i, f"Libro {i}", f"Autor {i % 1000}", "Prueba", i % 2 == 0) for i in range(n)]
+
+
+def memoria_por_registro(filas, construir):
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    registros = [construir(f) for f in filas]
+    usado = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+    del registros
+    return usado / len(filas)
+
+
+def ritmo(funcion, items):
+    inicio = time.perf_counter()
+    for item in items:
+        funcion(item)
+    return len(items) / (time.perf_counter() - inicio)
+
+
+CLAVES = ("id", "title", "author", "genre", "read")
+
+if __name__ == "__main__":
+    # Uso: python Problema_10_6.py [n_libros]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    filas = _filas(n)
+    print(f"📚 {n:,} libros | orjson: {bool(orjson)}")
+
+    representaciones = {
+        "dict": lambda f: dict(zip(CLAVES, f)),
+        "dataclass sin slots": lambda f: BookSinSlots(*f),
+        "Book (slots)": Book.from_row,
+    }
+    for nombre, construir in representaciones.items():
+        print(f"💾 {nombre:22} {memoria_por_registro(filas, construir):6.1f} B/registro (sin contar las cadenas)")
+
+    dicts = [dict(zip(CLAVES, f)) for f in filas]
+    books = [Book.from_row(f) for f in filas]
+    print(f"🏗️ fila -> dict          {ritmo(lambda f: dict(zip(CLAVES, f)), filas):>12,.0f}/s")
+    print(f"🏗️ fila -> Book.from_row {ritmo(Book.from_row, filas):>12,.0f}/s")
+
+    dumps_json = lambda o: json.dumps(o, separators=(",", ":"))
+    print(f"📤 dict json.dumps       {ritmo(dumps_json, dicts):>12,.0f}/s")
+    print(f"📤 Book.to_dict + json   {ritmo(lambda b: dumps_json(b.to_dict()), books):>12,.0f}/s")
+    if orjson:
+        print(f"📤 dict orjson           {ritmo(orjson.dumps, dicts):>12,.0f}/s")
+        print(f"📤 Book orjson (nativo)  {ritmo(orjson.dumps, books):>12,.0f}/s")
+        print(f"📤 Book.to_dict + orjson {ritmo(lambda b: orjson.dumps(b.to_dict()), books):>12,.0f}/s")
+        assert orjson.loads(orjson.dumps(books[1])) == dicts[1]
+
+    cuerpos = [json.dumps({k: v for k, v in d.items() if k != "id"}) for d in dicts]
+    loads = orjson.loads if orjson else json.loads
+    print(f"📥 json -> dict          {ritmo(loads, cuerpos):>12,.0f}/s")
+    print(f"📥 json -> Book validado {ritmo(lambda c: Book.from_dict(loads(c)), cuerpos):>12,.0f}/s")
@@ -16,4 +16,14 @@ class Settings:
     PREFIX = "libro:"           # cada libro se guarda como libro:<uuid>
     SCAN_PATTERN = "libro:*"    # para listados/búsquedas
 
+    # Caché local de lecturas, invalidada con keyspace notifications
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+    CACHE_TTL = float(os.getenv("CACHE_TTL", 30))
+    CACHE_MAX_ITEMS = int(os.getenv("CACHE_MAX_ITEMS", 10000))
+    # Poner en False si el servidor no permite CONFIG SET (se configura a mano)
+    CACHE_CONFIGURAR_SERVIDOR = os.getenv("CACHE_CONFIGURAR_SERVIDOR", "True").lower() == "true"
+
+    # Búsqueda: "indice" (índice invertido propio) o "redisearch" (si el módulo está cargado)
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "indice").lower()
+
 settings = Settings()
\ No newline at end of file
@@ -1,21 +1,40 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from functools import lru_cache
 import redis
-import json
 import uuid
 from config import settings
+from cache import CacheLibros
+
+# Acceso común a KeyDB (pool + lotes), en la raíz del repositorio: ejecutar con PYTHONPATH=..
+from Problema_5_1 import cliente_desde, get_many
+from Problema_5_2 import asegurar_indice, buscar, coincide, indexar, desindexar, redisearch_disponible
+from Problema_5_4 import CAS_UPDATE_LUA, MIGRAR_LUA
 
 app = Flask(__name__)
 app.secret_key = settings.SECRET_KEY
 
-# Conexión global a KeyDB
-r = redis.Redis(
-    host=settings.KEYDB_HOST,
-    port=settings.KEYDB_PORT,
-    password=settings.KEYDB_PASSWORD,
-    decode_responses=True,
-)
+# Cliente global sobre el pool compartido
+r = cliente_desde(settings)
+
+# Caché en proceso de libros y listado; sin la suscripción activa no guarda nada
+cache = CacheLibros(r, settings.PREFIX, settings.CACHE_MAX_ITEMS, settings.CACHE_TTL,
+                    settings.CACHE_CONFIGURAR_SERVIDOR)
+if settings.CACHE_ENABLED:
+    cache.iniciar_invalidacion()
 
 ALLOWED_ESTADOS = {"Leído", "No leído", "Pendiente"}
+CAMPOS = ("id", "titulo", "autor", "genero", "estado")
+
+# Cada libro es un hash libro:<uuid> con sus campos y un contador "version".
+# Actualización optimista: solo escribe los campos cambiados si la versión no
+# cambió desde la lectura (compare-and-set atómico en el servidor).
+_CAS_UPDATE = r.register_script(CAS_UPDATE_LUA)
+# Convierte un libro guardado como JSON (formato anterior) a hash, de forma atómica.
+_MIGRAR = r.register_script(MIGRAR_LUA)
+
+
+class ConflictoVersion(Exception):
+    """El libro cambió entre la lectura y la escritura."""
 
 # --- Helpers ---
 
@@ -33,31 +52,98 @@ def _validate_payload(titulo, autor, genero, estado):
     return errors
 
 
+@lru_cache(maxsize=None)
+def _usar_redisearch():
+    return settings.SEARCH_BACKEND == "redisearch" and redisearch_disponible(r)
+
+
+def _indexar(doc):
+    # Con RediSearch el servidor indexa solo cada HSET; el índice propio hay que mantenerlo
+    if doc and not _usar_redisearch():
+        indexar(r, doc)
+
+
+def _migrar(key: str):
+    if _MIGRAR(keys=[key]):
+        _indexar(r.hgetall(key))
+        return 1
+    return 0
+
+
+def _leer_libro(book_id: str):
+    try:
+        data = r.hgetall(_key(book_id))
+    except redis.ResponseError:  # WRONGTYPE: aún en formato JSON
+        _migrar(_key(book_id))
+        data = r.hgetall(_key(book_id))
+    return data or None
+
+
 def get_book(book_id: str):
-    data = r.get(_key(book_id))
-    return json.loads(data) if data else None
+    return cache.libro(book_id, lambda: _leer_libro(book_id))
 
 
 def save_book(doc: dict):
-    # doc debe contener un campo 'id'
-    r.set(_key(doc["id"]), json.dumps(doc))
+    # doc debe contener un campo 'id'; crea el hash completo (libro nuevo)
+    campos = {k: doc[k] for k in CAMPOS if k in doc}
+    campos["version"] = 1
+    r.hset(_key(doc["id"]), mapping=campos)
+    cache.invalidar(doc["id"])
+    _indexar(campos)
+
+
+def update_book(book_id: str, cambios: dict, version=None):
+    """
+    HSET solo de los campos cambiados, si la versión sigue siendo la leída.
+    Devuelve la nueva versión; lanza ConflictoVersion si otro cambio ganó.
+    """
+    cambios = {k: v for k, v in cambios.items() if k in CAMPOS and k != "id"}
+    argumentos = [str(version or "")]
+    for campo, valor in cambios.items():
+        argumentos += [campo, valor]
+    resultado = _CAS_UPDATE(keys=[_key(book_id)], args=argumentos)
+    # Lectura propia inmediata, sin esperar la notificación del servidor
+    cache.invalidar(book_id)
+    if resultado == 0:
+        raise ConflictoVersion(book_id)
+    if resultado > 0 and cambios:
+        _indexar(_leer_libro(book_id))  # la versión nueva descarta reindexados más viejos
+    return resultado
+
+
+def migrar_json_a_hash():
+    """Convierte todos los libros guardados como JSON al formato hash. Devuelve cuántos migró."""
+    migrados = 0
+    for key in r.scan_iter(match=settings.SCAN_PATTERN, count=500, _type="string"):
+        migrados += _migrar(key)
+    return migrados
 
 
 def delete_book(book_id: str):
     r.delete(_key(book_id))
+    cache.invalidar(book_id)
+    if not _usar_redisearch():
+        desindexar(r, book_id)
 
 
 def scan_books():
-    """Devuelve todos los libros como lista de dicts usando SCAN."""
+    """Devuelve todos los libros ordenados por título (desde la caché si está vigente)."""
+    return cache.libros(_scan_books)
+
+
+def _scan_books():
+    """Lee todos los libros de KeyDB como lista de dicts usando SCAN."""
     cursor = 0
     books = []
     while True:
         cursor, keys = r.scan(cursor=cursor, match=settings.SCAN_PATTERN, count=200)
         if keys:
-            values = r.mget(keys)
-            for raw in values:
-                if raw:
-                    books.append(json.loads(raw))
+            for key, doc in zip(keys, get_many(r, keys)):
+                if isinstance(doc, redis.ResponseError):  # libro aún en JSON: migrar al vuelo
+                    _migrar(key)
+                    doc = r.hgetall(key)
+                if doc:
+                    books.append(doc)
         if cursor == 0:
             break
     # Ordenar por título para visual consistente
@@ -69,12 +155,14 @@ def find_books_by(field: str, query: str):
     if not query:
         return scan_books()
     field = field if field in {"titulo", "autor", "genero"} else "titulo"
-    results = []
-    for doc in scan_books():
-        val = str(doc.get(field, "")).lower()
-        if query in val:
-            results.append(doc)
-    return results
+    # Índice invertido: SINTER de n-gramas, costo según coincidencias y no según el catálogo
+    results = buscar(r, field, query, prefijo=settings.PREFIX, redisearch=_usar_redisearch())
+    if results is not None:
+        return results
+    # Índice aún sin construir: se arma en segundo plano y esta vez se recorre todo,
+    # con la misma comparación (sin tildes) que usa el índice
+    asegurar_indice(r, settings.PREFIX, en_segundo_plano=True)
+    return [doc for doc in scan_books() if coincide(doc.get(field, ""), query)]
 
 # --- Rutas ---
 
@@ -145,13 +233,14 @@ def editar(book_id):
                     flash("Ya existe otro libro con ese título.", "warning")
                     return render_template("form_edit.html", form=request.form, book_id=book_id)
 
-        doc.update({
-            "titulo": titulo,
-            "autor": autor,
-            "genero": genero,
-            "estado": estado,
-        })
-        save_book(doc)
+        nuevos = {"titulo": titulo, "autor": autor, "genero": genero, "estado": estado}
+        cambios = {k: v for k, v in nuevos.items() if doc.get(k) != v}
+        try:
+            # La versión viene del formulario si la plantilla la incluye; si no, de la lectura
+            update_book(book_id, cambios, request.form.get("version") or doc.get("version"))
+        except ConflictoVersion:
+            flash("Otro usuario modificó el libro; revisa los cambios e intenta de nuevo.", "warning")
+            return render_template("form_edit.html", form=get_book(book_id), book_id=book_id)
         flash("Libro actualizado correctamente.", "success")
         return redirect(url_for("index"))
 
@@ -159,6 +248,11 @@ def editar(book_id):
     return render_template("form_edit.html", form=doc, book_id=book_id)
 
 
+@app.route("/stats/cache")
+def stats_cache():
+    return jsonify(cache.stats())
+
+
 @app.route("/eliminar/<book_id>", methods=["POST"])
 def eliminar(book_id):
     if not get_book(book_id):
@@ -170,5 +264,7 @@ def eliminar(book_id):
 
 
 if __name__ == "__main__":
-    # Ejecuta: flask --app app.py --debug run  (o python app.py)
+    print(f"Libros migrados de JSON a hash: {migrar_json_a_hash()}")
+    asegurar_indice(r, settings.PREFIX, _usar_redisearch())
+    # Ejecuta: PYTHONPATH=.. flask --app app.py --debug run  (o PYTHONPATH=.. python app.py)
     app.run(debug=True)
\ No newline at end of file
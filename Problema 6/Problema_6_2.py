@@ -0,0 +1,90 @@
+import json
+import sys
+import threading
+import time
+import uuid
+
+from app import r, _key, save_book, update_book, get_book, ConflictoVersion
+
+CAMPOS_EDITABLES = ("titulo", "autor", "genero", "estado")
+
+
+# ---------- Estrategias de actualización ----------
+
+def actualizar_json(book_id, campo, valor):
+    """Formato anterior: GET + json.loads + SET del documento completo (carrera de lectura/escritura)."""
+    doc = json.loads(r.get(_key(book_id)))
+    doc[campo] = valor
+    r.set(_key(book_id), json.dumps(doc))
+
+
+def actualizar_hash(book_id, campo, valor):
+    """HSET solo del campo cambiado."""
+    r.hset(_key(book_id), campo, valor)
+
+
+def actualizar_cas(book_id, campo, valor, conflictos):
+    """Lectura + compare-and-set en Lua; reintenta si otro escritor ganó."""
+    while True:
+        version = r.hget(_key(book_id), "version")
+        try:
+            update_book(book_id, {campo: valor}, version)
+            return
+        except ConflictoVersion:
+            conflictos.append(1)
+
+
+# ---------- Benchmark ----------
+
+def crear_libros(n, formato):
+    ids = [f"bench-{uuid.uuid4()}" for _ in range(n)]
+    for book_id in ids:
+        doc = {"id": book_id, "titulo": "t", "autor": "a", "genero": "g", "estado": "Pendiente"}
+        if formato == "json":
+            r.set(_key(book_id), json.dumps(doc))
+        else:
+            save_book(doc)
+    return ids
+
+
+def ejecutar(nombre, estrategia, formato, n_libros, n_escrituras):
+    """Un hilo por campo: todos escriben a la vez sobre los mismos libros."""
+    ids = crear_libros(n_libros, formato)
+    conflictos = []
+
+    def escritor(campo):
+        for i in range(1, n_escrituras + 1):
+            for book_id in ids:
+                if estrategia is actualizar_cas:
+                    estrategia(book_id, campo, f"{campo}-{i}", conflictos)
+                else:
+                    estrategia(book_id, campo, f"{campo}-{i}")
+
+    hilos = [threading.Thread(target=escritor, args=(c,)) for c in CAMPOS_EDITABLES]
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+
+    # Actualización perdida: el valor final de un campo no es la última escritura de su hilo
+    perdidas = 0
+    for book_id in ids:
+        doc = json.loads(r.get(_key(book_id))) if formato == "json" else get_book(book_id)
+        perdidas += sum(1 for c in CAMPOS_EDITABLES if doc[c] != f"{c}-{n_escrituras}")
+    r.delete(*(_key(b) for b in ids))
+
+    escrituras = n_libros * n_escrituras * len(CAMPOS_EDITABLES)
+    print(f"  {nombre:<24} {escrituras / total:9.0f} act/s | campos perdidos: {perdidas:5d} "
+          f"| conflictos CAS: {len(conflictos)}")
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_6_2.py [n_libros] [escrituras_por_campo]
+    n_libros = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_escrituras = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"⏱ {len(CAMPOS_EDITABLES)} escritores concurrentes, {n_libros} libros, {n_escrituras} escrituras/campo")
+    ejecutar("JSON (GET + SET)", actualizar_json, "json", n_libros, n_escrituras)
+    ejecutar("Hash (HSET parcial)", actualizar_hash, "hash", n_libros, n_escrituras)
+    ejecutar("Hash + CAS (Lua)", actualizar_cas, "hash", n_libros, n_escrituras)
@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+
+# ---------- LRU con expiración ----------
+
+class CacheLRU:
+    """LRU de tamaño fijo; cada entrada caduca a los `ttl` segundos como red de seguridad."""
+
+    def __init__(self, max_items=10_000, ttl=30.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._datos = OrderedDict()
+
+    def obtener(self, clave):
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return False, None
+        expira, valor = entrada
+        if expira < time.monotonic():
+            del self._datos[clave]
+            return False, None
+        self._datos.move_to_end(clave)
+        return True, valor
+
+    def guardar(self, clave, valor):
+        self._datos[clave] = (time.monotonic() + self.ttl, valor)
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.max_items:
+            self._datos.popitem(last=False)
+
+    def invalidar(self, clave):
+        return self._datos.pop(clave, None) is not None
+
+    def limpiar(self):
+        self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+# ---------- Caché de libros ----------
+
+_LISTADO = object()  # clave de la lista ordenada completa dentro del LRU
+
+
+class CacheLibros:
+    """
+    Caché en proceso de los libros y del listado ordenado.
+
+    La coherencia entre workers se logra con keyspace notifications: cada
+    proceso escucha __keyspace@<db>__:libro:* y descarta el libro tocado y el
+    listado en cuanto otro proceso lo escribe. Mientras la suscripción no está
+    activa (arranque o conexión caída) la caché no sirve ni guarda nada, así
+    nunca entrega datos viejos; el TTL cubre cualquier evento perdido.
+    """
+
+    # K: canal keyspace, g: DEL/EXPIRE/RENAME, h: hashes, $: strings (JSON antiguo),
+    # x: expiradas, e: desalojadas por maxmemory
+    EVENTOS = "Kgh$xe"
+
+    def __init__(self, r, prefijo, max_items=10_000, ttl=30.0, configurar_servidor=True):
+        self.r = r
+        self.prefijo = prefijo
+        self.configurar_servidor = configurar_servidor
+        self._lru = CacheLRU(max_items, ttl)
+        self._lock = threading.Lock()
+        # Sube con cada invalidación: una lectura iniciada antes no puede guardar su resultado
+        self._generacion = 0
+        self.activa = False
+        self._parar = threading.Event()
+        self._hilo = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._tiempo_aciertos = 0.0
+        self._tiempo_fallos = 0.0
+
+    # --- lectura ---
+
+    def _obtener(self, clave, cargar):
+        inicio = time.perf_counter()
+        with self._lock:
+            encontrado, valor = self._lru.obtener(clave) if self.activa else (False, None)
+            generacion = self._generacion
+            if encontrado:
+                self.aciertos += 1
+                self._tiempo_aciertos += time.perf_counter() - inicio
+                return valor
+        valor = cargar()
+        with self._lock:
+            if self.activa and generacion == self._generacion:
+                self._lru.guardar(clave, valor)
+            self.fallos += 1
+            self._tiempo_fallos += time.perf_counter() - inicio
+        return valor
+
+    def libro(self, book_id, cargar):
+        """Libro por id; `cargar()` lo lee de KeyDB si no está en caché."""
+        return self._obtener(book_id, cargar)
+
+    def libros(self, cargar):
+        """Listado ordenado completo; devuelve una copia para que nadie altere la caché."""
+        return list(self._obtener(_LISTADO, cargar))
+
+    # --- invalidación ---
+
+    def invalidar(self, book_id=None):
+        """Descarta un libro (y el listado) o, sin argumento, todo."""
+        with self._lock:
+            self._generacion += 1
+            self.invalidaciones += 1
+            if book_id is None:
+                self._lru.limpiar()
+            else:
+                self._lru.invalidar(book_id)
+                self._lru.invalidar(_LISTADO)
+
+    def _habilitar_notificaciones(self):
+        if not self.configurar_servidor:
+            return
+        try:
+            actuales = self.r.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+            clases = actuales.replace("A", "g$lshzxe")  # "A" es alias de todas las clases
+            faltantes = "".join(e for e in self.EVENTOS if e not in clases)
+            if faltantes:
+                self.r.config_set("notify-keyspace-events", actuales + faltantes)
+        except redis.ResponseError as e:  # CONFIG deshabilitado (servicio gestionado)
+            print(f"⚠️ No se pudo activar notify-keyspace-events ({e}); la caché depende del TTL.")
+
+    def _escuchar(self):
+        db = self.r.connection_pool.connection_kwargs.get("db", 0)
+        patron = f"__keyspace@{db}__:{self.prefijo}*"
+        largo_prefijo = len(self.prefijo)
+        while not self._parar.is_set():
+            pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+            try:
+                self._habilitar_notificaciones()
+                pubsub.psubscribe(patron)
+                # Lo que se guardó antes de suscribirse pudo perder eventos
+                self.invalidar()
+                self.activa = True
+                while not self._parar.is_set():
+                    mensaje = pubsub.get_message(timeout=1.0)
+                    if mensaje and mensaje["type"] == "pmessage":
+                        # canal: __keyspace@0__:libro:<id>
+                        clave = mensaje["channel"].split(":", 1)[1]
+                        self.invalidar(clave[largo_prefijo:])
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                print(f"⚠️ Caché sin invalidación ({e}); reintentando...")
+            finally:
+                self.activa = False
+                self.invalidar()
+                pubsub.close()
+            self._parar.wait(1.0)
+
+    def iniciar_invalidacion(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._escuchar, name="cache-invalidacion", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._parar.set()
+        if self._hilo:
+            self._hilo.join()
+            self._hilo = None
+
+    # --- estadísticas ---
+
+    def stats(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "activa": self.activa,
+                "entradas": len(self._lru),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0,
+                "invalidaciones": self.invalidaciones,
+                "ms_promedio_acierto": round(self._tiempo_aciertos / self.aciertos * 1000, 4) if self.aciertos else None,
+                "ms_promedio_fallo": round(self._tiempo_fallos / self.fallos * 1000, 4) if self.fallos else None,
+            }
+
+
+# ---------- Benchmark ----------
+
+if __name__ == "__main__":
+    # Requiere KeyDB accesible (variables KEYDB_*). Uso: python Problema_6_3.py [lecturas]
+    import sys
+    import uuid
+
+    from app import r, cache, save_book, get_book, scan_books, _key
+
+    lecturas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cache.iniciar_invalidacion()
+    while not cache.activa:
+        time.sleep(0.05)
+
+    ids = [str(uuid.uuid4()) for _ in range(50)]
+    for i, book_id in enumerate(ids):
+        save_book({"id": book_id, "titulo": f"Bench {i}", "autor": "Autor", "genero": "Prueba", "estado": "Leído"})
+
+    inicio = time.perf_counter()
+    for i in range(lecturas):
+        get_book(ids[i % len(ids)])
+        if i % 20 == 0:
+            scan_books()
+    print(f"📚 {lecturas} lecturas en {time.perf_counter() - inicio:.2f}s")
+
+    # Escritura directa en KeyDB (como la haría otro worker): la caché debe enterarse sola
+    get_book(ids[0])
+    inicio = time.perf_counter()
+    r.hset(_key(ids[0]), "titulo", "Cambiado fuera")
+    while get_book(ids[0])["titulo"] != "Cambiado fuera":
+        time.sleep(0.001)
+    print(f"🔔 Invalidación remota visible en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    r.delete(*(_key(b) for b in ids))
+    for clave, valor in cache.stats().items():
+        print(f"  {clave}: {valor}")
+    cache.detener()
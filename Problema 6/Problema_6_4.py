@@ -0,0 +1,232 @@
+from quart import Quart, render_template, request, redirect, url_for, flash
+import asyncio
+import uuid
+
+import redis
+from config import settings
+
+# Módulos comunes en la raíz del repositorio: ejecutar con PYTHONPATH=..
+from Problema_5_1 import cliente_desde, crear_cliente_async, get_many_async
+from Problema_5_2 import asegurar_indice, buscar_async, coincide, indexar_async, desindexar_async
+from Problema_5_4 import CAS_UPDATE_LUA, MIGRAR_LUA
+
+# Mismas rutas y plantillas que app.py, pero ASGI: mientras una petición espera
+# a KeyDB el event loop atiende otras, sin un hilo/worker bloqueado por petición.
+# Ejecuta: PYTHONPATH=.. hypercorn app_async:app --workers 4 (o uvicorn app_async:app --workers 4)
+app = Quart(__name__)
+app.secret_key = settings.SECRET_KEY
+
+ALLOWED_ESTADOS = {"Leído", "No leído", "Pendiente"}
+CAMPOS = ("id", "titulo", "autor", "genero", "estado")
+
+
+class ConflictoVersion(Exception):
+    """El libro cambió entre la lectura y la escritura."""
+
+
+# Construcción del índice en curso (una por proceso); sus errores se registran
+_construccion = None
+
+
+# --- Ciclo de vida ---
+
+@app.before_serving
+async def _conectar():
+    # Un pool por proceso, creado dentro del event loop que lo va a usar
+    app.keydb = crear_cliente_async(settings.KEYDB_HOST, settings.KEYDB_PORT, settings.KEYDB_PASSWORD)
+    app.cas_update = app.keydb.register_script(CAS_UPDATE_LUA)
+    app.migrar = app.keydb.register_script(MIGRAR_LUA)
+
+
+@app.after_serving
+async def _desconectar():
+    await app.keydb.connection_pool.disconnect()
+
+
+# --- Helpers ---
+
+def _key(book_id: str) -> str:
+    return f"{settings.PREFIX}{book_id}"
+
+
+def _validate_payload(titulo, autor, genero, estado):
+    errors = []
+    if not titulo: errors.append("El título es obligatorio.")
+    if not autor: errors.append("El autor es obligatorio.")
+    if not genero: errors.append("El género es obligatorio.")
+    if estado not in ALLOWED_ESTADOS:
+        errors.append("Estado inválido. Usa 'Leído', 'No leído' o 'Pendiente'.")
+    return errors
+
+
+async def _migrar(key: str):
+    if await app.migrar(keys=[key]):
+        await indexar_async(app.keydb, await app.keydb.hgetall(key))
+
+
+async def get_book(book_id: str):
+    try:
+        data = await app.keydb.hgetall(_key(book_id))
+    except redis.ResponseError:  # WRONGTYPE: aún en formato JSON
+        await _migrar(_key(book_id))
+        data = await app.keydb.hgetall(_key(book_id))
+    return data or None
+
+
+async def save_book(doc: dict):
+    campos = {k: doc[k] for k in CAMPOS if k in doc}
+    campos["version"] = 1
+    await app.keydb.hset(_key(doc["id"]), mapping=campos)
+    await indexar_async(app.keydb, campos)
+
+
+async def update_book(book_id: str, cambios: dict, version=None):
+    cambios = {k: v for k, v in cambios.items() if k in CAMPOS and k != "id"}
+    argumentos = [str(version or "")]
+    for campo, valor in cambios.items():
+        argumentos += [campo, valor]
+    resultado = await app.cas_update(keys=[_key(book_id)], args=argumentos)
+    if resultado == 0:
+        raise ConflictoVersion(book_id)
+    if resultado > 0 and cambios:
+        doc = await get_book(book_id)
+        if doc:
+            await indexar_async(app.keydb, doc)
+    return resultado
+
+
+async def delete_book(book_id: str):
+    await app.keydb.delete(_key(book_id))
+    await desindexar_async(app.keydb, book_id)
+
+
+async def scan_books():
+    keys = [k async for k in app.keydb.scan_iter(match=settings.SCAN_PATTERN, count=1000)]
+    books = []
+    for key, doc in zip(keys, await get_many_async(app.keydb, keys)):
+        if isinstance(doc, redis.ResponseError):  # libro aún en JSON: migrar al vuelo
+            await _migrar(key)
+            doc = await app.keydb.hgetall(key)
+        if doc:
+            books.append(doc)
+    return sorted(books, key=lambda x: x.get("titulo", "").lower())
+
+
+async def find_books_by(field: str, query: str):
+    query = (query or "").strip().lower()
+    if not query:
+        return await scan_books()
+    field = field if field in {"titulo", "autor", "genero"} else "titulo"
+    results = await buscar_async(app.keydb, field, query, prefijo=settings.PREFIX)
+    if results is not None:
+        return results
+    # Índice sin construir: se arma en un hilo (cliente síncrono) y esta vez se recorre todo
+    _construir_indice()
+    return [doc for doc in await scan_books() if coincide(doc.get(field, ""), query)]
+
+
+def _construir_indice():
+    global _construccion
+    if _construccion is None or _construccion.done():
+        _construccion = asyncio.ensure_future(
+            asyncio.to_thread(asegurar_indice, cliente_desde(settings), settings.PREFIX))
+        _construccion.add_done_callback(_registrar_fallo_indice)
+
+
+def _registrar_fallo_indice(tarea):
+    if not tarea.cancelled() and tarea.exception() is not None:
+        app.logger.error("Falló la construcción del índice de búsqueda", exc_info=tarea.exception())
+
+
+async def _titulo_repetido(titulo: str, excepto=None):
+    for doc in await scan_books():
+        if doc["id"] != excepto and doc.get("titulo", "").strip().lower() == titulo.lower():
+            return True
+    return False
+
+
+# --- Rutas ---
+
+@app.route("/")
+async def index():
+    campo = request.args.get("campo", "titulo")
+    q = request.args.get("q", "")
+    libros = await find_books_by(campo, q)
+    return await render_template("index.html", libros=libros, campo=campo, q=q)
+
+
+@app.route("/nuevo", methods=["GET", "POST"])
+async def nuevo():
+    if request.method == "POST":
+        form = await request.form
+        titulo = form.get("titulo", "").strip()
+        autor = form.get("autor", "").strip()
+        genero = form.get("genero", "").strip()
+        estado = form.get("estado", "").strip()
+
+        errors = _validate_payload(titulo, autor, genero, estado)
+        if errors:
+            for e in errors: await flash(e, "danger")
+            return await render_template("form_new.html", form=form)
+
+        if await _titulo_repetido(titulo):
+            await flash("Ya existe un libro con ese título.", "warning")
+            return await render_template("form_new.html", form=form)
+
+        doc = {"id": str(uuid.uuid4()), "titulo": titulo, "autor": autor, "genero": genero, "estado": estado}
+        await save_book(doc)
+        await flash("Libro agregado correctamente.", "success")
+        return redirect(url_for("index"))
+
+    return await render_template("form_new.html", form={})
+
+
+@app.route("/editar/<book_id>", methods=["GET", "POST"])
+async def editar(book_id):
+    doc = await get_book(book_id)
+    if not doc:
+        await flash("Libro no encontrado.", "warning")
+        return redirect(url_for("index"))
+
+    if request.method == "POST":
+        form = await request.form
+        titulo = form.get("titulo", "").strip()
+        autor = form.get("autor", "").strip()
+        genero = form.get("genero", "").strip()
+        estado = form.get("estado", "").strip()
+
+        errors = _validate_payload(titulo, autor, genero, estado)
+        if errors:
+            for e in errors: await flash(e, "danger")
+            return await render_template("form_edit.html", form=form, book_id=book_id)
+
+        if titulo.lower() != doc["titulo"].lower() and await _titulo_repetido(titulo, excepto=book_id):
+            await flash("Ya existe otro libro con ese título.", "warning")
+            return await render_template("form_edit.html", form=form, book_id=book_id)
+
+        nuevos = {"titulo": titulo, "autor": autor, "genero": genero, "estado": estado}
+        cambios = {k: v for k, v in nuevos.items() if doc.get(k) != v}
+        try:
+            await update_book(book_id, cambios, form.get("version") or doc.get("version"))
+        except ConflictoVersion:
+            await flash("Otro usuario modificó el libro; revisa los cambios e intenta de nuevo.", "warning")
+            return await render_template("form_edit.html", form=await get_book(book_id), book_id=book_id)
+        await flash("Libro actualizado correctamente.", "success")
+        return redirect(url_for("index"))
+
+    return await render_template("form_edit.html", form=doc, book_id=book_id)
+
+
+@app.route("/eliminar/<book_id>", methods=["POST"])
+async def eliminar(book_id):
+    if not await app.keydb.exists(_key(book_id)):
+        await flash("Libro no encontrado.", "warning")
+    else:
+        await delete_book(book_id)
+        await flash("Libro eliminado.", "info")
+    return redirect(url_for("index"))
+
+
+if __name__ == "__main__":
+    # Desarrollo; en producción usar hypercorn/uvicorn con varios workers
+    app.run(debug=True)
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlencode
+
+from config import settings
+
+# Módulos comunes en la raíz del repositorio: ejecutar con PYTHONPATH=..
+from Problema_5_1 import cliente_desde, save_many, delete_many
+from Problema_5_2 import indexar, desindexar, asegurar_indice
+
+HOST = "127.0.0.1"
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(CARPETA)
+# La query va codificada: un espacio crudo en la línea de petición es un 400 (o un cierre de conexión)
+RUTAS = ["/", "/?" + urlencode({"campo": "titulo", "q": "bench 1"}),
+         "/?" + urlencode({"campo": "autor", "q": "autor 7"}), "/editar/{id}"]
+
+
+def comandos(workers):
+    """Mismo número de procesos para ambos; el WSGI usa hilos para no quedar en 1 petición/worker."""
+    hilos = os.getenv("BENCH_WSGI_THREADS", "32")
+    return {
+        "wsgi": (8101, ["gunicorn", "-w", str(workers), "-k", "gthread", "--threads", hilos,
+                        "-b", f"{HOST}:8101", "app:app"]),
+        "asgi": (8102, ["hypercorn", "-w", str(workers), "-b", f"{HOST}:8102", "app_async:app"]),
+    }
+
+
+# ---------- Cliente HTTP mínimo (keep-alive) ----------
+
+async def _leer_respuesta(reader):
+    estado = int((await reader.readline()).split()[1])
+    largo, chunked = None, False
+    while True:
+        linea = await reader.readline()
+        if linea in (b"\r\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        if nombre.lower() == "content-length":
+            largo = int(valor)
+        elif nombre.lower() == "transfer-encoding" and "chunked" in valor.lower():
+            chunked = True
+    if chunked:
+        while True:
+            tam = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(tam + 2)
+            if tam == 0:
+                break
+    elif largo:
+        await reader.readexactly(largo)
+    return estado
+
+
+async def _conexion(puerto, rutas, fin, latencias, errores):
+    try:
+        reader, writer = await asyncio.open_connection(HOST, puerto)
+    except OSError:
+        errores.append("conexión")
+        return
+    i = 0
+    try:
+        while time.perf_counter() < fin:
+            ruta = rutas[i % len(rutas)]
+            i += 1
+            inicio = time.perf_counter()
+            writer.write(f"GET {ruta} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+            await writer.drain()
+            estado = await _leer_respuesta(reader)
+            latencias.append(time.perf_counter() - inicio)
+            if not 200 <= estado < 400:
+                errores.append(f"HTTP {estado} {ruta}")
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        errores.append(type(e).__name__)
+    finally:
+        writer.close()
+
+
+async def carga(puerto, rutas, conexiones, segundos):
+    latencias, errores = [], []
+    fin = time.perf_counter() + segundos
+    await asyncio.gather(*(_conexion(puerto, rutas[c % len(rutas):] + rutas[:c % len(rutas)], fin,
+                                     latencias, errores) for c in range(conexiones)))
+    return latencias, errores
+
+
+async def _esperar_puerto(puerto, limite=15):
+    fin = time.perf_counter() + limite
+    while time.perf_counter() < fin:
+        try:
+            _, writer = await asyncio.open_connection(HOST, puerto)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor en {puerto} no arrancó")
+
+
+def medir(nombre, puerto, comando, rutas, conexiones, segundos):
+    # Los servidores arrancan en esta carpeta; la raíz va en PYTHONPATH como ruta absoluta.
+    # Sin CacheLibros: app_async no la tiene y se compararía una app con caché contra una sin ella
+    entorno = dict(os.environ, CACHE_ENABLED="False",
+                   PYTHONPATH=os.pathsep.join(filter(None, [RAIZ, os.getenv("PYTHONPATH")])))
+    servidor = subprocess.Popen(comando, cwd=CARPETA, env=entorno,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(_esperar_puerto(puerto))
+        latencias, errores = asyncio.run(carga(puerto, rutas, conexiones, segundos))
+    finally:
+        servidor.terminate()
+        servidor.wait()
+    latencias.sort()
+    p = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000 if latencias else 0
+    print(f"📊 {nombre}: {len(latencias) / segundos:.0f} req/s | p50 {p(0.50):.1f} ms | p99 {p(0.99):.1f} ms"
+          f" | errores {len(errores)}")
+    if errores:
+        # Con errores los números miden el manejo de errores, no las rutas: la corrida no vale
+        detalle = ", ".join(f"{motivo} x{n}" for motivo, n in Counter(errores).most_common(5))
+        raise RuntimeError(f"{nombre}: {len(errores)} respuestas fallidas ({detalle})")
+
+
+if __name__ == "__main__":
+    # Uso: PYTHONPATH=.. python Problema_6_5.py [workers] [conexiones] [segundos] [libros]
+    # Requiere KeyDB, gunicorn y hypercorn; los archivos con sus nombres lógicos (app.py, app_async.py)
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    conexiones = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    segundos = float(sys.argv[3]) if len(sys.argv) > 3 else 15
+    n_libros = int(sys.argv[4]) if len(sys.argv) > 4 else 500
+
+    r = cliente_desde(settings)
+    asegurar_indice(r, settings.PREFIX)
+    docs = {}
+    for i in range(n_libros):
+        book_id = str(uuid.uuid4())
+        docs[f"{settings.PREFIX}{book_id}"] = {"id": book_id, "titulo": f"Bench {i}", "autor": f"Autor {i % 50}",
+                                               "genero": "Prueba", "estado": "Leído", "version": 1}
+    save_many(r, docs)
+    for doc in docs.values():
+        indexar(r, doc)
+    ids = [d["id"] for d in docs.values()]
+    rutas = [ruta.format(id=ids[i % len(ids)]) for i, ruta in enumerate(RUTAS * 4)]
+
+    print(f"⚙️ {workers} worker(s) por servidor, {conexiones} conexiones, {segundos:.0f}s, {n_libros} libros")
+    try:
+        for nombre, (puerto, comando) in comandos(workers).items():
+            medir(nombre, puerto, comando, rutas, conexiones, segundos)
+    finally:
+        for book_id in ids:
+            desindexar(r, book_id)
+        delete_many(r, docs)
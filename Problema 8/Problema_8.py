@@ -16,6 +16,12 @@ class Settings:
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
 
+    # Backend de tareas: "celery" (broker Redis/KeyDB) o "local" (hilos en proceso, sin broker)
+    TASK_BACKEND = os.getenv("TASK_BACKEND", "celery").lower()
+    LOCAL_TASK_WORKERS = int(os.getenv("LOCAL_TASK_WORKERS", 4))
+    LOCAL_TASK_QUEUE = int(os.getenv("LOCAL_TASK_QUEUE", 1000))
+    LOCAL_TASKS_DB = os.getenv("LOCAL_TASKS_DB")  # ruta SQLite para durabilidad (opcional)
+
     # Mail
     MAIL_SERVER = os.getenv("MAIL_SERVER", "localhost")
     MAIL_PORT = int(os.getenv("MAIL_PORT", 25))
@@ -28,6 +34,19 @@ class Settings:
     # App
     PREFIX = "libro:"
     SCAN_PATTERN = "libro:*"
+
+    # Búsqueda: "indice" (índice invertido propio) o "redisearch" (si el módulo está cargado)
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "indice").lower()
     NOTIFY_EMAIL = os.getenv("NOTIFY_EMAIL")
 
+    # Métricas Prometheus del worker (/metrics)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 9808))
+
+    # Resumen (digest): agrupa avisos de libros nuevos en un solo correo
+    DIGEST_ENABLED = os.getenv("DIGEST_ENABLED", "False").lower() == "true"
+    DIGEST_WINDOW_SECONDS = int(os.getenv("DIGEST_WINDOW_SECONDS", 300))
+    DIGEST_MAX_ITEMS = int(os.getenv("DIGEST_MAX_ITEMS", 100))
+    DIGEST_KEY = "digest:libros"
+
 settings = Settings()
\ No newline at end of file
@@ -1,11 +1,29 @@
-from celery import Celery
 from config import settings
 
-celery = Celery(
-    __name__,
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND,
-)
+if settings.TASK_BACKEND == "local":
+    # Ejecutor en proceso: misma interfaz @celery.task / delay(), sin broker
+    from task_backend import LocalTaskApp
+
+    celery = LocalTaskApp(
+        workers=settings.LOCAL_TASK_WORKERS,
+        max_queue=settings.LOCAL_TASK_QUEUE,
+        db_path=settings.LOCAL_TASKS_DB,
+    )
+else:
+    from celery import Celery
+
+    celery = Celery(
+        __name__,
+        broker=settings.CELERY_BROKER_URL,
+        backend=settings.CELERY_RESULT_BACKEND,
+        include=["tasks", "digest"],
+    )
+
+# Trazas de encolado/inicio/fin/reintentos para /metrics
+if settings.METRICS_ENABLED:
+    from metrics import instalar
+
+    instalar(celery)
 
 # Configuración opcional: reintentos, timezone, etc.
 celery.conf.update(
@@ -1,8 +1,110 @@
-from celery.exceptions import Retry
-from flask import current_app, render_template
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from celery.signals import worker_process_init
 from flask_mail import Message
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from celery_app import celery
+from config import settings
 from extensions import mail
+from metrics import SMTP_LATENCIA, iniciar_servidor_metricas
+
+# ---------- Plantillas precompiladas ----------
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Entorno Jinja propio del worker: no necesita app_context para renderizar.
+# auto_reload=False evita revisar el archivo en disco en cada render.
+jinja_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html", "xml"]),
+    auto_reload=False,
+    cache_size=-1,
+)
+
+
+def precompilar_plantillas(prefijo="email/"):
+    """Compila una sola vez todas las plantillas de correo y las deja en caché."""
+    if not os.path.isdir(TEMPLATES_DIR):
+        return []
+    nombres = jinja_env.list_templates(filter_func=lambda n: n.startswith(prefijo) and n.endswith(".html"))
+    for nombre in nombres:
+        jinja_env.get_template(nombre)
+    return nombres
+
+
+class CacheRender:
+    """LRU de HTML ya renderizado, por (plantilla, hash del contexto)."""
+
+    def __init__(self, max_items=1024):
+        self.max_items = max_items
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(template_name, context):
+        contenido = json.dumps(context, sort_keys=True, default=str, ensure_ascii=False)
+        return template_name, hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, html):
+        with self._lock:
+            self._datos[clave] = html
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+
+render_cache = CacheRender(int(os.getenv("EMAIL_RENDER_CACHE", 1024)))
+
+
+def render_email(template_name: str, context: dict = None, cache: bool = True):
+    """Renderiza con la plantilla precompilada; reutiliza el HTML si el contexto se repite."""
+    context = context or {}
+    if not cache:
+        return jinja_env.get_template(template_name).render(**context)
+    clave = CacheRender.clave(template_name, context)
+    html = render_cache.obtener(clave)
+    if html is None:
+        html = jinja_env.get_template(template_name).render(**context)
+        render_cache.guardar(clave, html)
+    return html
+
+
+@worker_process_init.connect
+def _preparar_worker(**_):
+    """
+    Al arrancar cada proceso del worker: compila las plantillas y deja un
+    app_context de Flask activo (Flask-Mail lo necesita al enviar), en lugar
+    de crear uno por tarea.
+    """
+    from app import create_app
+
+    precompilar_plantillas()
+    create_app().app_context().push()
+
+    if settings.METRICS_ENABLED:
+        from billiard.process import current_process
+
+        # Un puerto por proceso hijo: METRICS_PORT + índice del proceso en el pool
+        iniciar_servidor_metricas(settings.METRICS_PORT + (getattr(current_process(), "index", 0) or 0))
+
+
+precompilar_plantillas()
+
 
 @celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=5, retry_jitter=True, max_retries=5)
 def send_email_task(self, subject: str, recipient: str, template_name: str, context: dict):
@@ -10,12 +112,35 @@ def send_email_task(self, subject: str, recipient: str, template_name: str, cont
     Envía correo usando Flask-Mail. Usa plantillas Jinja2 para el cuerpo HTML.
     - autoretry_for: reintenta automáticamente ante excepciones (p. ej., fallo SMTP)
     - retry_backoff: backoff exponencial (5s, 10s, 20s, ...)
+    No se lanza Retry a mano: autoretry ya programa el reintento, y hacer las
+    dos cosas marcaba la tarea como RETRY sin volver a publicarla.
     """
-    try:
-        # current_app está disponible si la tarea se ejecuta con app_context
-        html_body = render_template(template_name, **(context or {}))
-        msg = Message(subject=subject, recipients=[recipient], html=html_body)
+    html_body = render_email(template_name, context)
+    msg = Message(subject=subject, recipients=[recipient], html=html_body,
+                  sender=settings.MAIL_DEFAULT_SENDER)
+    with SMTP_LATENCIA.tiempo("enviar"):
         mail.send(msg)
-        return {"status": "ok"}
-    except Exception as exc:
-        raise Retry(exc=exc)
\ No newline at end of file
+    return {"status": "ok"}
+
+
+def enviar_lote(mensajes):
+    """Envía varios Message reutilizando una sola conexión SMTP (mail.connect())."""
+    enviados = 0
+    with mail.connect() as conn:
+        for msg in mensajes:
+            with SMTP_LATENCIA.tiempo("lote"):
+                conn.send(msg)
+            enviados += 1
+    return enviados
+
+
+@celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=5, retry_jitter=True, max_retries=5)
+def send_bulk_email_task(self, subject: str, recipients: list, template_name: str, context: dict):
+    """
+    Envío masivo: renderiza la plantilla una vez y la envía a todos los
+    destinatarios por la misma sesión SMTP.
+    """
+    html_body = render_email(template_name, context)
+    enviados = enviar_lote(Message(subject=subject, recipients=[r], html=html_body,
+                                   sender=settings.MAIL_DEFAULT_SENDER) for r in recipients)
+    return {"status": "ok", "enviados": enviados}
\ No newline at end of file
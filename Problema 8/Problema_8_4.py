@@ -1,13 +1,27 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, redirect, url_for, flash
+from functools import lru_cache
 import redis
-import json
 import uuid
 from config import settings
 from extensions import mail
 from celery_app import celery
 from tasks import send_email_task
+from digest import encolar_notificacion
+from metrics import exponer_metricas
+
+# Acceso común a KeyDB (pool + lotes), en la raíz del repositorio: ejecutar con PYTHONPATH=..
+from Problema_5_1 import cliente_desde, get_many
+from Problema_5_2 import asegurar_indice, buscar, coincide, indexar, redisearch_disponible
+from Problema_5_4 import CAS_UPDATE_LUA, MIGRAR_LUA
 
 ALLOWED_ESTADOS = {"Leído", "No leído", "Pendiente"}
+CAMPOS = ("id", "titulo", "autor", "genero", "estado")
+
+# Libros como hash libro:<uuid> + contador "version" para compare-and-set.
+# Scripts registrados una vez; cada llamada pasa client=r (mismo pool compartido).
+_scripts = cliente_desde(settings)
+_CAS_UPDATE = _scripts.register_script(CAS_UPDATE_LUA)
+_MIGRAR = _scripts.register_script(MIGRAR_LUA)
 
 
 # ---------- Helpers ----------
@@ -26,16 +40,68 @@ def _validate_payload(titulo, autor, genero, estado):
     return errors
 
 
+class ConflictoVersion(Exception):
+    """El libro cambió entre la lectura y la escritura."""
+
+
+@lru_cache(maxsize=8)
+def _usar_redisearch(r):
+    return settings.SEARCH_BACKEND == "redisearch" and redisearch_disponible(r)
+
+
+def _indexar(r, doc):
+    # Con RediSearch el servidor indexa solo cada HSET; el índice propio hay que mantenerlo
+    if doc and not _usar_redisearch(r):
+        indexar(r, doc)
+
+
+def _migrar(r, key: str):
+    if _MIGRAR(keys=[key], client=r):
+        _indexar(r, r.hgetall(key))
+
+
+def get_book(r, book_id: str):
+    try:
+        data = r.hgetall(_key(book_id))
+    except redis.ResponseError:  # WRONGTYPE: aún en formato JSON
+        _migrar(r, _key(book_id))
+        data = r.hgetall(_key(book_id))
+    return data or None
+
+
+def save_book(r, doc: dict):
+    campos = {k: doc[k] for k in CAMPOS if k in doc}
+    campos["version"] = 1
+    r.hset(_key(doc["id"]), mapping=campos)
+    _indexar(r, campos)
+
+
+def update_book(r, book_id: str, cambios: dict, version=None):
+    """HSET solo de los campos cambiados si la versión no cambió; lanza ConflictoVersion si no."""
+    argumentos = [str(version or "")]
+    for campo, valor in cambios.items():
+        if campo in CAMPOS and campo != "id":
+            argumentos += [campo, valor]
+    resultado = _CAS_UPDATE(keys=[_key(book_id)], args=argumentos, client=r)
+    if resultado == 0:
+        raise ConflictoVersion(book_id)
+    if resultado > 0 and len(argumentos) > 1:
+        _indexar(r, get_book(r, book_id))  # la versión nueva descarta reindexados más viejos
+    return resultado
+
+
 def scan_books(r):
     cursor = 0
     books = []
     while True:
         cursor, keys = r.scan(cursor=cursor, match=settings.SCAN_PATTERN, count=200)
         if keys:
-            values = r.mget(keys)
-            for raw in values:
-                if raw:
-                    books.append(json.loads(raw))
+            for key, doc in zip(keys, get_many(r, keys)):
+                if isinstance(doc, redis.ResponseError):  # libro aún en JSON: migrar al vuelo
+                    _migrar(r, key)
+                    doc = r.hgetall(key)
+                if doc:
+                    books.append(doc)
         if cursor == 0:
             break
     return sorted(books, key=lambda x: x.get("titulo", "").lower())
@@ -59,32 +125,43 @@ def create_app():
     # Extensiones
     mail.init_app(app)
 
-    # KeyDB client
-    app.keydb = redis.Redis(
-        host=settings.KEYDB_HOST,
-        port=settings.KEYDB_PORT,
-        password=settings.KEYDB_PASSWORD,
-        decode_responses=True,
-    )
+    # KeyDB client (pool compartido con timeouts y health checks)
+    app.keydb = cliente_desde(settings)
 
     # Rutas
     register_routes(app)
 
-    # Celery: asegurar contexto de app en tareas render_template/mail
-    # (Patrón simple: envolver task execution con app_context en worker)
+    # Backend local: las tareas corren en este proceso con el app_context de Flask
+    if settings.TASK_BACKEND == "local":
+        celery.init_app(app)
+        celery.recuperar_pendientes()
+
+    # Celery: el worker compila las plantillas de correo y deja un app_context
+    # activo una vez por proceso (ver _preparar_worker en tasks).
     # Ver README para comando de arranque del worker.
 
     return app
 
 
 def register_routes(app: Flask):
+    @app.route("/metrics")
+    def metrics():
+        # Con TASK_BACKEND=local las tareas corren aquí y sus métricas también
+        return Response(exponer_metricas(), mimetype="text/plain; version=0.0.4")
+
     @app.route("/")
     def index():
         campo = request.args.get("campo", "titulo")
         q = request.args.get("q", "").lower().strip()
-        libros = scan_books(app.keydb)
         if q and campo in {"titulo", "autor", "genero"}:
-            libros = [b for b in libros if q in str(b.get(campo, "")).lower()]
+            # Índice invertido: costo según coincidencias y no según el catálogo
+            libros = buscar(app.keydb, campo, q, prefijo=settings.PREFIX,
+                            redisearch=_usar_redisearch(app.keydb))
+            if libros is None:  # índice sin construir: se arma en segundo plano y esta vez se recorre todo
+                asegurar_indice(app.keydb, settings.PREFIX, en_segundo_plano=True)
+                libros = [b for b in scan_books(app.keydb) if coincide(b.get(campo, ""), q)]
+        else:
+            libros = scan_books(app.keydb)
         return render_template("index.html", libros=libros, campo=campo, q=q)
 
     @app.route("/nuevo", methods=["GET", "POST"])
@@ -108,12 +185,14 @@ def register_routes(app: Flask):
 
             book_id = str(uuid.uuid4())
             doc = {"id": book_id, "titulo": titulo, "autor": autor, "genero": genero, "estado": estado}
-            app.keydb.set(_key(book_id), json.dumps(doc))
+            save_book(app.keydb, doc)
 
             flash("Libro agregado correctamente.", "success")
 
-            # Disparar correo asíncrono
-            if settings.NOTIFY_EMAIL:
+            # Disparar correo asíncrono (o acumular en el resumen periódico)
+            if settings.NOTIFY_EMAIL and settings.DIGEST_ENABLED:
+                encolar_notificacion(app.keydb, doc)
+            elif settings.NOTIFY_EMAIL:
                 send_email_task.delay(
                     subject="[Biblioteca] Nuevo libro agregado",
                     recipient=settings.NOTIFY_EMAIL,
@@ -126,11 +205,10 @@ def register_routes(app: Flask):
 
     @app.route("/editar/<book_id>", methods=["GET", "POST"])
     def editar(book_id):
-        raw = app.keydb.get(_key(book_id))
-        if not raw:
+        doc = get_book(app.keydb, book_id)
+        if not doc:
             flash("Libro no encontrado.", "warning")
             return redirect(url_for("index"))
-        doc = json.loads(raw)
 
         if request.method == "POST":
             titulo = request.form.get("titulo", "").strip()
@@ -150,8 +228,13 @@ def register_routes(app: Flask):
                         flash("Ya existe otro libro con ese título.", "warning")
                         return render_template("form_edit.html", form=request.form, book_id=book_id)
 
-            doc.update({"titulo": titulo, "autor": autor, "genero": genero, "estado": estado})
-            app.keydb.set(_key(book_id), json.dumps(doc))
+            nuevos = {"titulo": titulo, "autor": autor, "genero": genero, "estado": estado}
+            cambios = {k: v for k, v in nuevos.items() if doc.get(k) != v}
+            try:
+                update_book(app.keydb, book_id, cambios, request.form.get("version") or doc.get("version"))
+            except ConflictoVersion:
+                flash("Otro usuario modificó el libro; revisa los cambios e intenta de nuevo.", "warning")
+                return render_template("form_edit.html", form=get_book(app.keydb, book_id), book_id=book_id)
             flash("Libro actualizado correctamente.", "info")
             return redirect(url_for("index"))
 
@@ -159,6 +242,6 @@ def register_routes(app: Flask):
 
     @app.route("/eliminar/<book_id>", methods=["GET", "POST"])
     def eliminar(book_id):
-        raw = app.keydb.get(_key(book_id))
+        raw = app.keydb.exists(_key(book_id))
         if not raw:
             flash("Libro no encontrado.", "warning")
@@ -0,0 +1,128 @@
+import sys
+
+from flask_mail import Message
+from celery_app import celery
+from config import settings
+from tasks import enviar_lote, render_email
+
+# Módulos comunes en la raíz del repositorio: ejecutar con PYTHONPATH=..
+from Problema_5_1 import cliente_desde
+from Problema_5_3 import codec_desde_entorno, decodificar
+
+# Bandera que indica que ya hay un envío de resumen programado
+DIGEST_FLAG = f"{settings.DIGEST_KEY}:programado"
+
+# Avisos en formato compacto (KEYDB_CODEC); los JSON ya encolados se siguen leyendo
+codec = codec_desde_entorno()
+
+def _cliente():
+    """Cliente KeyDB del worker (binario: los avisos pueden venir en msgpack/zstd)."""
+    return cliente_desde(settings, binario=True)
+
+
+# ---------- Cola de avisos ----------
+
+def encolar_notificaciones(r, libros):
+    """
+    Agrega avisos a la cola del resumen y programa su envío.
+    - Se envía al cumplirse la ventana DIGEST_WINDOW_SECONDS desde el primer aviso,
+    - o antes, cada vez que la cola llega a DIGEST_MAX_ITEMS avisos.
+    Devuelve la longitud de la cola.
+    """
+    libros = list(libros)
+    if not libros:
+        return 0
+    pipe = r.pipeline()
+    pipe.rpush(settings.DIGEST_KEY, *(codec.codificar(doc) for doc in libros))
+    pipe.set(DIGEST_FLAG, 1, nx=True, ex=settings.DIGEST_WINDOW_SECONDS * 2)
+    longitud, primera_vez = pipe.execute()
+
+    if longitud // settings.DIGEST_MAX_ITEMS > (longitud - len(libros)) // settings.DIGEST_MAX_ITEMS:
+        send_digest_task.delay()
+    elif primera_vez:
+        send_digest_task.apply_async(countdown=settings.DIGEST_WINDOW_SECONDS)
+    return longitud
+
+
+def encolar_notificacion(r, libro):
+    return encolar_notificaciones(r, [libro])
+
+
+def tomar_pendientes(r):
+    """Saca todos los avisos pendientes de forma atómica."""
+    pipe = r.pipeline(transaction=True)
+    pipe.lrange(settings.DIGEST_KEY, 0, -1)
+    pipe.delete(settings.DIGEST_KEY)
+    pipe.delete(DIGEST_FLAG)
+    pendientes, _, _ = pipe.execute()
+    return [decodificar(raw) for raw in pendientes]
+
+
+# ---------- Tarea ----------
+
+@celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=5, retry_jitter=True, max_retries=5)
+def send_digest_task(self, recipients: list = None):
+    """Renderiza un solo correo con todos los libros agregados desde el último resumen."""
+    recipients = recipients or [settings.NOTIFY_EMAIL]
+    libros = tomar_pendientes(_cliente())
+    if not libros:
+        return {"status": "vacío", "libros": 0}
+    try:
+        # Cada resumen es distinto: no vale la pena guardarlo en la caché de render
+        html_body = render_email("email/digest.html", {"libros": libros}, cache=False)
+        subject = f"[Biblioteca] {len(libros)} libro(s) nuevo(s)"
+        enviar_lote(Message(subject=subject, recipients=[r], html=html_body,
+                            sender=settings.MAIL_DEFAULT_SENDER) for r in recipients)
+    except Exception:
+        # Devolver los avisos a la cola para que el reintento no los pierda
+        _cliente().lpush(settings.DIGEST_KEY, *(codec.codificar(doc) for doc in reversed(libros)))
+        raise
+    return {"status": "ok", "libros": len(libros)}
+
+
+# ---------- Prueba con un SMTP local (aiosmtpd) ----------
+
+if __name__ == "__main__":
+    # Uso: python Problema_8_5.py [n_mensajes]
+    import sys
+    import time
+    from aiosmtpd.controller import Controller
+    from app import create_app
+    from extensions import mail
+
+    class ContadorSMTP:
+        def __init__(self):
+            self.mensajes = 0
+            self.sesiones = set()
+
+        async def handle_DATA(self, server, session, envelope):
+            self.mensajes += 1
+            self.sesiones.add(id(session))
+            return "250 OK"
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    handler = ContadorSMTP()
+    controller = Controller(handler, hostname="127.0.0.1", port=8025)
+    controller.start()
+
+    settings.MAIL_SERVER, settings.MAIL_PORT = "127.0.0.1", 8025
+    settings.MAIL_USE_TLS = settings.MAIL_USE_SSL = False
+    settings.MAIL_USERNAME = settings.MAIL_PASSWORD = None
+    app = create_app()
+    with app.app_context():
+        mensajes = [Message(subject=f"Prueba {i}", recipients=[f"lector{i}@example.com"], body="hola")
+                    for i in range(n)]
+        inicio = time.perf_counter()
+        for msg in mensajes[: n // 10]:
+            mail.send(msg)
+        individual = (time.perf_counter() - inicio) / max(n // 10, 1)
+
+        handler.sesiones.clear()
+        inicio = time.perf_counter()
+        enviar_lote(mensajes)
+        lote = (time.perf_counter() - inicio) / n
+    controller.stop()
+
+    print(f"📧 Un mensaje por conexión: {individual * 1000:.2f} ms/mensaje")
+    print(f"📦 Lote de {n} en una conexión: {lote * 1000:.2f} ms/mensaje "
+          f"({len(handler.sesiones)} sesión(es) SMTP)")
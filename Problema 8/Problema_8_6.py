@@ -0,0 +1,299 @@
+import heapq
+import json
+import logging
+import queue
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    from celery.exceptions import Retry
+except ImportError:  # el backend local no necesita Celery instalado
+    class Retry(Exception):
+        def __init__(self, message=None, exc=None, when=None, **_):
+            super().__init__(message or exc)
+            self.exc = exc
+            self.when = when
+
+
+log = logging.getLogger(__name__)
+
+# ---------- Resultado ----------
+
+class LocalResult:
+    """Equivalente mínimo de AsyncResult de Celery."""
+
+    def __init__(self, task_id):
+        self.id = task_id
+        self.status = "PENDING"
+        self.result = None
+        self._listo = threading.Event()
+
+    def ready(self):
+        return self._listo.is_set()
+
+    def get(self, timeout=None):
+        if not self._listo.wait(timeout):
+            raise TimeoutError(f"La tarea {self.id} no terminó a tiempo")
+        if self.status == "FAILURE":
+            raise self.result
+        return self.result
+
+    def _terminar(self, status, result):
+        self.status, self.result = status, result
+        self._listo.set()
+
+
+class _Request:
+    def __init__(self, task_id, retries):
+        self.id = task_id
+        self.retries = retries
+
+
+# ---------- Tarea ----------
+
+class LocalTask:
+    """Envuelve una función con la misma interfaz que usan las tareas de Celery."""
+
+    def __init__(self, app, fn, bind=False, autoretry_for=(), max_retries=3,
+                 retry_backoff=False, retry_backoff_max=600, retry_jitter=True, **_):
+        self.app = app
+        self.fn = fn
+        self.name = f"{fn.__module__}.{fn.__name__}"
+        self.bind = bind
+        self.autoretry_for = tuple(autoretry_for)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.retry_jitter = retry_jitter
+        self._local = threading.local()
+        self.__doc__ = fn.__doc__
+
+    @property
+    def request(self):
+        return getattr(self._local, "request", None)
+
+    @request.setter
+    def request(self, valor):
+        self._local.request = valor
+
+    def __call__(self, *args, **kwargs):
+        if self.bind:
+            return self.fn(self, *args, **kwargs)
+        return self.fn(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.apply_async(args, kwargs)
+
+    def apply_async(self, args=None, kwargs=None, countdown=None, **_):
+        return self.app.enviar(self.name, list(args or ()), dict(kwargs or {}), countdown or 0)
+
+    def retry(self, exc=None, countdown=None, **_):
+        raise Retry(exc=exc, when=countdown)
+
+    def espera_reintento(self, reintentos, countdown=None):
+        """Backoff exponencial como Celery: base * 2^n, con tope y jitter opcional."""
+        if countdown is not None:
+            return countdown
+        if not self.retry_backoff:
+            return 180  # default_retry_delay de Celery
+        espera = min(int(self.retry_backoff) * (2 ** reintentos), self.retry_backoff_max)
+        return random.uniform(0, espera) if self.retry_jitter else espera
+
+
+# ---------- Ejecutor en proceso ----------
+
+class LocalTaskApp:
+    """
+    Backend de tareas sin broker para despliegues de un solo nodo.
+    - Pool de hilos con cola acotada (delay() bloquea si se llena: contrapresión).
+    - Reintentos con backoff exponencial según las opciones de @task.
+    - Durabilidad opcional en SQLite: las tareas pendientes se recuperan al reiniciar.
+    """
+
+    def __init__(self, workers=4, max_queue=1000, db_path=None, timeout_encolar=5):
+        self.conf = {}
+        self.tasks = {}
+        # Ganchos equivalentes a las señales de Celery (los usa metrics.instalar)
+        self.hooks = {"encolada": [], "inicio": [], "fin": [], "reintento": []}
+        self.flask_app = None
+        self.timeout_encolar = timeout_encolar
+        self._cola = queue.Queue(maxsize=max_queue)
+        self._programadas = []  # heap de (eta, secuencia, trabajo)
+        self._secuencia = 0
+        self._condicion = threading.Condition()
+        self._resultados = {}
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS tareas (
+                    id TEXT PRIMARY KEY,
+                    nombre TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    kwargs TEXT NOT NULL,
+                    eta REAL NOT NULL,
+                    reintentos INTEGER NOT NULL DEFAULT 0,
+                    estado TEXT NOT NULL DEFAULT 'pendiente'
+                )
+            """)
+        threading.Thread(target=self._planificador, daemon=True).start()
+        for _ in range(workers):
+            threading.Thread(target=self._trabajador, daemon=True).start()
+
+    def init_app(self, app):
+        """Las tareas corren dentro de un app_context de Flask (lo necesita Flask-Mail)."""
+        self.flask_app = app
+
+    def task(self, *args, **opts):
+        def registrar(fn):
+            tarea = LocalTask(self, fn, **opts)
+            self.tasks[tarea.name] = tarea
+            return tarea
+        if args and callable(args[0]):
+            return registrar(args[0])
+        return registrar
+
+    def _avisar(self, evento, *args):
+        for gancho in self.hooks[evento]:
+            gancho(*args)
+
+    # --- Encolado ---
+
+    def _persistir(self, sql, params):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(sql, params)
+
+    def enviar(self, nombre, args, kwargs, countdown=0, task_id=None, reintentos=0):
+        task_id = task_id or str(uuid.uuid4())
+        resultado = self._resultados.setdefault(task_id, LocalResult(task_id))
+        eta = time.time() + countdown
+        self._persistir(
+            "INSERT OR REPLACE INTO tareas (id, nombre, args, kwargs, eta, reintentos) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, nombre, json.dumps(args), json.dumps(kwargs), eta, reintentos))
+        trabajo = (task_id, nombre, args, kwargs, reintentos, eta)
+        if not reintentos:
+            self._avisar("encolada", nombre, task_id)
+        if countdown > 0:
+            with self._condicion:
+                self._secuencia += 1
+                heapq.heappush(self._programadas, (eta, self._secuencia, trabajo))
+                self._condicion.notify()
+        else:
+            self._cola.put(trabajo, timeout=self.timeout_encolar)
+        return resultado
+
+    def recuperar_pendientes(self):
+        """Reprograma las tareas que quedaron sin terminar en la base SQLite."""
+        if self._db is None:
+            return 0
+        with self._db_lock:
+            filas = self._db.execute(
+                "SELECT id, nombre, args, kwargs, eta, reintentos FROM tareas WHERE estado = 'pendiente'"
+            ).fetchall()
+        for task_id, nombre, args, kwargs, eta, reintentos in filas:
+            self.enviar(nombre, json.loads(args), json.loads(kwargs), max(eta - time.time(), 0),
+                        task_id=task_id, reintentos=reintentos)
+        return len(filas)
+
+    # --- Hilos ---
+
+    def _planificador(self):
+        while True:
+            with self._condicion:
+                while not self._programadas or self._programadas[0][0] > time.time():
+                    espera = self._programadas[0][0] - time.time() if self._programadas else None
+                    self._condicion.wait(espera)
+                _, _, trabajo = heapq.heappop(self._programadas)
+            self._cola.put(trabajo)
+
+    def _trabajador(self):
+        contexto = None
+        while True:
+            trabajo = self._cola.get()
+            if contexto is None and self.flask_app is not None:
+                # Un app_context por hilo trabajador, reutilizado por todas sus tareas
+                contexto = self.flask_app.app_context()
+                contexto.push()
+            try:
+                self._ejecutar(*trabajo)
+            except Exception as exc:
+                # Tarea desconocida, cola llena al reintentar, gancho roto...: el hilo sigue vivo
+                log.exception("Error inesperado ejecutando la tarea %s (%s)", trabajo[0], trabajo[1])
+                self._fallar(trabajo[0], exc)
+            finally:
+                self._cola.task_done()
+
+    def _fallar(self, task_id, exc):
+        self._persistir("UPDATE tareas SET estado = 'fallida' WHERE id = ?", (task_id,))
+        resultado = self._resultados.pop(task_id, None) or LocalResult(task_id)
+        resultado._terminar("FAILURE", exc)
+
+    def _ejecutar(self, task_id, nombre, args, kwargs, reintentos, eta):
+        tarea = self.tasks[nombre]
+        resultado = self._resultados.setdefault(task_id, LocalResult(task_id))
+        tarea.request = _Request(task_id, reintentos)
+        self._avisar("inicio", nombre, task_id, eta)
+        try:
+            valor = tarea(*args, **kwargs)
+        except Exception as exc:
+            reintentable = isinstance(exc, Retry) or isinstance(exc, tarea.autoretry_for)
+            if reintentable and reintentos < tarea.max_retries:
+                self._avisar("fin", nombre, task_id, "RETRY")
+                self._avisar("reintento", nombre, task_id)
+                countdown = getattr(exc, "when", None) if isinstance(exc, Retry) else None
+                espera = tarea.espera_reintento(reintentos, countdown if isinstance(countdown, (int, float)) else None)
+                self.enviar(nombre, args, kwargs, espera, task_id=task_id, reintentos=reintentos + 1)
+                return
+            self._avisar("fin", nombre, task_id, "FAILURE")
+            self._fallar(task_id, getattr(exc, "exc", None) or exc)
+            return
+        self._avisar("fin", nombre, task_id, "SUCCESS")
+        self._persistir("DELETE FROM tareas WHERE id = ?", (task_id,))
+        self._resultados.pop(task_id, None)
+        resultado._terminar("SUCCESS", valor)
+
+    def join(self):
+        """Espera a que se vacíe la cola inmediata (útil en pruebas y benchmarks)."""
+        self._cola.join()
+
+
+# ---------- Benchmark de latencia de encolado ----------
+
+if __name__ == "__main__":
+    # Uso: python Problema_8_6.py [n_tareas]
+    import os
+    import sys
+    import tempfile
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    def medir(nombre, tarea):
+        latencias = []
+        for i in range(n):
+            inicio = time.perf_counter()
+            tarea.delay(i)
+            latencias.append(time.perf_counter() - inicio)
+        latencias.sort()
+        p = lambda q: latencias[min(n - 1, int(q * n))] * 1e6
+        print(f"  {nombre:<22} p50 {p(0.5):8.1f} µs | p99 {p(0.99):8.1f} µs")
+
+    print(f"⏱ Latencia de delay() con {n} tareas:")
+    for nombre, db_path in [("local (memoria)", None),
+                            ("local (SQLite)", os.path.join(tempfile.mkdtemp(), "tareas.db"))]:
+        app = LocalTaskApp(workers=4, max_queue=n, db_path=db_path)
+        medir(nombre, app.task(lambda x: x))
+        app.join()
+
+    try:
+        from celery import Celery
+        broker = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+        capp = Celery("benchmark", broker=broker)
+        medir("celery (broker)", capp.task(lambda x: x, name="benchmark.noop"))
+    except Exception as e:
+        print(f"  celery (broker)        omitido: {e}")
@@ -0,0 +1,231 @@
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import settings
+
+# Buckets por defecto de los clientes de Prometheus (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+# ---------- Registro de métricas ----------
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ""
+    return "{" + ",".join(f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)) + "}"
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores, cantidad=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def exponer(self):
+        with self._lock:
+            return [f"{self.nombre}{_etiquetas(self.etiquetas, k)} {v}" for k, v in sorted(self._valores.items())]
+
+
+class Medidor(Contador):
+    tipo = "gauge"
+
+    def dec(self, *valores, cantidad=1):
+        self.inc(*valores, cantidad=-cantidad)
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self._series = {}  # valores -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, segundos, *valores):
+        with self._lock:
+            serie = self._series.setdefault(valores, [[0] * len(self.buckets), 0.0, 0])
+            i = bisect.bisect_left(self.buckets, segundos)
+            if i < len(self.buckets):
+                serie[0][i] += 1
+            serie[1] += segundos
+            serie[2] += 1
+
+    def tiempo(self, *valores):
+        return _Cronometro(self, valores)
+
+    def exponer(self):
+        lineas = []
+        with self._lock:
+            for valores, (conteos, suma, total) in sorted(self._series.items()):
+                acumulado = 0
+                for limite, conteo in zip(self.buckets, conteos):
+                    acumulado += conteo
+                    lineas.append(f"{self.nombre}_bucket"
+                                  f"{_etiquetas(self.etiquetas + ('le',), valores + (limite,))} {acumulado}")
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas + ('le',), valores + ('+Inf',))} {total}")
+                lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {suma}")
+                lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {total}")
+        return lineas
+
+
+class _Cronometro:
+    def __init__(self, histograma, valores):
+        self.histograma, self.valores = histograma, valores
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histograma.observe(time.perf_counter() - self.inicio, *self.valores)
+
+
+TAREAS_ENCOLADAS = Contador("biblioteca_tareas_encoladas_total", "Tareas publicadas", ("tarea",))
+TAREAS_TERMINADAS = Contador("biblioteca_tareas_total", "Tareas terminadas por estado", ("tarea", "estado"))
+TAREAS_REINTENTOS = Contador("biblioteca_tareas_reintentos_total", "Reintentos programados", ("tarea",))
+TAREAS_EN_CURSO = Medidor("biblioteca_tareas_en_curso", "Tareas ejecutándose ahora", ("tarea",))
+TAREA_ESPERA = Histograma("biblioteca_tarea_espera_segundos", "Tiempo entre encolado e inicio", ("tarea",))
+TAREA_DURACION = Histograma("biblioteca_tarea_duracion_segundos", "Tiempo entre inicio y fin", ("tarea",))
+SMTP_LATENCIA = Histograma("biblioteca_smtp_latencia_segundos", "Latencia de envío SMTP", ("operacion",))
+
+METRICAS = [TAREAS_ENCOLADAS, TAREAS_TERMINADAS, TAREAS_REINTENTOS, TAREAS_EN_CURSO,
+            TAREA_ESPERA, TAREA_DURACION, SMTP_LATENCIA]
+
+
+def exponer_metricas():
+    """Todas las métricas en formato de texto de Prometheus."""
+    lineas = []
+    for m in METRICAS:
+        lineas.append(f"# HELP {m.nombre} {m.ayuda}")
+        lineas.append(f"# TYPE {m.nombre} {m.tipo}")
+        lineas.extend(m.exponer())
+    return "\n".join(lineas) + "\n"
+
+
+# ---------- Trazas de tareas ----------
+
+_inicios = {}  # task_id -> perf_counter al iniciar
+
+
+def registrar_encolado(tarea, headers=None):
+    TAREAS_ENCOLADAS.inc(tarea)
+    if headers is not None:
+        headers["encolado_en"] = time.time()
+
+
+def registrar_inicio(tarea, task_id, encolado_en=None):
+    TAREAS_EN_CURSO.inc(tarea)
+    _inicios[task_id] = time.perf_counter()
+    if encolado_en:
+        TAREA_ESPERA.observe(max(time.time() - float(encolado_en), 0), tarea)
+
+
+def registrar_fin(tarea, task_id, estado):
+    TAREAS_EN_CURSO.dec(tarea)
+    inicio = _inicios.pop(task_id, None)
+    if inicio is not None:
+        TAREA_DURACION.observe(time.perf_counter() - inicio, tarea)
+    TAREAS_TERMINADAS.inc(tarea, estado)
+
+
+def registrar_reintento(tarea):
+    TAREAS_REINTENTOS.inc(tarea)
+
+
+def instalar(app):
+    """Conecta las trazas al backend de tareas (Celery o LocalTaskApp)."""
+    if hasattr(app, "hooks"):
+        app.hooks["encolada"].append(lambda nombre, task_id: registrar_encolado(nombre))
+        app.hooks["inicio"].append(lambda nombre, task_id, encolado_en: registrar_inicio(nombre, task_id, encolado_en))
+        app.hooks["fin"].append(registrar_fin)
+        app.hooks["reintento"].append(lambda nombre, task_id: registrar_reintento(nombre))
+        return
+
+    from celery import signals
+
+    @signals.before_task_publish.connect(weak=False)
+    def _publicada(sender=None, headers=None, **_):
+        registrar_encolado(sender, headers)
+
+    @signals.task_prerun.connect(weak=False)
+    def _inicio(task_id=None, task=None, **_):
+        registrar_inicio(task.name, task_id, getattr(task.request, "encolado_en", None))
+
+    @signals.task_postrun.connect(weak=False)
+    def _fin(task_id=None, task=None, state=None, **_):
+        # Un reintento termina con estado RETRY; la nueva ejecución se mide aparte
+        registrar_fin(task.name, task_id, state or "DESCONOCIDO")
+
+    @signals.task_retry.connect(weak=False)
+    def _reintento(sender=None, **_):
+        registrar_reintento(sender.name)
+
+
+# ---------- Endpoint HTTP ----------
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = exponer_metricas().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_servidor_metricas(puerto=None, host="127.0.0.1"):
+    """Sirve /metrics en un hilo aparte. Con prefork, cada proceso usa METRICS_PORT + índice."""
+    puerto = settings.METRICS_PORT if puerto is None else puerto
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+# ---------- CLI: profundidad de la cola ----------
+
+def profundidad_colas(r, colas=("celery",)):
+    """Mensajes esperando en cada cola del broker Redis/KeyDB, más los entregados sin ack."""
+    pipe = r.pipeline()
+    for cola in colas:
+        pipe.llen(cola)
+    pipe.hlen("unacked")
+    *largos, sin_ack = pipe.execute()
+    return dict(zip(colas, largos)), sin_ack
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_8_7.py [intervalo_segundos] [cola ...]
+    import sys
+    import redis
+
+    intervalo = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    colas = tuple(sys.argv[2:]) or ("celery",)
+    r = redis.Redis.from_url(os.getenv("CELERY_BROKER_URL", settings.CELERY_BROKER_URL))
+    try:
+        while True:
+            largos, sin_ack = profundidad_colas(r, colas)
+            detalle = " | ".join(f"{c}: {n}" for c, n in largos.items())
+            print(f"{time.strftime('%H:%M:%S')}  {detalle} | sin ack: {sin_ack}", flush=True)
+            time.sleep(intervalo)
+    except KeyboardInterrupt:
+        pass
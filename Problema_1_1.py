@@ -0,0 +1,124 @@
+import random
+import sys
+import time
+
+from Problema_1 import conectar, crear_tablas, crear_indices, CONSULTA_DRAGONES
+
+CLASES = ['Guerrero', 'Mago', 'Arquero', 'Clérigo', 'Asesino', 'Bárbaro']
+TIPOS = ['Dragón', 'Goblin', 'No-muerto', 'Bestia', 'Demonio', 'Elemental']
+LOTE = 50_000
+
+
+# ==========================
+# GENERADOR DE DATOS SINTÉTICOS
+# ==========================
+def _insertar_por_lotes(cursor, sql, filas):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            cursor.executemany(sql, lote)
+            lote.clear()
+    if lote:
+        cursor.executemany(sql, lote)
+
+
+def generar_datos(conn, n_heroes=1_000_000, n_misiones=1_000_000, n_monstruos=10_000,
+                  heroes_por_mision=3, monstruos_por_mision=2, semilla=42):
+    """
+    Llena la base con datos aleatorios reproducibles.
+    Los índices se crean al final: construirlos una vez es mucho más rápido
+    que mantenerlos fila a fila durante la carga.
+    """
+    rnd = random.Random(semilla)
+    cursor = conn.cursor()
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    crear_tablas(cursor)
+
+    _insertar_por_lotes(
+        cursor, "INSERT INTO heroes (id, nombre, clase, nivel_experiencia) VALUES (?, ?, ?, ?)",
+        ((i, f"Héroe {i}", rnd.choice(CLASES), rnd.randint(1, 100)) for i in range(1, n_heroes + 1)))
+    _insertar_por_lotes(
+        cursor, "INSERT INTO misiones (id, nombre, dificultad, localizacion, recompensa) VALUES (?, ?, ?, ?, ?)",
+        ((i, f"Misión {i}", rnd.randint(1, 10), f"Zona {i % 500}", rnd.randint(0, 5000))
+         for i in range(1, n_misiones + 1)))
+    _insertar_por_lotes(
+        cursor, "INSERT INTO monstruos (id, nombre, tipo, nivel_amenaza) VALUES (?, ?, ?, ?)",
+        ((i, f"Monstruo {i}", rnd.choice(TIPOS), rnd.randint(1, 5)) for i in range(1, n_monstruos + 1)))
+
+    # rnd.sample evita pares repetidos dentro de una misión (PK compuesta)
+    _insertar_por_lotes(
+        cursor, "INSERT INTO misiones_heroes VALUES (?, ?)",
+        ((m, h) for m in range(1, n_misiones + 1)
+         for h in rnd.sample(range(1, n_heroes + 1), heroes_por_mision)))
+    _insertar_por_lotes(
+        cursor, "INSERT INTO misiones_monstruos VALUES (?, ?)",
+        ((m, mon) for m in range(1, n_misiones + 1)
+         for mon in rnd.sample(range(1, n_monstruos + 1), monstruos_por_mision)))
+    conn.commit()
+
+    crear_indices(cursor)
+    cursor.execute("ANALYZE")
+    conn.commit()
+    conn.execute("PRAGMA synchronous = FULL")
+
+
+# ==========================
+# VERIFICACIÓN DE PLANES DE CONSULTA
+# ==========================
+# nombre -> (consulta, parámetros, índices que el plan debe usar)
+CONSULTAS_CANONICAS = {
+    "heroes_contra_dragon": (
+        CONSULTA_DRAGONES, ("Dragón", 8),
+        {"idx_monstruos_tipo", "idx_misiones_monstruos_monstruo"}),
+    "misiones_de_heroe": (
+        "SELECT m.nombre FROM misiones m JOIN misiones_heroes mh ON mh.id_mision = m.id WHERE mh.id_hero = ?",
+        (1,), {"idx_misiones_heroes_hero"}),
+    "misiones_de_monstruo": (
+        "SELECT m.nombre FROM misiones m JOIN misiones_monstruos mm ON mm.id_mision = m.id WHERE mm.id_monstruo = ?",
+        (1,), {"idx_misiones_monstruos_monstruo"}),
+    "heroes_de_mision": (
+        "SELECT h.nombre FROM heroes h JOIN misiones_heroes mh ON mh.id_hero = h.id WHERE mh.id_mision = ?",
+        (1,), {"sqlite_autoindex_misiones_heroes_1"}),
+    "monstruos_por_tipo": (
+        "SELECT id, nombre FROM monstruos WHERE tipo = ?", ("Demonio",), {"idx_monstruos_tipo"}),
+    "misiones_por_dificultad": (
+        "SELECT id, nombre FROM misiones WHERE dificultad >= ?", (10,), {"idx_misiones_dificultad"}),
+}
+
+
+def plan_de(conn, consulta, params=()):
+    return [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {consulta}", params)]
+
+
+def verificar_planes(conn):
+    """
+    Comprueba que ninguna consulta canónica recorre una tabla completa
+    y que cada una usa los índices esperados. Lanza AssertionError si no.
+    """
+    for nombre, (consulta, params, indices) in CONSULTAS_CANONICAS.items():
+        plan = plan_de(conn, consulta, params)
+        detalle = "\n    ".join(plan)
+        escaneos = [paso for paso in plan if paso.startswith("SCAN")]
+        assert not escaneos, f"{nombre}: recorre tablas completas\n    {detalle}"
+        faltantes = {i for i in indices if not any(i in paso for paso in plan)}
+        assert not faltantes, f"{nombre}: no usa {sorted(faltantes)}\n    {detalle}"
+        print(f"✅ {nombre}\n    {detalle}")
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_1_1.py [n_heroes_y_misiones] [archivo.db]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    conn = conectar(sys.argv[2] if len(sys.argv) > 2 else ":memory:")
+
+    inicio = time.perf_counter()
+    generar_datos(conn, n_heroes=n, n_misiones=n, n_monstruos=max(10, n // 100))
+    print(f"📦 {n} héroes/misiones generados en {time.perf_counter() - inicio:.1f}s")
+
+    verificar_planes(conn)
+
+    inicio = time.perf_counter()
+    filas = conn.execute(CONSULTA_DRAGONES, ("Dragón", 8)).fetchall()
+    print(f"🐉 {len(filas)} filas en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    conn.close()
@@ -0,0 +1,356 @@
+import sys
+import time
+
+from Problema_1 import conectar
+from Problema_1_1 import generar_datos, plan_de
+
+
+# ==========================
+# TABLAS DE RESUMEN
+# ==========================
+# Agregados materializados que mantienen los triggers. Los tableros leen de
+# aquí en lugar de repetir los JOIN de cinco tablas en cada consulta.
+TABLAS_RESUMEN = """
+CREATE TABLE IF NOT EXISTS resumen_heroes (
+    id_hero INTEGER PRIMARY KEY,
+    misiones INTEGER NOT NULL DEFAULT 0,
+    recompensa_total INTEGER NOT NULL DEFAULT 0,
+    suma_dificultad INTEGER NOT NULL DEFAULT 0
+);
+-- El ranking recorre este índice en orden y se detiene en LIMIT (sin ordenar nada);
+-- los héroes sin misiones no entran
+DROP INDEX IF EXISTS idx_resumen_heroes_recompensa;
+CREATE INDEX IF NOT EXISTS idx_resumen_heroes_ranking
+    ON resumen_heroes (recompensa_total DESC, id_hero) WHERE misiones > 0;
+
+CREATE TABLE IF NOT EXISTS resumen_clases (
+    clase TEXT PRIMARY KEY,
+    participaciones INTEGER NOT NULL DEFAULT 0,
+    suma_dificultad INTEGER NOT NULL DEFAULT 0
+);
+
+-- Cuántos monstruos de cada tipo hay en cada misión; permite contar misiones
+-- distintas por tipo sin recorrer misiones_monstruos.
+CREATE TABLE IF NOT EXISTS mision_tipo (
+    tipo TEXT NOT NULL,
+    id_mision INTEGER NOT NULL,
+    encuentros INTEGER NOT NULL,
+    PRIMARY KEY (tipo, id_mision)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS resumen_tipos (
+    tipo TEXT PRIMARY KEY,
+    misiones INTEGER NOT NULL DEFAULT 0,
+    encuentros INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+# ==========================
+# TRIGGERS
+# ==========================
+# Cuerpos para alta/baja de una fila de relación; {f} es NEW u OLD.
+_ALTA_HEROE = """
+    INSERT INTO resumen_heroes (id_hero, misiones, recompensa_total, suma_dificultad)
+    SELECT {f}.id_hero, 1, recompensa, dificultad FROM misiones WHERE id = {f}.id_mision
+    ON CONFLICT (id_hero) DO UPDATE SET
+        misiones = misiones + 1,
+        recompensa_total = recompensa_total + excluded.recompensa_total,
+        suma_dificultad = suma_dificultad + excluded.suma_dificultad;
+    INSERT INTO resumen_clases (clase, participaciones, suma_dificultad)
+    SELECT h.clase, 1, m.dificultad FROM heroes h, misiones m
+    WHERE h.id = {f}.id_hero AND m.id = {f}.id_mision
+    ON CONFLICT (clase) DO UPDATE SET
+        participaciones = participaciones + 1,
+        suma_dificultad = suma_dificultad + excluded.suma_dificultad;
+"""
+
+_BAJA_HEROE = """
+    UPDATE resumen_heroes SET
+        misiones = misiones - 1,
+        recompensa_total = recompensa_total - (SELECT recompensa FROM misiones WHERE id = {f}.id_mision),
+        suma_dificultad = suma_dificultad - (SELECT dificultad FROM misiones WHERE id = {f}.id_mision)
+    WHERE id_hero = {f}.id_hero;
+    UPDATE resumen_clases SET
+        participaciones = participaciones - 1,
+        suma_dificultad = suma_dificultad - (SELECT dificultad FROM misiones WHERE id = {f}.id_mision)
+    WHERE clase = (SELECT clase FROM heroes WHERE id = {f}.id_hero);
+"""
+
+_ALTA_MONSTRUO = """
+    INSERT INTO mision_tipo (tipo, id_mision, encuentros)
+    SELECT tipo, {f}.id_mision, 1 FROM monstruos WHERE id = {f}.id_monstruo
+    ON CONFLICT (tipo, id_mision) DO UPDATE SET encuentros = encuentros + 1;
+    INSERT INTO resumen_tipos (tipo, misiones, encuentros)
+    SELECT tipo, encuentros = 1, 1 FROM mision_tipo
+    WHERE tipo = (SELECT tipo FROM monstruos WHERE id = {f}.id_monstruo) AND id_mision = {f}.id_mision
+    ON CONFLICT (tipo) DO UPDATE SET
+        misiones = misiones + excluded.misiones,
+        encuentros = encuentros + 1;
+"""
+
+_BAJA_MONSTRUO = """
+    UPDATE mision_tipo SET encuentros = encuentros - 1
+    WHERE tipo = (SELECT tipo FROM monstruos WHERE id = {f}.id_monstruo) AND id_mision = {f}.id_mision;
+    UPDATE resumen_tipos SET
+        encuentros = encuentros - 1,
+        misiones = misiones - (SELECT COUNT(*) FROM mision_tipo
+                               WHERE tipo = resumen_tipos.tipo AND id_mision = {f}.id_mision AND encuentros = 0)
+    WHERE tipo = (SELECT tipo FROM monstruos WHERE id = {f}.id_monstruo);
+    DELETE FROM mision_tipo
+    WHERE tipo = (SELECT tipo FROM monstruos WHERE id = {f}.id_monstruo) AND id_mision = {f}.id_mision
+      AND encuentros = 0;
+"""
+
+_RECALCULAR_TIPO = """
+    INSERT INTO resumen_tipos (tipo, misiones, encuentros)
+    SELECT {t}, COUNT(*), COALESCE(SUM(encuentros), 0) FROM mision_tipo WHERE tipo = {t}
+    ON CONFLICT (tipo) DO UPDATE SET misiones = excluded.misiones, encuentros = excluded.encuentros;
+"""
+
+TRIGGERS = {
+    "trg_mh_insert": "AFTER INSERT ON misiones_heroes FOR EACH ROW",
+    "trg_mh_delete": "AFTER DELETE ON misiones_heroes FOR EACH ROW",
+    "trg_mh_update": "AFTER UPDATE ON misiones_heroes FOR EACH ROW",
+    "trg_mm_insert": "AFTER INSERT ON misiones_monstruos FOR EACH ROW",
+    "trg_mm_delete": "AFTER DELETE ON misiones_monstruos FOR EACH ROW",
+    "trg_mm_update": "AFTER UPDATE ON misiones_monstruos FOR EACH ROW",
+    "trg_misiones_update": "AFTER UPDATE OF recompensa, dificultad ON misiones FOR EACH ROW",
+    "trg_heroes_clase": "AFTER UPDATE OF clase ON heroes FOR EACH ROW WHEN OLD.clase != NEW.clase",
+    "trg_monstruos_tipo": "AFTER UPDATE OF tipo ON monstruos FOR EACH ROW WHEN OLD.tipo != NEW.tipo",
+    # Con ON DELETE CASCADE las filas hijas se borran cuando el padre ya no
+    # existe; se eliminan antes para que los triggers de relación lo encuentren.
+    "trg_heroes_delete": "BEFORE DELETE ON heroes FOR EACH ROW",
+    "trg_misiones_delete": "BEFORE DELETE ON misiones FOR EACH ROW",
+    "trg_monstruos_delete": "BEFORE DELETE ON monstruos FOR EACH ROW",
+}
+
+CUERPOS = {
+    "trg_mh_insert": _ALTA_HEROE.format(f="NEW"),
+    "trg_mh_delete": _BAJA_HEROE.format(f="OLD"),
+    "trg_mh_update": _BAJA_HEROE.format(f="OLD") + _ALTA_HEROE.format(f="NEW"),
+    "trg_mm_insert": _ALTA_MONSTRUO.format(f="NEW"),
+    "trg_mm_delete": _BAJA_MONSTRUO.format(f="OLD"),
+    "trg_mm_update": _BAJA_MONSTRUO.format(f="OLD") + _ALTA_MONSTRUO.format(f="NEW"),
+    "trg_misiones_update": """
+    UPDATE resumen_heroes SET
+        recompensa_total = recompensa_total + NEW.recompensa - OLD.recompensa,
+        suma_dificultad = suma_dificultad + NEW.dificultad - OLD.dificultad
+    WHERE id_hero IN (SELECT id_hero FROM misiones_heroes WHERE id_mision = NEW.id);
+    UPDATE resumen_clases SET
+        suma_dificultad = suma_dificultad + (NEW.dificultad - OLD.dificultad) * (
+            SELECT COUNT(*) FROM misiones_heroes mh JOIN heroes h ON h.id = mh.id_hero
+            WHERE mh.id_mision = NEW.id AND h.clase = resumen_clases.clase)
+    WHERE NEW.dificultad != OLD.dificultad;
+""",
+    "trg_heroes_clase": """
+    UPDATE resumen_clases SET
+        participaciones = participaciones - (SELECT misiones FROM resumen_heroes WHERE id_hero = NEW.id),
+        suma_dificultad = suma_dificultad - (SELECT suma_dificultad FROM resumen_heroes WHERE id_hero = NEW.id)
+    WHERE clase = OLD.clase AND EXISTS (SELECT 1 FROM resumen_heroes WHERE id_hero = NEW.id);
+    INSERT INTO resumen_clases (clase, participaciones, suma_dificultad)
+    SELECT NEW.clase, misiones, suma_dificultad FROM resumen_heroes WHERE id_hero = NEW.id
+    ON CONFLICT (clase) DO UPDATE SET
+        participaciones = participaciones + excluded.participaciones,
+        suma_dificultad = suma_dificultad + excluded.suma_dificultad;
+""",
+    "trg_monstruos_tipo": """
+    UPDATE mision_tipo SET encuentros = encuentros - 1
+    WHERE tipo = OLD.tipo AND id_mision IN (SELECT id_mision FROM misiones_monstruos WHERE id_monstruo = NEW.id);
+    DELETE FROM mision_tipo WHERE tipo = OLD.tipo AND encuentros = 0;
+    INSERT INTO mision_tipo (tipo, id_mision, encuentros)
+    SELECT NEW.tipo, id_mision, 1 FROM misiones_monstruos WHERE id_monstruo = NEW.id
+    ON CONFLICT (tipo, id_mision) DO UPDATE SET encuentros = encuentros + 1;
+""" + _RECALCULAR_TIPO.format(t="OLD.tipo") + _RECALCULAR_TIPO.format(t="NEW.tipo"),
+    "trg_heroes_delete": """
+    DELETE FROM misiones_heroes WHERE id_hero = OLD.id;
+    DELETE FROM resumen_heroes WHERE id_hero = OLD.id;
+""",
+    "trg_misiones_delete": """
+    DELETE FROM misiones_heroes WHERE id_mision = OLD.id;
+    DELETE FROM misiones_monstruos WHERE id_mision = OLD.id;
+""",
+    "trg_monstruos_delete": """
+    DELETE FROM misiones_monstruos WHERE id_monstruo = OLD.id;
+""",
+}
+
+
+def instalar_resumenes(conn):
+    """Crea las tablas de resumen y sus triggers, y las llena con los datos actuales."""
+    conn.executescript(TABLAS_RESUMEN)
+    for nombre, evento in TRIGGERS.items():
+        conn.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        conn.execute(f"CREATE TRIGGER {nombre} {evento} BEGIN {CUERPOS[nombre]} END")
+    reconstruir_resumenes(conn)
+
+
+def reconstruir_resumenes(conn):
+    """Recalcula todos los agregados desde cero (tras cargas masivas o para reparar)."""
+    with conn:
+        conn.execute("DELETE FROM resumen_heroes")
+        conn.execute("""
+            INSERT INTO resumen_heroes (id_hero, misiones, recompensa_total, suma_dificultad)
+            SELECT mh.id_hero, COUNT(*), SUM(m.recompensa), SUM(m.dificultad)
+            FROM misiones_heroes mh JOIN misiones m ON m.id = mh.id_mision
+            GROUP BY mh.id_hero
+        """)
+        conn.execute("DELETE FROM resumen_clases")
+        conn.execute("""
+            INSERT INTO resumen_clases (clase, participaciones, suma_dificultad)
+            SELECT h.clase, SUM(r.misiones), SUM(r.suma_dificultad)
+            FROM resumen_heroes r JOIN heroes h ON h.id = r.id_hero
+            GROUP BY h.clase
+        """)
+        conn.execute("DELETE FROM mision_tipo")
+        conn.execute("""
+            INSERT INTO mision_tipo (tipo, id_mision, encuentros)
+            SELECT mon.tipo, mm.id_mision, COUNT(*)
+            FROM misiones_monstruos mm JOIN monstruos mon ON mon.id = mm.id_monstruo
+            GROUP BY mon.tipo, mm.id_mision
+        """)
+        conn.execute("DELETE FROM resumen_tipos")
+        conn.execute("""
+            INSERT INTO resumen_tipos (tipo, misiones, encuentros)
+            SELECT tipo, COUNT(*), SUM(encuentros) FROM mision_tipo GROUP BY tipo
+        """)
+
+
+# ==========================
+# REPORTES
+# ==========================
+# CROSS JOIN fija resumen_heroes como tabla externa: se lee en el orden de
+# idx_resumen_heroes_ranking y cada fila busca su héroe por clave primaria.
+# `misiones > 0` (como en el índice parcial) descarta a quien perdió todas sus misiones.
+CONSULTA_RANKING = """
+    SELECT h.id, h.nombre, h.clase, r.recompensa_total, r.misiones
+    FROM resumen_heroes r CROSS JOIN heroes h ON h.id = r.id_hero
+    WHERE r.misiones > 0 {filtro} ORDER BY r.recompensa_total DESC, r.id_hero LIMIT ?
+"""
+
+
+def ranking_recompensas(conn, limite=10, clase=None, materializado=True):
+    """Héroes con mayor recompensa acumulada: (id, nombre, clase, recompensa, misiones)."""
+    filtro, params = ("AND h.clase = ?", [clase]) if clase else ("", [])
+    if materializado:
+        consulta = CONSULTA_RANKING.format(filtro=filtro)
+    else:
+        consulta = f"""
+            SELECT h.id, h.nombre, h.clase, SUM(m.recompensa) AS total, COUNT(*)
+            FROM heroes h
+            JOIN misiones_heroes mh ON mh.id_hero = h.id
+            JOIN misiones m ON m.id = mh.id_mision
+            WHERE 1 {filtro} GROUP BY h.id ORDER BY total DESC, h.id LIMIT ?
+        """
+    return conn.execute(consulta, params + [limite]).fetchall()
+
+
+def misiones_por_tipo(conn, tipos=None, materializado=True):
+    """Misiones distintas en las que aparece cada tipo de monstruo: (tipo, misiones)."""
+    tipos = list(tipos or [])
+    filtro = f"WHERE tipo IN ({', '.join('?' * len(tipos))})" if tipos else ""
+    if materializado:
+        consulta = f"""
+            SELECT tipo, misiones FROM resumen_tipos {filtro or "WHERE 1"} AND misiones > 0
+            ORDER BY misiones DESC, tipo
+        """
+    else:
+        consulta = f"""
+            SELECT tipo, COUNT(DISTINCT mm.id_mision) AS misiones
+            FROM misiones_monstruos mm JOIN monstruos mon ON mon.id = mm.id_monstruo
+            {filtro} GROUP BY tipo ORDER BY misiones DESC, tipo
+        """
+    return conn.execute(consulta, tipos).fetchall()
+
+
+def dificultad_por_clase(conn, clases=None, materializado=True):
+    """Dificultad media de las misiones por clase de héroe: (clase, participaciones, promedio)."""
+    clases = list(clases or [])
+    filtro = f"WHERE clase IN ({', '.join('?' * len(clases))})" if clases else ""
+    if materializado:
+        consulta = f"""
+            SELECT clase, participaciones, ROUND(1.0 * suma_dificultad / participaciones, 2)
+            FROM resumen_clases {filtro or "WHERE 1"} AND participaciones > 0 ORDER BY clase
+        """
+    else:
+        consulta = f"""
+            SELECT clase, COUNT(*), ROUND(AVG(m.dificultad), 2)
+            FROM heroes h
+            JOIN misiones_heroes mh ON mh.id_hero = h.id
+            JOIN misiones m ON m.id = mh.id_mision
+            {filtro} GROUP BY clase ORDER BY clase
+        """
+    return conn.execute(consulta, clases).fetchall()
+
+
+def verificar_plan_ranking(conn):
+    """
+    Comprueba que el ranking materializado usa idx_resumen_heroes_ranking y no
+    ordena en una tabla temporal (con y sin filtro de clase). Lanza AssertionError si no.
+    """
+    for filtro, params in (("", [10]), ("AND h.clase = ?", ["Mago", 10])):
+        plan = plan_de(conn, CONSULTA_RANKING.format(filtro=filtro), params)
+        detalle = "\n    ".join(plan)
+        assert any("idx_resumen_heroes_ranking" in paso for paso in plan), \
+            f"ranking_recompensas: no usa idx_resumen_heroes_ranking\n    {detalle}"
+        assert not any("TEMP B-TREE" in paso for paso in plan), \
+            f"ranking_recompensas: ordena en una tabla temporal\n    {detalle}"
+        print(f"✅ ranking_recompensas {filtro or '(todas las clases)'}\n    {detalle}")
+
+
+def verificar_resumenes(conn):
+    """True si los agregados materializados coinciden con los calculados en vivo."""
+    return (
+        misiones_por_tipo(conn) == misiones_por_tipo(conn, materializado=False)
+        and dificultad_por_clase(conn) == dificultad_por_clase(conn, materializado=False)
+        and ranking_recompensas(conn, 50) == ranking_recompensas(conn, 50, materializado=False)
+    )
+
+
+# ==========================
+# BENCHMARK
+# ==========================
+def _cronometrar(nombre, funcion, repeticiones=5):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    ms = (time.perf_counter() - inicio) / repeticiones * 1000
+    print(f"  {nombre:<32} {ms:10.2f} ms")
+    return ms
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_1_2.py [n_heroes_y_misiones]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    conn = conectar(":memory:")
+    generar_datos(conn, n_heroes=n, n_misiones=n, n_monstruos=max(10, n // 100))
+
+    inicio = time.perf_counter()
+    instalar_resumenes(conn)
+    print(f"📦 {n} héroes/misiones; resúmenes construidos en {time.perf_counter() - inicio:.1f}s")
+    verificar_plan_ranking(conn)
+
+    print("⏱ Reportes (en vivo vs materializado):")
+    for nombre, reporte in [("ranking_recompensas", ranking_recompensas),
+                            ("misiones_por_tipo", misiones_por_tipo),
+                            ("dificultad_por_clase", dificultad_por_clase)]:
+        vivo = _cronometrar(f"{nombre} (JOIN)", lambda: reporte(conn, materializado=False), 1)
+        resumen = _cronometrar(f"{nombre} (resumen)", lambda: reporte(conn))
+        print(f"  {'→ aceleración':<32} {vivo / max(resumen, 1e-6):10.0f}x")
+
+    # Costo de mantener los agregados en escritura
+    filas = [(m, h) for m in range(1, 10_001) for h in (n - m % 100, n - 200 - m % 100)]
+    inicio = time.perf_counter()
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO misiones_heroes VALUES (?, ?)", filas)
+    print(f"✍ {len(filas)} participaciones insertadas con triggers en {time.perf_counter() - inicio:.2f}s")
+
+    with conn:
+        conn.execute("UPDATE misiones SET recompensa = recompensa + 100, dificultad = 10 WHERE id <= 100")
+        conn.execute("UPDATE heroes SET clase = 'Mago' WHERE id <= 100")
+        conn.execute("UPDATE monstruos SET tipo = 'Dragón' WHERE id <= 5")
+        conn.execute("DELETE FROM misiones WHERE id BETWEEN 200 AND 300")
+        conn.execute("DELETE FROM heroes WHERE id BETWEEN 200 AND 300")
+        conn.execute("DELETE FROM monstruos WHERE id BETWEEN 6 AND 8")
+    print("✅ Resúmenes consistentes" if verificar_resumenes(conn) else "❌ Resúmenes desincronizados")
+    conn.close()
@@ -1,10 +1,13 @@
-import sqlite3
+from Problema_2_3 import iniciar
+
+# Perfilado opcional: PERFILAR=1 o --profile
+perfil = iniciar("problema_2")
 
 # ==========================
 # CONEXIÓN A LA BASE DE DATOS
 # ==========================
 def conectar():
-    return sqlite3.connect("biblioteca.db")
+    return perfil.conectar_sqlite("biblioteca.db")
 
 # ==========================
 # CREACIÓN DE TABLA
@@ -27,6 +30,7 @@ def crear_tabla():
 # ==========================
 # FUNCIONES CRUD
 # ==========================
+@perfil.cronometrar("accion")
 def agregar_libro():
     titulo = input("📖 Título: ")
     autor = input("✍ Autor: ")
@@ -41,6 +45,7 @@ def agregar_libro():
     conn.close()
     print("✅ Libro agregado correctamente.")
 
+@perfil.cronometrar("accion")
 def actualizar_libro():
     ver_libros()
     try:
@@ -65,6 +70,7 @@ def actualizar_libro():
     conn.close()
     print("✅ Libro actualizado correctamente.")
 
+@perfil.cronometrar("accion")
 def eliminar_libro():
     ver_libros()
     try:
@@ -80,6 +86,7 @@ def eliminar_libro():
     conn.close()
     print("🗑 Libro eliminado correctamente.")
 
+@perfil.cronometrar("accion")
 def ver_libros():
     conn = conectar()
     cursor = conn.cursor()
@@ -93,6 +100,7 @@ def ver_libros():
         print(f"ID: {libro[0]} | Título: {libro[1]} | Autor: {libro[2]} | Género: {libro[3]} | Estado: {libro[4]}")
     print("-" * 60)
 
+@perfil.cronometrar("accion")
 def buscar_libros():
     print("\n🔍 Buscar por:")
     print("1. Título")
@@ -0,0 +1,498 @@
+import importlib.util
+import os
+import sqlite3
+import sys
+import uuid
+from abc import ABC, abstractmethod
+
+from Problema_7_2 import ConstructorConsultas, escapar_like
+
+# Documento común a todos los backends:
+# {"id", "titulo", "autor", "genero", "estado"}  (id: el tipo propio de cada backend)
+CAMPOS = ("titulo", "autor", "genero", "estado")
+MODOS = ("prefijo", "contiene")
+
+# Destinos por defecto: exclusivos para benchmarks, nunca los datos de las apps
+BENCH_SQL_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///:memory:")
+BENCH_MONGO_BASE = "biblioteca_bench"
+BENCH_KEYDB_DB = int(os.getenv("KEYDB_BENCH_DB", 15))
+BENCH_PREFIJO = "bench:libro:"
+
+
+def _es_de_prueba(destino):
+    destino = str(destino).lower()
+    return "bench" in destino or ":memory:" in destino or "mode=memory" in destino
+
+
+# ==========================
+# INTERFAZ COMÚN
+# ==========================
+class BookRepository(ABC):
+    """
+    Operaciones de la biblioteca que todas las variantes (SQLite, SQLAlchemy,
+    MongoDB, KeyDB y Problema 10) saben hacer, con la misma firma y el mismo
+    documento. Las búsquedas no distinguen mayúsculas; `listar` ordena por título.
+    Un backend al que le falte una operación no se puede instanciar.
+    """
+
+    nombre = "base"
+    destino = ""  # base, colección o prefijo donde escribe el backend
+
+    def de_prueba(self):
+        """True si el destino es exclusivo para benchmarks (en memoria o con 'bench' en el nombre)."""
+        return _es_de_prueba(self.destino)
+
+    def agregar(self, doc):
+        """Guarda un libro nuevo y devuelve su id."""
+        return self.agregar_lote([doc])[0]
+
+    @abstractmethod
+    def agregar_lote(self, docs):
+        """Guarda muchos libros de una vez; devuelve sus ids en el mismo orden."""
+
+    @abstractmethod
+    def obtener(self, book_id):
+        """Libro por id, o None."""
+
+    @abstractmethod
+    def actualizar(self, book_id, cambios):
+        """Cambia solo los campos dados; devuelve True si el libro existía."""
+
+    @abstractmethod
+    def eliminar(self, book_id):
+        """Borra el libro; devuelve True si existía."""
+
+    @abstractmethod
+    def buscar(self, campo, q, modo="contiene", limite=50):
+        """Hasta `limite` libros cuyo campo empieza con q (prefijo) o lo contiene."""
+
+    @abstractmethod
+    def listar(self, limite=50, desde=0):
+        """Página de libros ordenados por título."""
+
+    def limpiar(self, destructivo=False):
+        """
+        Borra todos los libros del destino. Fuera de un destino de benchmark
+        se niega salvo con destructivo=True: vaciaría los datos de las apps.
+        """
+        if not destructivo and not self.de_prueba():
+            raise PermissionError(f"{self.nombre}: {self.destino} no es un destino de benchmark; "
+                                  f"use destructivo=True (--destructivo) para vaciarlo")
+        self._limpiar()
+
+    @abstractmethod
+    def _limpiar(self):
+        """Vacía el destino sin comprobaciones (lo llama limpiar)."""
+
+    def cerrar(self):
+        pass
+
+
+def _validar_busqueda(campo, modo):
+    if campo not in CAMPOS:
+        raise ValueError(f"Campo de búsqueda inválido: {campo}")
+    if modo not in MODOS:
+        raise ValueError(f"Modo de búsqueda inválido: {modo}")
+
+
+# ==========================
+# SQLITE (Problema_2 / Problema_7)
+# ==========================
+class SQLiteRepository(BookRepository):
+    nombre = "sqlite"
+    FILTRO = ConstructorConsultas("libros", columnas_texto=CAMPOS, columnas_rango=("id",),
+                                  seleccion="id, titulo, autor, genero, estado")
+
+    def __init__(self, ruta=":memory:"):
+        self.destino = ruta
+        self.conn = sqlite3.connect(ruta, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA cache_size = -64000")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS libros (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                titulo TEXT NOT NULL,
+                autor TEXT NOT NULL,
+                genero TEXT NOT NULL,
+                estado TEXT NOT NULL
+            )""")
+        for sentencia in self.FILTRO.indices():
+            self.conn.execute(sentencia)
+        self.conn.commit()
+
+    def agregar_lote(self, docs):
+        with self.conn:
+            return [self.conn.execute(
+                "INSERT INTO libros (titulo, autor, genero, estado) VALUES (?, ?, ?, ?)",
+                tuple(d[c] for c in CAMPOS)).lastrowid for d in docs]
+
+    def obtener(self, book_id):
+        fila = self.conn.execute("SELECT id, titulo, autor, genero, estado FROM libros WHERE id = ?",
+                                 (book_id,)).fetchone()
+        return dict(fila) if fila else None
+
+    def actualizar(self, book_id, cambios):
+        cambios = {c: v for c, v in cambios.items() if c in CAMPOS}
+        if not cambios:
+            return self.obtener(book_id) is not None
+        asignaciones = ", ".join(f"{c} = ?" for c in cambios)
+        with self.conn:
+            cursor = self.conn.execute(f"UPDATE libros SET {asignaciones} WHERE id = ?",
+                                       (*cambios.values(), book_id))
+        return cursor.rowcount > 0
+
+    def eliminar(self, book_id):
+        with self.conn:
+            return self.conn.execute("DELETE FROM libros WHERE id = ?", (book_id,)).rowcount > 0
+
+    def buscar(self, campo, q, modo="contiene", limite=50):
+        _validar_busqueda(campo, modo)
+        sql, params = self.FILTRO.compilar([(campo, modo, q)], limite=limite)
+        return [dict(f) for f in self.conn.execute(sql, params)]
+
+    def listar(self, limite=50, desde=0):
+        filas = self.conn.execute(
+            "SELECT id, titulo, autor, genero, estado FROM libros "
+            "ORDER BY titulo COLLATE NOCASE LIMIT ? OFFSET ?", (limite, desde))
+        return [dict(f) for f in filas]
+
+    def _limpiar(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM libros")
+
+    def cerrar(self):
+        self.conn.close()
+
+
+# ==========================
+# SQLALCHEMY / MARIADB (Problema_3)
+# ==========================
+class SQLAlchemyRepository(BookRepository):
+    nombre = "sqlalchemy"
+
+    def __init__(self, url=None):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from Problema_3 import Base, Libro, EstadoLectura
+
+        self.Libro, self.Estado = Libro, EstadoLectura
+        url = url or BENCH_SQL_URL
+        self.engine = create_engine(url, pool_pre_ping=not url.startswith("sqlite"))
+        self.destino = self.engine.url.render_as_string(hide_password=True)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(self.engine, expire_on_commit=False)
+
+    def _doc(self, libro):
+        return {"id": libro.id, "titulo": libro.titulo, "autor": libro.autor,
+                "genero": libro.genero, "estado": libro.estado_lectura.value}
+
+    def _fila(self, doc):
+        fila = {c: doc[c] for c in ("titulo", "autor", "genero") if c in doc}
+        if "estado" in doc:
+            fila["estado_lectura"] = self.Estado(doc["estado"])
+        return fila
+
+    def agregar_lote(self, docs):
+        libros = [self.Libro(**self._fila(d)) for d in docs]
+        with self.Session.begin() as session:
+            session.add_all(libros)
+        return [libro.id for libro in libros]
+
+    def obtener(self, book_id):
+        with self.Session() as session:
+            libro = session.get(self.Libro, book_id)
+            return self._doc(libro) if libro else None
+
+    def actualizar(self, book_id, cambios):
+        from sqlalchemy import update
+
+        valores = self._fila({c: v for c, v in cambios.items() if c in CAMPOS})
+        with self.Session.begin() as session:
+            if not valores:
+                return session.get(self.Libro, book_id) is not None
+            resultado = session.execute(update(self.Libro).where(self.Libro.id == book_id).values(**valores))
+            return resultado.rowcount > 0
+
+    def eliminar(self, book_id):
+        from sqlalchemy import delete
+
+        with self.Session.begin() as session:
+            return session.execute(delete(self.Libro).where(self.Libro.id == book_id)).rowcount > 0
+
+    def buscar(self, campo, q, modo="contiene", limite=50):
+        from sqlalchemy import select
+
+        _validar_busqueda(campo, modo)
+        columna = getattr(self.Libro, "estado_lectura" if campo == "estado" else campo)
+        patron = escapar_like(q) + "%" if modo == "prefijo" else "%" + escapar_like(q) + "%"
+        consulta = select(self.Libro).where(columna.ilike(patron, escape="\\")).limit(limite)
+        with self.Session() as session:
+            return [self._doc(libro) for libro in session.scalars(consulta)]
+
+    def listar(self, limite=50, desde=0):
+        from sqlalchemy import select
+
+        consulta = select(self.Libro).order_by(self.Libro.titulo).offset(desde).limit(limite)
+        with self.Session() as session:
+            return [self._doc(libro) for libro in session.scalars(consulta)]
+
+    def _limpiar(self):
+        from sqlalchemy import delete
+
+        with self.Session.begin() as session:
+            session.execute(delete(self.Libro))
+
+    def cerrar(self):
+        self.engine.dispose()
+
+
+# ==========================
+# MONGODB (Problema_4)
+# ==========================
+class MongoRepository(BookRepository):
+    nombre = "mongodb"
+
+    def __init__(self, uri=None, base=BENCH_MONGO_BASE, coleccion="libros"):
+        import re
+        from bson import ObjectId
+        from pymongo import ASCENDING, MongoClient
+
+        self._re, self._ObjectId = re, ObjectId
+        self.cliente = MongoClient(uri or os.getenv("MONGO_URI", "mongodb://localhost:27017"),
+                                   serverSelectionTimeoutMS=5000)
+        self.cliente.admin.command("ping")
+        self.col = self.cliente[base][coleccion]
+        self.destino = f"{base}.{coleccion}"
+        # Índice por campo: listar ordena por título sin ordenar en memoria
+        for campo in CAMPOS:
+            self.col.create_index([(campo, ASCENDING)])
+
+    def _id(self, book_id):
+        try:
+            return self._ObjectId(book_id)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _doc(d):
+        d["id"] = str(d.pop("_id"))
+        return d
+
+    def agregar_lote(self, docs):
+        resultado = self.col.insert_many([{c: d[c] for c in CAMPOS} for d in docs], ordered=False)
+        return [str(i) for i in resultado.inserted_ids]
+
+    def obtener(self, book_id):
+        d = self.col.find_one({"_id": self._id(book_id)})
+        return self._doc(d) if d else None
+
+    def actualizar(self, book_id, cambios):
+        cambios = {c: v for c, v in cambios.items() if c in CAMPOS}
+        filtro = {"_id": self._id(book_id)}
+        if not cambios:
+            return self.col.count_documents(filtro, limit=1) > 0
+        return self.col.update_one(filtro, {"$set": cambios}).matched_count > 0
+
+    def eliminar(self, book_id):
+        return self.col.delete_one({"_id": self._id(book_id)}).deleted_count > 0
+
+    def buscar(self, campo, q, modo="contiene", limite=50):
+        _validar_busqueda(campo, modo)
+        patron = self._re.escape(q)
+        # Con la opción "i" ni el prefijo anclado acota el índice: MongoDB revisa cada clave
+        patron = f"^{patron}" if modo == "prefijo" else patron
+        return [self._doc(d) for d in self.col.find({campo: {"$regex": patron, "$options": "i"}}).limit(limite)]
+
+    def listar(self, limite=50, desde=0):
+        return [self._doc(d) for d in self.col.find().sort("titulo", 1).skip(desde).limit(limite)]
+
+    def _limpiar(self):
+        self.col.delete_many({})
+
+    def cerrar(self):
+        self.cliente.close()
+
+
+# ==========================
+# KEYDB (Problema_5 / 6 / 8)
+# ==========================
+class KeyDBRepository(BookRepository):
+    """
+    Libros como hashes <prefijo><uuid> con el índice invertido de Problema_5_2.
+    Por defecto en la base KEYDB_BENCH_DB: el índice ocupa toda la base, así
+    que compartirla con las apps mezclaría (y al limpiar, borraría) el suyo.
+    """
+
+    nombre = "keydb"
+
+    def __init__(self, r=None, prefijo=BENCH_PREFIJO, db=None):
+        from Problema_5_1 import get_client
+
+        if r is None:
+            r = get_client(db=BENCH_KEYDB_DB if db is None else db)
+        self.r = r
+        self.db = int(r.connection_pool.connection_kwargs.get("db", 0))
+        self.prefijo = prefijo
+        self.destino = f"db {self.db} ({prefijo}*)"
+        self.r.ping()
+
+    def de_prueba(self):
+        return _es_de_prueba(self.prefijo) and self.db == BENCH_KEYDB_DB
+
+    def _key(self, book_id):
+        return f"{self.prefijo}{book_id}"
+
+    def agregar_lote(self, docs):
+        from Problema_5_1 import save_many, _lotes
+        from Problema_5_2 import _reindexar, terminos_de
+
+        nuevos = {}
+        for d in docs:
+            book_id = str(uuid.uuid4())
+            nuevos[self._key(book_id)] = {"id": book_id, **{c: d[c] for c in CAMPOS}, "version": 1}
+        save_many(self.r, nuevos)
+        for lote in _lotes(nuevos.values()):
+            pipe = self.r.pipeline(transaction=False)
+            for doc in lote:
+                _reindexar(self.r, doc["id"], 1, terminos_de(doc), pipe)
+            pipe.execute()
+        return [doc["id"] for doc in nuevos.values()]
+
+    def obtener(self, book_id):
+        return self.r.hgetall(self._key(book_id)) or None
+
+    def actualizar(self, book_id, cambios):
+        from Problema_5_2 import indexar
+
+        cambios = {c: v for c, v in cambios.items() if c in CAMPOS}
+        if not self.r.exists(self._key(book_id)):
+            return False
+        if cambios:
+            pipe = self.r.pipeline()
+            pipe.hset(self._key(book_id), mapping=cambios)
+            pipe.hincrby(self._key(book_id), "version", 1)
+            pipe.hgetall(self._key(book_id))
+            indexar(self.r, pipe.execute()[-1])
+        return True
+
+    def eliminar(self, book_id):
+        from Problema_5_2 import desindexar
+
+        borrado = self.r.delete(self._key(book_id)) > 0
+        desindexar(self.r, book_id)
+        return borrado
+
+    def buscar(self, campo, q, modo="contiene", limite=50):
+        from Problema_5_2 import buscar
+
+        _validar_busqueda(campo, modo)
+        return (buscar(self.r, campo, q, modo, prefijo=self.prefijo) or [])[:limite]
+
+    def listar(self, limite=50, desde=0):
+        from Problema_5_1 import get_many, scan_keys
+
+        docs = [d for d in get_many(self.r, scan_keys(self.r, f"{self.prefijo}*")) if isinstance(d, dict) and d]
+        docs.sort(key=lambda d: d.get("titulo", "").lower())
+        return docs[desde:desde + limite]
+
+    def _limpiar(self):
+        from Problema_5_1 import delete_many, scan_keys
+        from Problema_5_2 import reconstruir_indice
+
+        delete_many(self.r, scan_keys(self.r, f"{self.prefijo}*"))
+        reconstruir_indice(self.r, self.prefijo)  # índice vacío y marcado como listo
+
+
+# ==========================
+# PROBLEMA 10 (módulo db de la API REST)
+# ==========================
+def _cargar_problema10(nombre):
+    """Importa un archivo de la carpeta Problema 10 por su ruta, sin tocar sys.path."""
+    if nombre not in sys.modules:
+        ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Problema 10", f"{nombre}.py")
+        spec = importlib.util.spec_from_file_location(nombre, ruta)
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules[nombre] = modulo  # como hace import: registrado antes de ejecutarse
+        spec.loader.exec_module(modulo)
+    return sys.modules[nombre]
+
+
+class Problema10Repository(BookRepository):
+    """
+    Envuelve las funciones del módulo db de Problema 10 traduciendo los nombres
+    de campo. Por defecto usa una base SQLite en memoria compartida; `ruta`
+    permite medir el archivo WAL real.
+    """
+
+    nombre = "problema10"
+    A_INGLES = {"titulo": "title", "autor": "author", "genero": "genre"}
+
+    def __init__(self, ruta="file:biblioteca_p10?mode=memory&cache=shared"):
+        # models primero: db lo importa como Problema_10 cuando no existe el nombre lógico
+        _cargar_problema10("Problema_10")
+        db = _cargar_problema10("Problema_10_1")
+        db.DB_PATH = ruta
+        self.db = db
+        self.destino = ruta
+
+    def _entrada(self, doc):
+        datos = {self.A_INGLES[c]: v for c, v in doc.items() if c in self.A_INGLES}
+        if "estado" in doc:
+            datos["read"] = doc["estado"] == "Leído"
+        return datos
+
+    @staticmethod
+    def _doc(book):
+        return {"id": book.id, "titulo": book.title, "autor": book.author,
+                "genero": book.genre, "estado": "Leído" if book.read else "No leído"}
+
+    def agregar_lote(self, docs):
+        return [b.id for b in self.db.add_books(self._entrada(d) for d in docs)]
+
+    def obtener(self, book_id):
+        book = self.db.get_book(book_id)
+        return self._doc(book) if book else None
+
+    def actualizar(self, book_id, cambios):
+        return self.db.update_book(book_id, self._entrada(cambios)) is not None
+
+    def eliminar(self, book_id):
+        return self.db.delete_book(book_id) is not None
+
+    def buscar(self, campo, q, modo="contiene", limite=50):
+        _validar_busqueda(campo, modo)
+        # La API no tiene búsqueda: se filtra el listado completo, como haría un cliente
+        q = q.lower()
+        resultados = []
+        for book in self.db.list_books():
+            valor = self._doc(book)[campo].lower()
+            if valor.startswith(q) if modo == "prefijo" else q in valor:
+                resultados.append(self._doc(book))
+                if len(resultados) >= limite:
+                    break
+        return resultados
+
+    def listar(self, limite=50, desde=0):
+        libros = sorted(self.db.list_books(), key=lambda b: b.title.lower())
+        return [self._doc(b) for b in libros[desde:desde + limite]]
+
+    def _limpiar(self):
+        self.db.clear_books()
+
+
+BACKENDS = {
+    "sqlite": SQLiteRepository,
+    "sqlalchemy": SQLAlchemyRepository,
+    "mongodb": MongoRepository,
+    "keydb": KeyDBRepository,
+    "problema10": Problema10Repository,
+}
+
+
+def crear_repositorio(nombre, **opciones):
+    """Instancia el backend por nombre; las dependencias de cada uno se importan aquí."""
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {nombre}. Opciones: {', '.join(BACKENDS)}")
+    return BACKENDS[nombre](**opciones)
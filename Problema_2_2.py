@@ -0,0 +1,127 @@
+import argparse
+import json
+import random
+import time
+
+from Problema_2_1 import BACKENDS, crear_repositorio
+
+PALABRAS = ["dragón", "noche", "mar", "ciudad", "sombra", "río", "tiempo", "luz", "bosque", "guerra",
+            "amor", "viaje", "silencio", "fuego", "camino", "reino", "memoria", "jardín", "torre", "invierno"]
+GENEROS = ["Novela", "Ensayo", "Poesía", "Fantasía", "Historia", "Ciencia"]
+ESTADOS = ["Leído", "No leído"]  # los únicos que admite el Enum de Problema_3
+LOTE = 5_000
+
+
+# ==========================
+# DATOS Y CARGAS DE TRABAJO
+# ==========================
+def generar_libros(n, semilla=7):
+    rnd = random.Random(semilla)
+    for i in range(n):
+        yield {"titulo": f"{rnd.choice(PALABRAS).capitalize()} {rnd.choice(PALABRAS)} {i}",
+               "autor": f"Autor {rnd.randint(1, max(1, n // 20))}",
+               "genero": rnd.choice(GENEROS), "estado": rnd.choice(ESTADOS)}
+
+
+def _medir(funcion, argumentos):
+    latencias = []
+    inicio = time.perf_counter()
+    for args in argumentos:
+        t = time.perf_counter()
+        funcion(*args)
+        latencias.append(time.perf_counter() - t)
+    return latencias, time.perf_counter() - inicio
+
+
+def _resumen(operacion, latencias, total, unidades=None):
+    latencias = sorted(latencias)
+    p = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000 if latencias else 0.0
+    unidades = unidades or len(latencias)
+    return {"operacion": operacion, "operaciones": unidades, "segundos": round(total, 3),
+            "por_segundo": round(unidades / total, 1) if total else 0.0,
+            "p50_ms": round(p(0.50), 3), "p95_ms": round(p(0.95), 3), "p99_ms": round(p(0.99), 3)}
+
+
+def ejecutar(repo, n, operaciones, semilla=7, destructivo=False):
+    """Corre la misma secuencia de cargas sobre `repo` con n libros; devuelve una fila por operación."""
+    rnd = random.Random(semilla)
+    repo.limpiar(destructivo)
+    resultados = []
+
+    # Carga masiva por lotes: la latencia es por lote, el ritmo es por libro
+    ids, lote, latencias = [], [], []
+    inicio = time.perf_counter()
+    for libro in generar_libros(n, semilla):
+        lote.append(libro)
+        if len(lote) == LOTE:
+            t = time.perf_counter()
+            ids += repo.agregar_lote(lote)
+            latencias.append(time.perf_counter() - t)
+            lote = []
+    if lote:
+        t = time.perf_counter()
+        ids += repo.agregar_lote(lote)
+        latencias.append(time.perf_counter() - t)
+    resultados.append(_resumen("carga_masiva", latencias, time.perf_counter() - inicio, unidades=n))
+
+    muestra = [rnd.choice(ids) for _ in range(operaciones)]
+    resultados.append(_resumen("obtener", *_medir(repo.obtener, [(i,) for i in muestra])))
+    resultados.append(_resumen("actualizar", *_medir(
+        repo.actualizar, [(i, {"estado": rnd.choice(ESTADOS)}) for i in muestra])))
+    resultados.append(_resumen("buscar_prefijo", *_medir(
+        repo.buscar, [("titulo", rnd.choice(PALABRAS)[:3], "prefijo") for _ in range(operaciones)])))
+    resultados.append(_resumen("buscar_subcadena", *_medir(
+        repo.buscar, [("titulo", f"{rnd.choice(PALABRAS)} {rnd.choice(PALABRAS)[:2]}", "contiene")
+                      for _ in range(operaciones)])))
+    paginas = max(1, operaciones // 10)  # listar suele ser la operación más cara
+    resultados.append(_resumen("listar", *_medir(
+        repo.listar, [(50, rnd.randrange(0, max(1, n - 50), 50) if i % 2 else 0) for i in range(paginas)])))
+    return resultados
+
+
+# ==========================
+# REPORTE
+# ==========================
+def imprimir(backend, n, filas):
+    print(f"\n📊 {backend} — {n:,} libros")
+    print(f"{'operación':18}{'ops':>9}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for f in filas:
+        print(f"{f['operacion']:18}{f['operaciones']:>9,}{f['por_segundo']:>12,.0f}"
+              f"{f['p50_ms']:>10.3f}{f['p95_ms']:>10.3f}{f['p99_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mismas cargas de trabajo sobre cada backend de la biblioteca")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help=f"lista separada por comas ({', '.join(BACKENDS)})")
+    parser.add_argument("--tamanos", default="10000,100000,1000000", help="número de libros por corrida")
+    parser.add_argument("--operaciones", type=int, default=1000, help="operaciones medidas por tipo")
+    parser.add_argument("--salida", help="archivo JSON con todos los resultados")
+    parser.add_argument("--destructivo", action="store_true",
+                        help="permite vaciar destinos que no son de benchmark (¡borra los datos de las apps!)")
+    args = parser.parse_args()
+
+    todos = []
+    for backend in args.backends.split(","):
+        try:
+            repo = crear_repositorio(backend.strip())
+        except Exception as e:  # driver no instalado o servidor no disponible: se omite
+            print(f"⚠️ {backend}: omitido ({type(e).__name__}: {e})")
+            continue
+        if not repo.de_prueba() and not args.destructivo:
+            print(f"⚠️ {backend}: omitido ({repo.destino} no es un destino de benchmark; use --destructivo)")
+            repo.cerrar()
+            continue
+        try:
+            for n in (int(t) for t in args.tamanos.split(",")):
+                filas = ejecutar(repo, n, args.operaciones, destructivo=args.destructivo)
+                imprimir(backend, n, filas)
+                todos += [{"backend": backend, "libros": n, **f} for f in filas]
+            repo.limpiar(args.destructivo)
+        finally:
+            repo.cerrar()
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(todos, archivo, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados guardados en {args.salida}")
@@ -0,0 +1,272 @@
+import atexit
+import builtins
+import cProfile
+import functools
+import os
+import pstats
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime
+
+# Se activa con PERFILAR=1 o pasando --profile / --perfil al programa
+VARIABLE = "PERFILAR"
+BANDERAS = ("--profile", "--perfil")
+_NULO = nullcontext()
+
+
+def solicitado(argv=None):
+    """True si se pidió perfilar; quita la bandera de argv para no confundir al programa."""
+    argv = sys.argv if argv is None else argv
+    pedido = False
+    for bandera in BANDERAS:
+        while bandera in argv:
+            argv.remove(bandera)
+            pedido = True
+    return pedido or os.getenv(VARIABLE, "").lower() in ("1", "true", "si", "sí", "yes")
+
+
+def _verbo(sql):
+    partes = sql.split(None, 1)
+    return partes[0].upper() if partes else "?"
+
+
+def _percentil(valores, q):
+    return valores[min(len(valores) - 1, int(q * len(valores)))]
+
+
+# ==========================
+# TRAMOS MEDIDOS
+# ==========================
+class _Tramo:
+    """Un bloque medido. Descuenta el tiempo esperando input() y deja el tiempo propio para el flamegraph."""
+
+    __slots__ = ("perfil", "clave", "inicio", "hijos", "espera", "consultas")
+
+    def __init__(self, perfil, clave):
+        self.perfil = perfil
+        self.clave = clave
+
+    def __enter__(self):
+        p = self.perfil
+        self.hijos = 0.0
+        self.espera = p.espera
+        self.consultas = p.consultas_totales()
+        p._pila.append(self)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        p = self.perfil
+        duracion = time.perf_counter() - self.inicio - (p.espera - self.espera)
+        pila = ";".join(t.clave for t in p._pila)
+        p._pila.pop()
+        if p._pila:
+            p._pila[-1].hijos += duracion
+        p.latencias[self.clave].append(duracion)
+        p.consultas[self.clave].append(p.consultas_totales() - self.consultas)
+        p.folded[pila] += max(0.0, duracion - self.hijos)
+
+
+# ==========================
+# PERFILADOR
+# ==========================
+class Perfilador:
+    """
+    Instrumentación opcional para las apps de consola (Problema_2, Problema_4,
+    Problema_5, Parcial 1). Desactivado, cada gancho devuelve el objeto original
+    o un contexto vacío, así que no cuesta nada. Activado:
+    - mide cada llamada al almacenamiento (SQLite, MongoDB, KeyDB) y cada
+      acción del usuario, sin contar el tiempo que se pasa esperando input(),
+    - cuenta consultas / viajes al servidor por acción,
+    - perfila toda la sesión con cProfile y al salir deja <prefijo>.pstats y
+      <prefijo>.folded (pilas colapsadas para flamegraph.pl o speedscope),
+    - imprime un resumen de latencias por operación.
+    """
+
+    def __init__(self, app, activo):
+        self.app = app
+        self.activo = activo
+        self.latencias = defaultdict(list)
+        self.consultas = defaultdict(list)
+        self.folded = defaultdict(float)
+        self.espera = 0.0
+        self.fuentes = []  # contadores externos de viajes (p. ej. Problema_5_1.round_trips)
+        self._consultas = 0
+        self._pila = []
+        if activo:
+            self._input = builtins.input
+            builtins.input = self._input_medido
+            self.perfil = cProfile.Profile()
+            self.perfil.enable()
+            atexit.register(self.cerrar)
+            print(f"⏱️ Perfilado activo para {app}")
+
+    def _input_medido(self, *args):
+        inicio = time.perf_counter()
+        try:
+            return self._input(*args)
+        finally:
+            self.espera += time.perf_counter() - inicio
+
+    # ---------- ganchos genéricos ----------
+    def medir(self, categoria, nombre):
+        return _Tramo(self, f"{categoria}:{nombre}") if self.activo else _NULO
+
+    def cronometrar(self, categoria, nombre=None):
+        """Decorador: mide cada llamada de la función. Desactivado devuelve la función intacta."""
+        def decorador(funcion):
+            if not self.activo:
+                return funcion
+            clave = nombre or funcion.__name__
+
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self.medir(categoria, clave):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def contar_consulta(self, n=1):
+        self._consultas += n
+
+    def consultas_totales(self):
+        return self._consultas + sum(fuente() for fuente in self.fuentes)
+
+    def registrar(self, categoria, nombre, segundos):
+        """Latencia medida por otro (p. ej. el driver de MongoDB) dentro del tramo actual."""
+        clave = f"{categoria}:{nombre}"
+        self.latencias[clave].append(segundos)
+        self.consultas[clave].append(1)
+        self.folded[";".join([t.clave for t in self._pila] + [clave])] += segundos
+        if self._pila:
+            self._pila[-1].hijos += segundos
+
+    # ---------- almacenamiento ----------
+    def conectar_sqlite(self, ruta, **opciones):
+        """sqlite3.connect que, si está activo, mide execute/executemany/fetch/commit y cuenta sentencias."""
+        if not self.activo:
+            return sqlite3.connect(ruta, **opciones)
+        conexion = type("ConexionSQLite", (_ConexionSQLite,), {"perfil": self})
+        conn = sqlite3.connect(ruta, factory=conexion, **opciones)
+        conn.set_trace_callback(lambda _sql: self.contar_consulta())
+        return conn
+
+    def listeners_mongo(self):
+        """event_listeners para MongoClient: cada comando cuenta como consulta con la duración del driver."""
+        if not self.activo:
+            return []
+        from pymongo import monitoring
+
+        perfil = self
+
+        class Escucha(monitoring.CommandListener):
+            def started(self, evento):
+                perfil.contar_consulta()
+
+            def succeeded(self, evento):
+                perfil.registrar("mongo", evento.command_name, evento.duration_micros / 1e6)
+
+            def failed(self, evento):
+                perfil.registrar("mongo", f"{evento.command_name} (error)", evento.duration_micros / 1e6)
+
+        return [Escucha()]
+
+    def instrumentar_redis(self, cliente, contador=None):
+        """Mide cada comando y pipeline del cliente; `contador` (round_trips de Problema_5_1) da los viajes."""
+        if not self.activo:
+            return cliente
+        if contador is not None:
+            self.fuentes.append(contador.leer)
+        comando = cliente.execute_command
+        crear_pipeline = cliente.pipeline
+
+        def execute_command(*args, **kwargs):
+            with self.medir("keydb", str(args[0]).split()[0].upper()):
+                return comando(*args, **kwargs)
+
+        def pipeline(*args, **kwargs):
+            pipe = crear_pipeline(*args, **kwargs)
+            ejecutar = pipe.execute
+
+            def execute(*a, **kw):
+                with self.medir("keydb", "PIPELINE"):
+                    return ejecutar(*a, **kw)
+            pipe.execute = execute
+            return pipe
+
+        cliente.execute_command = execute_command
+        cliente.pipeline = pipeline
+        return cliente
+
+    # ---------- salida ----------
+    def resumen(self):
+        filas = []
+        for clave, valores in self.latencias.items():
+            ordenados = sorted(valores)
+            consultas = self.consultas[clave]
+            filas.append((clave, len(valores), sum(valores) * 1000, sum(valores) / len(valores) * 1000,
+                          _percentil(ordenados, 0.95) * 1000, ordenados[-1] * 1000, sum(consultas) / len(consultas)))
+        return sorted(filas, key=lambda f: f[2], reverse=True)
+
+    def cerrar(self):
+        if not self.activo:
+            return
+        self.activo = False
+        self.perfil.disable()
+        builtins.input = self._input
+
+        prefijo = os.path.join(os.getenv("PERFIL_DIR", "."),
+                               f"perfil_{self.app}_{datetime.now():%Y%m%d_%H%M%S}")
+        self.perfil.dump_stats(f"{prefijo}.pstats")
+        with open(f"{prefijo}.folded", "w", encoding="utf-8") as f:
+            for pila, segundos in sorted(self.folded.items()):
+                f.write(f"{pila} {max(1, round(segundos * 1e6))}\n")  # microsegundos de tiempo propio
+
+        print(f"\n📊 Perfil de {self.app} (ms, sin esperas de input)")
+        print(f"{'operación':<36}{'n':>6}{'total':>10}{'media':>9}{'p95':>9}{'máx':>9}{'consultas':>11}")
+        for clave, n, total, media, p95, maximo, consultas in self.resumen():
+            print(f"{clave[:35]:<36}{n:>6}{total:>10.1f}{media:>9.2f}{p95:>9.2f}{maximo:>9.2f}{consultas:>11.1f}")
+        print("\n🐢 Funciones con más tiempo acumulado (cProfile):")
+        pstats.Stats(self.perfil).sort_stats("cumulative").print_stats(8)
+        print(f"💾 {prefijo}.pstats (python -m pstats / snakeviz) | 🔥 {prefijo}.folded (flamegraph.pl / speedscope)")
+
+
+class _ConexionSQLite(sqlite3.Connection):
+    perfil = None
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or _CursorSQLite)
+
+    def execute(self, sql, *params):
+        with self.perfil.medir("sqlite", _verbo(sql)):
+            return super().execute(sql, *params)
+
+    def executemany(self, sql, *params):
+        with self.perfil.medir("sqlite", f"{_verbo(sql)} (lote)"):
+            return super().executemany(sql, *params)
+
+    def commit(self):
+        with self.perfil.medir("sqlite", "COMMIT"):
+            return super().commit()
+
+
+class _CursorSQLite(sqlite3.Cursor):
+    def execute(self, sql, *params):
+        with self.connection.perfil.medir("sqlite", _verbo(sql)):
+            return super().execute(sql, *params)
+
+    def executemany(self, sql, *params):
+        with self.connection.perfil.medir("sqlite", f"{_verbo(sql)} (lote)"):
+            return super().executemany(sql, *params)
+
+    def fetchall(self):
+        with self.connection.perfil.medir("sqlite", "fetchall"):
+            return super().fetchall()
+
+
+def iniciar(app, argv=None):
+    """Perfilador de la app: activo solo si se pidió con PERFILAR=1 o --profile."""
+    return Perfilador(app, solicitado(argv))
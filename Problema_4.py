@@ -2,6 +2,11 @@ from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 import sys
 
+from Problema_2_3 import iniciar
+
+# Perfilado opcional: PERFILAR=1 o --profile
+perfil = iniciar("problema_4")
+
 
 # ========================
 # CONFIGURACIÓN DE MONGODB
@@ -10,7 +15,7 @@ def conectar_mongodb():
     try:
         # Cambia según tu configuración (usuario, contraseña, host, puerto, base de datos)
         uri = "mongodb://localhost:27017"
-        cliente = MongoClient(uri, serverSelectionTimeoutMS=5000)
+        cliente = MongoClient(uri, serverSelectionTimeoutMS=5000, event_listeners=perfil.listeners_mongo())
         cliente.admin.command("ping")  # Verifica conexión
         print("✅ Conexión exitosa a MongoDB.")
         return cliente["biblioteca"]  # Base de datos 'biblioteca'
@@ -22,6 +27,7 @@ def conectar_mongodb():
 # ========================
 # FUNCIONES CRUD
 # ========================
+@perfil.cronometrar("accion")
 def agregar_libro(coleccion):
     titulo = input("Título: ")
     autor = input("Autor: ")
@@ -39,6 +45,7 @@ def agregar_libro(coleccion):
     print("📚 Libro agregado con éxito.")
 
 
+@perfil.cronometrar("accion")
 def actualizar_libro(coleccion):
     titulo = input("Ingrese el título del libro a actualizar: ")
     libro = coleccion.find_one({"titulo": titulo})
@@ -65,6 +72,7 @@ def actualizar_libro(coleccion):
     print("✏ Libro actualizado correctamente.")
 
 
+@perfil.cronometrar("accion")
 def eliminar_libro(coleccion):
     titulo = input("Ingrese el título del libro a eliminar: ")
     resultado = coleccion.delete_one({"titulo": titulo})
@@ -75,6 +83,7 @@ def eliminar_libro(coleccion):
         print("⚠ No se encontró un libro con ese título.")
 
 
+@perfil.cronometrar("accion")
 def listar_libros(coleccion):
     libros = list(coleccion.find())
 
@@ -87,6 +96,7 @@ def listar_libros(coleccion):
         print(f"- {libro['titulo']} | {libro['autor']} | {libro['genero']} | {libro['estado']}")
 
 
+@perfil.cronometrar("accion")
 def buscar_libros(coleccion):
     criterio = input("Buscar por (titulo/autor/genero): ").lower()
     if criterio not in ["titulo", "autor", "genero"]:
@@ -1,26 +1,38 @@
 import redis
-import json
-import os
-from dotenv import load_dotenv
+from Problema_2_3 import iniciar
+from Problema_5_1 import get_client, get_many, round_trips, scan_keys
+from Problema_5_4 import CREAR_LUA, MIGRAR_LUA
 
-# Cargar variables de entorno
-load_dotenv()
+# Perfilado opcional: PERFILAR=1 o --profile
+perfil = iniciar("problema_5")
 
-# Conexión a KeyDB
+# Conexión a KeyDB (pool compartido, configurado con las variables KEYDB_*)
 try:
-    r = redis.Redis(
-        host=os.getenv("KEYDB_HOST", "localhost"),
-        port=int(os.getenv("KEYDB_PORT", 6379)),
-        password=os.getenv("KEYDB_PASSWORD", None),
-        decode_responses=True
-    )
+    # Solo el perfilador cuenta viajes; sin él el pool usa conexiones normales
+    r = perfil.instrumentar_redis(get_client(contar=perfil.activo), round_trips)
     r.ping()
     print("✅ Conectado a KeyDB correctamente.")
 except redis.ConnectionError as e:
     print("❌ Error al conectar a KeyDB:", e)
     exit()
 
+# Cada libro se guarda como hash libro:<titulo> (campos titulo, autor, genero, estado)
+_CREAR = r.register_script(CREAR_LUA)
+_MIGRAR = r.register_script(MIGRAR_LUA)
+
+
+def migrar_json_a_hash():
+    """Convierte los libros guardados como JSON (formato anterior) a hashes."""
+    return sum(_MIGRAR(keys=[key]) for key in r.scan_iter(match="libro:*", count=500, _type="string"))
+
+
+def leer_libros():
+    """Todos los libros con SCAN + un pipeline de HGETALL (sin KEYS ni un GET por libro)."""
+    return [libro for libro in get_many(r, scan_keys(r, "libro:*")) if isinstance(libro, dict) and libro]
+
+
 # Funciones CRUD
+@perfil.cronometrar("accion")
 def agregar_libro():
     titulo = input("Título: ").strip()
     autor = input("Autor: ").strip()
@@ -28,44 +40,43 @@ def agregar_libro():
     estado = input("Estado de lectura (Leído / Pendiente): ").strip()
 
     key = f"libro:{titulo.lower().replace(' ', '_')}"
-    if r.exists(key):
+    # EXISTS + HSET de todos los campos en un script: si dos clientes agregan el mismo
+    # título solo uno crea el libro, y nadie lee un hash con solo el título
+    if not _CREAR(keys=[key], args=["titulo", titulo, "autor", autor, "genero", genero, "estado", estado]):
         print("⚠ Ya existe un libro con ese título.")
         return
 
-    libro = {
-        "titulo": titulo,
-        "autor": autor,
-        "genero": genero,
-        "estado": estado
-    }
-    r.set(key, json.dumps(libro))
     print("📚 Libro agregado con éxito.")
 
+@perfil.cronometrar("accion")
 def actualizar_libro():
     titulo = input("Título del libro a actualizar: ").strip()
     key = f"libro:{titulo.lower().replace(' ', '_')}"
 
-    if not r.exists(key):
+    libro = r.hgetall(key)
+    if not libro:
         print("⚠ No se encontró el libro.")
         return
 
-    libro = json.loads(r.get(key))
-
     print("Deja en blanco si no quieres cambiar un campo.")
     nuevo_autor = input(f"Autor ({libro['autor']}): ").strip()
     nuevo_genero = input(f"Género ({libro['genero']}): ").strip()
     nuevo_estado = input(f"Estado ({libro['estado']}): ").strip()
 
+    cambios = {}
     if nuevo_autor:
-        libro["autor"] = nuevo_autor
+        cambios["autor"] = nuevo_autor
     if nuevo_genero:
-        libro["genero"] = nuevo_genero
+        cambios["genero"] = nuevo_genero
     if nuevo_estado:
-        libro["estado"] = nuevo_estado
+        cambios["estado"] = nuevo_estado
 
-    r.set(key, json.dumps(libro))
+    # Solo se escriben los campos modificados; no hay lectura-modificación-escritura del documento
+    if cambios:
+        r.hset(key, mapping=cambios)
     print("✏ Libro actualizado correctamente.")
 
+@perfil.cronometrar("accion")
 def eliminar_libro():
     titulo = input("Título del libro a eliminar: ").strip()
     key = f"libro:{titulo.lower().replace(' ', '_')}"
@@ -74,25 +85,24 @@ def eliminar_libro():
     else:
         print("⚠ No se encontró el libro.")
 
+@perfil.cronometrar("accion")
 def ver_libros():
-    keys = r.keys("libro:*")
-    if not keys:
+    libros = leer_libros()
+    if not libros:
         print("📭 No hay libros registrados.")
         return
 
-    for key in keys:
-        libro = json.loads(r.get(key))
+    for libro in libros:
         print(f"📖 {libro['titulo']} - {libro['autor']} ({libro['genero']}) - Estado: {libro['estado']}")
 
+@perfil.cronometrar("accion")
 def buscar_libros():
     criterio = input("Buscar por (titulo/autor/genero): ").strip().lower()
     valor = input("Valor a buscar: ").strip().lower()
 
-    keys = r.keys("libro:*")
     encontrados = []
 
-    for key in keys:
-        libro = json.loads(r.get(key))
+    for libro in leer_libros():
         if criterio in libro and valor in libro[criterio].lower():
             encontrados.append(libro)
 
@@ -133,4 +143,7 @@ def menu():
             print("❌ Opción no válida.")
 
 if __name__ == "__main__":
+    migrados = migrar_json_a_hash()
+    if migrados:
+        print(f"🔄 {migrados} libro(s) migrados de JSON a hash.")
     menu()
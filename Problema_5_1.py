@@ -0,0 +1,219 @@
+import os
+import threading
+
+import redis
+import redis.asyncio
+from dotenv import load_dotenv
+
+try:
+    from redis.utils import HIREDIS_AVAILABLE  # redis-py usa hiredis solo si está instalado
+except ImportError:
+    HIREDIS_AVAILABLE = False
+
+load_dotenv()
+
+# Comandos por pipeline: limita la memoria de cada lote sin multiplicar los viajes
+LOTE = int(os.getenv("KEYDB_LOTE", 500))
+
+
+# ==========================
+# CONTEO DE VIAJES AL SERVIDOR
+# ==========================
+class _Contador:
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+
+    def sumar(self):
+        with self._lock:
+            self.valor += 1
+
+    def leer(self):
+        return self.valor
+
+
+round_trips = _Contador()
+
+
+class ConexionContada(redis.Connection):
+    """
+    Conexión que cuenta cada envío al servidor (un comando o un pipeline completo).
+    También cuenta el handshake (AUTH/SELECT) y los PING de health check, por eso
+    solo se usa al medir: get_client(contar=True), nunca en el pool de producción.
+    """
+
+    def send_packed_command(self, command, check_health=True):
+        round_trips.sumar()
+        return super().send_packed_command(command, check_health)
+
+
+class contar_round_trips:
+    """with contar_round_trips() as c: ...; c.total -> viajes hechos dentro del bloque."""
+
+    def __enter__(self):
+        self._inicio = round_trips.leer()
+        self.total = 0
+        return self
+
+    def __exit__(self, *exc):
+        self.total = round_trips.leer() - self._inicio
+
+
+# ==========================
+# POOL DE CONEXIONES
+# ==========================
+def crear_pool(host=None, port=None, password=None, db=0, max_connections=None, binario=False, contar=False):
+    """
+    Pool compartido y configurado para KeyDB:
+    - BlockingConnectionPool: si se agotan las conexiones espera en vez de fallar.
+    - timeouts de socket y health checks para no colgarse con conexiones muertas.
+    - binario=True devuelve bytes (valores de Problema_5_3 en msgpack/zstd).
+    - contar=True suma cada envío a round_trips (benchmarks y perfilador).
+    """
+    return redis.BlockingConnectionPool(
+        connection_class=ConexionContada if contar else redis.Connection,
+        host=host or os.getenv("KEYDB_HOST", "localhost"),
+        port=int(port or os.getenv("KEYDB_PORT", 6379)),
+        password=password or os.getenv("KEYDB_PASSWORD") or None,
+        db=db,
+        max_connections=int(max_connections or os.getenv("KEYDB_MAX_CONNECTIONS", 50)),
+        timeout=float(os.getenv("KEYDB_POOL_TIMEOUT", 5)),
+        socket_timeout=float(os.getenv("KEYDB_SOCKET_TIMEOUT", 5)),
+        socket_connect_timeout=float(os.getenv("KEYDB_CONNECT_TIMEOUT", 2)),
+        socket_keepalive=True,
+        health_check_interval=30,
+        retry_on_timeout=True,
+        decode_responses=not binario,
+    )
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_client(host=None, port=None, password=None, db=0, binario=False, contar=False):
+    """Cliente sobre un pool único por (host, puerto, db, binario, contar) en todo el proceso."""
+    clave = (host or os.getenv("KEYDB_HOST", "localhost"), int(port or os.getenv("KEYDB_PORT", 6379)),
+             db, binario, contar)
+    with _pools_lock:
+        if clave not in _pools:
+            _pools[clave] = crear_pool(clave[0], clave[1], password, db, binario=binario, contar=contar)
+    return redis.Redis(connection_pool=_pools[clave])
+
+
+def cliente_desde(settings, binario=False):
+    """Cliente a partir de un objeto Settings (Problema 6 y 8)."""
+    return get_client(settings.KEYDB_HOST, settings.KEYDB_PORT, settings.KEYDB_PASSWORD, binario=binario)
+
+
+# ==========================
+# CLIENTE ASÍNCRONO
+# ==========================
+def crear_cliente_async(host=None, port=None, password=None, db=0, max_connections=None):
+    """
+    Cliente redis.asyncio con la misma configuración que crear_pool.
+    El pool queda ligado al event loop donde se usa: crear uno por proceso
+    al arrancar el servidor (p. ej. en before_serving), no al importar.
+    """
+    pool = redis.asyncio.BlockingConnectionPool(
+        host=host or os.getenv("KEYDB_HOST", "localhost"),
+        port=int(port or os.getenv("KEYDB_PORT", 6379)),
+        password=password or os.getenv("KEYDB_PASSWORD") or None,
+        db=db,
+        max_connections=int(max_connections or os.getenv("KEYDB_MAX_CONNECTIONS", 50)),
+        timeout=float(os.getenv("KEYDB_POOL_TIMEOUT", 5)),
+        socket_timeout=float(os.getenv("KEYDB_SOCKET_TIMEOUT", 5)),
+        socket_connect_timeout=float(os.getenv("KEYDB_CONNECT_TIMEOUT", 2)),
+        socket_keepalive=True,
+        health_check_interval=30,
+        retry_on_timeout=True,
+        decode_responses=True,
+    )
+    return redis.asyncio.Redis(connection_pool=pool)
+
+
+async def get_many_async(r, keys):
+    """Igual que get_many, sobre un cliente redis.asyncio."""
+    resultados = []
+    for lote in _lotes(keys):
+        pipe = r.pipeline(transaction=False)
+        for key in lote:
+            pipe.hgetall(key)
+        resultados.extend(await pipe.execute(raise_on_error=False))
+    return resultados
+
+
+# ==========================
+# OPERACIONES EN LOTE
+# ==========================
+def _lotes(items):
+    items = list(items)
+    for i in range(0, len(items), LOTE):
+        yield items[i:i + LOTE]
+
+
+def scan_keys(r, pattern, count=1000):
+    return list(r.scan_iter(match=pattern, count=count))
+
+
+def get_many(r, keys):
+    """
+    HGETALL de muchas claves en pipelines de LOTE comandos.
+    Devuelve una lista alineada con keys: dict (vacío si no existe) o
+    redis.ResponseError si la clave no es un hash (p. ej. libro aún en JSON).
+    """
+    resultados = []
+    for lote in _lotes(keys):
+        pipe = r.pipeline(transaction=False)
+        for key in lote:
+            pipe.hgetall(key)
+        resultados.extend(pipe.execute(raise_on_error=False))
+    return resultados
+
+
+def save_many(r, docs):
+    """docs: {clave: dict de campos}. HSET de todos en pipelines de LOTE comandos."""
+    for lote in _lotes(docs.items()):
+        pipe = r.pipeline(transaction=False)
+        for key, campos in lote:
+            pipe.hset(key, mapping=campos)
+        pipe.execute()
+
+
+def delete_many(r, keys):
+    """Borra muchas claves con un solo UNLINK por lote (liberación en segundo plano)."""
+    borradas = 0
+    for lote in _lotes(keys):
+        borradas += r.unlink(*lote)
+    return borradas
+
+
+# ==========================
+# VERIFICACIÓN DE VIAJES
+# ==========================
+if __name__ == "__main__":
+    # Requiere un KeyDB/Redis accesible con las variables KEYDB_*
+    import math
+    import uuid
+
+    r = get_client(contar=True)
+    r.ping()  # el handshake de la conexión no entra en las mediciones
+    n = 2000
+    docs = {f"bench:{uuid.uuid4()}": {"titulo": f"Libro {i}", "autor": "Autor", "genero": "Prueba"}
+            for i in range(n)}
+    esperados = math.ceil(n / LOTE)
+
+    with contar_round_trips() as c:
+        save_many(r, docs)
+    assert c.total == esperados, f"save_many: {c.total} viajes, se esperaban {esperados}"
+
+    with contar_round_trips() as c:
+        leidos = get_many(r, docs)
+    assert c.total == esperados, f"get_many: {c.total} viajes, se esperaban {esperados}"
+    assert all(d == docs[k] for k, d in zip(docs, leidos))
+
+    with contar_round_trips() as c:
+        borradas = delete_many(r, docs)
+    assert c.total == esperados and borradas == n, f"delete_many: {c.total} viajes, {borradas} borradas"
+
+    print(f"✅ {n} libros: {esperados} viaje(s) por operación en lote (hiredis: {HIREDIS_AVAILABLE})")
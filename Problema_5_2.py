@@ -0,0 +1,402 @@
+import logging
+import re
+import threading
+import unicodedata
+import uuid
+
+import redis
+
+from Problema_5_1 import get_many, get_many_async, scan_keys, delete_many, _lotes
+
+CAMPOS_INDEXADOS = ("titulo", "autor", "genero")
+NGRAMA = 3  # subcadenas más cortas coinciden con casi todo el catálogo: no se indexan
+PREFIJO_MAX = 20  # prefijos más largos se buscan por sus primeros PREFIJO_MAX caracteres
+PREFIJO_INDICE = "idx:"
+FORMATO_INDICE = 2  # cambia si cambian los conjuntos: un índice de otro formato se reconstruye
+BLOQUEO = f"{PREFIJO_INDICE}construyendo"
+BLOQUEO_TTL = 120  # segundos; se renueva en cada lote mientras dura la reconstrucción
+
+log = logging.getLogger(__name__)
+
+
+# ==========================
+# NORMALIZACIÓN
+# ==========================
+def normalizar(texto):
+    """Minúsculas, sin tildes y con espacios colapsados: 'Él  Señor' -> 'el senor'."""
+    descompuesto = unicodedata.normalize("NFKD", str(texto or ""))
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.lower().split())
+
+
+def tokens(texto):
+    return set(re.findall(r"\w+", normalizar(texto)))
+
+
+def ngramas(texto, n):
+    texto = normalizar(texto)
+    return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+
+def coincide(valor, q, modo="contiene"):
+    """Comprobación final sobre el documento (el índice solo da candidatos)."""
+    valor, q = normalizar(valor), normalizar(q)
+    if modo == "prefijo":
+        return valor.startswith(q)
+    if modo == "palabras":
+        return tokens(q) <= tokens(valor)
+    if modo == "alguna":
+        return bool(tokens(q) & tokens(valor))
+    return q in valor
+
+
+# ==========================
+# CLAVES DEL ÍNDICE
+# ==========================
+# idx:<campo>:g:<ngrama>  -> ids de libros cuyo campo contiene el n-grama (n = NGRAMA)
+# idx:<campo>:p:<prefijo> -> ids de libros cuyo campo empieza así (1..PREFIJO_MAX caracteres)
+# idx:<campo>:t:<token>   -> ids de libros cuyo campo contiene la palabra
+# idx:terminos:<id>       -> conjuntos anteriores en los que está el libro (para reindexar)
+# idx:version             -> hash id -> versión indexada (descarta reindexados viejos)
+def _clave_gram(campo, gram):
+    return f"{PREFIJO_INDICE}{campo}:g:{gram}"
+
+
+def _clave_token(campo, token):
+    return f"{PREFIJO_INDICE}{campo}:t:{token}"
+
+
+def _clave_prefijo(campo, prefijo):
+    return f"{PREFIJO_INDICE}{campo}:p:{prefijo}"
+
+
+def terminos_de(doc):
+    claves = set()
+    for campo in CAMPOS_INDEXADOS:
+        valor = normalizar(doc.get(campo, ""))
+        claves.update(_clave_gram(campo, g) for g in ngramas(valor, NGRAMA))
+        claves.update(_clave_prefijo(campo, valor[:n]) for n in range(1, min(len(valor), PREFIJO_MAX) + 1))
+        claves.update(_clave_token(campo, t) for t in tokens(valor))
+    return claves
+
+
+# Reemplaza atómicamente los conjuntos de un libro.
+# KEYS: terminos del libro, hash de versiones, conjuntos nuevos...  ARGV: id, versión.
+# Los conjuntos viejos salen del propio idx:terminos (no se conocen antes de leerlo).
+# Una versión menor que la ya indexada se ignora (otra escritura más nueva ganó).
+_REINDEXAR_LUA = """
+local id, version = ARGV[1], tonumber(ARGV[2])
+local terminos = KEYS[1]
+local actual = tonumber(redis.call('HGET', KEYS[2], id) or '0')
+if version > 0 and version < actual then return 0 end
+for _, clave in ipairs(redis.call('SMEMBERS', terminos)) do
+    redis.call('SREM', clave, id)
+end
+redis.call('DEL', terminos)
+if #KEYS > 2 then
+    for i = 3, #KEYS do redis.call('SADD', KEYS[i], id) end
+    redis.call('SADD', terminos, unpack(KEYS, 3))
+    redis.call('HSET', KEYS[2], id, version)
+else
+    redis.call('HDEL', KEYS[2], id)
+end
+return 1
+"""
+
+
+def _argumentos_reindexar(book_id, version, claves):
+    keys = [f"{PREFIJO_INDICE}terminos:{book_id}", f"{PREFIJO_INDICE}version", *sorted(claves)]
+    return keys, [book_id, int(version or 0)]
+
+
+def _reindexar(r, book_id, version, claves, pipe=None):
+    keys, args = _argumentos_reindexar(book_id, version, claves)
+    return r.register_script(_REINDEXAR_LUA)(keys=keys, args=args, client=pipe)
+
+
+# ==========================
+# MANTENIMIENTO
+# ==========================
+def indexar(r, doc):
+    """Indexa (o reindexa) un libro completo; doc debe traer 'id' y, si existe, 'version'."""
+    return _reindexar(r, doc["id"], doc.get("version"), terminos_de(doc))
+
+
+def desindexar(r, book_id):
+    return _reindexar(r, book_id, 0, ())
+
+
+# El bloqueo guarda un token: solo su dueño lo renueva o lo suelta
+_RENOVAR_LUA = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then return 0 end
+return redis.call('EXPIRE', KEYS[1], ARGV[2])
+"""
+
+_SOLTAR_LUA = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then return 0 end
+return redis.call('DEL', KEYS[1])
+"""
+
+
+def reconstruir_indice(r, prefijo="libro:"):
+    """
+    Borra y vuelve a construir el índice a partir de todos los libros. Devuelve
+    cuántos indexó, o None si otro proceso ya lo está reconstruyendo. El bloqueo
+    se renueva en cada lote: una reconstrucción larga no deja entrar a otra que
+    borraría el índice a medio llenar.
+    """
+    token = str(uuid.uuid4())
+    if not r.set(BLOQUEO, token, nx=True, ex=BLOQUEO_TTL):
+        return None
+    renovar = r.register_script(_RENOVAR_LUA)
+
+    def seguir():
+        if not renovar(keys=[BLOQUEO], args=[token, BLOQUEO_TTL]):
+            raise RuntimeError("Se perdió el bloqueo de reconstrucción del índice")
+
+    try:
+        delete_many(r, [k for k in scan_keys(r, f"{PREFIJO_INDICE}*") if k not in (BLOQUEO, BLOQUEO.encode())])
+        seguir()
+        keys = scan_keys(r, f"{prefijo}*")
+        indexados = 0
+        for lote in _lotes(keys):
+            seguir()
+            pipe = r.pipeline(transaction=False)
+            for doc in get_many(r, lote):
+                if isinstance(doc, dict) and doc.get("id"):
+                    _reindexar(r, doc["id"], doc.get("version"), terminos_de(doc), pipe)
+                    indexados += 1
+            pipe.execute()
+        seguir()
+        r.set(f"{PREFIJO_INDICE}listo", FORMATO_INDICE)
+        return indexados
+    finally:
+        r.register_script(_SOLTAR_LUA)(keys=[BLOQUEO], args=[token])
+
+
+def _formato_vigente(valor):
+    return valor is not None and int(valor) == FORMATO_INDICE
+
+
+def indice_listo(r):
+    return _formato_vigente(r.get(f"{PREFIJO_INDICE}listo"))
+
+
+_hilo = None
+_hilo_lock = threading.Lock()
+
+
+def _reconstruir_registrando(r, prefijo):
+    try:
+        indexados = reconstruir_indice(r, prefijo)
+        if indexados is not None:
+            log.info("Índice de búsqueda reconstruido: %d libros", indexados)
+    except Exception:
+        log.exception("Falló la reconstrucción del índice de búsqueda")
+
+
+def asegurar_indice(r, prefijo="libro:", redisearch=False, en_segundo_plano=False):
+    """
+    Construye el índice si falta (el primer proceso que toma el bloqueo lo hace).
+    Al arrancar o desde la CLI se espera; dentro de una petición usar
+    en_segundo_plano=True: un hilo por proceso y la petición no se bloquea.
+    """
+    global _hilo
+    if redisearch:
+        crear_indice_redisearch(r, prefijo)
+        return 0
+    if indice_listo(r):
+        return 0
+    if not en_segundo_plano:
+        return reconstruir_indice(r, prefijo) or 0
+    with _hilo_lock:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_reconstruir_registrando, args=(r, prefijo), daemon=True)
+            _hilo.start()
+    return 0
+
+
+# ==========================
+# BÚSQUEDA
+# ==========================
+def _claves_consulta(campo, q, modo):
+    """
+    Conjuntos a intersectar (o unir, en modo 'alguna') para obtener candidatos.
+    None: una subcadena de menos de NGRAMA caracteres no tiene conjunto propio.
+    """
+    if modo in ("palabras", "alguna"):
+        return [_clave_token(campo, t) for t in tokens(q)]
+    q = normalizar(q)
+    if modo == "prefijo":
+        return [_clave_prefijo(campo, q[:PREFIJO_MAX])] if q else []
+    if len(q) < NGRAMA:
+        return None
+    return [_clave_gram(campo, g) for g in ngramas(q, NGRAMA)]
+
+
+def recorrer(r, campo, q, modo="contiene", prefijo="libro:"):
+    """Búsqueda sin índice: todo el catálogo, con la misma comparación que buscar."""
+    libros = [d for d in get_many(r, scan_keys(r, f"{prefijo}*"))
+              if isinstance(d, dict) and coincide(d.get(campo, ""), q, modo)]
+    return sorted(libros, key=lambda d: d.get("titulo", "").lower())
+
+
+def _buscar_redisearch(r, campo, q, modo, prefijo, reintentar=True):
+    escapada = re.sub(r"([^\w\s])", r"\\\1", q.strip())
+    if modo in ("palabras", "alguna"):
+        termino = escapada if modo == "palabras" else " | ".join(escapada.split())
+    else:
+        termino = f"*{escapada}*" if modo == "contiene" else f"{escapada}*"
+    try:
+        respuesta = r.execute_command("FT.SEARCH", f"{PREFIJO_INDICE}libros", f"@{campo}:({termino})",
+                                      "LIMIT", 0, 10000)
+    except redis.ResponseError as e:
+        if not reintentar or "index" not in str(e).lower():
+            raise
+        crear_indice_redisearch(r, prefijo)  # primera búsqueda: el servidor indexa los hashes existentes
+        return _buscar_redisearch(r, campo, q, modo, prefijo, reintentar=False)
+    docs = []
+    for i in range(2, len(respuesta), 2):
+        campos = respuesta[i]
+        docs.append(dict(zip(campos[::2], campos[1::2])))
+    return docs
+
+
+def redisearch_disponible(r):
+    try:
+        modulos = r.execute_command("MODULE", "LIST")
+    except redis.ResponseError:
+        return False
+    nombres = {str(m[1] if isinstance(m, (list, tuple)) else m.get("name", "")).lower() for m in modulos}
+    return "search" in nombres or "ft" in nombres
+
+
+def crear_indice_redisearch(r, prefijo="libro:"):
+    """Índice FT sobre los hashes libro:* (lo mantiene el propio servidor en cada HSET/DEL)."""
+    try:
+        r.execute_command("FT.CREATE", f"{PREFIJO_INDICE}libros", "ON", "HASH", "PREFIX", 1, prefijo,
+                          "SCHEMA", *[x for c in CAMPOS_INDEXADOS for x in (c, "TEXT")])
+    except redis.ResponseError as e:
+        if "already exists" not in str(e).lower():
+            raise
+
+
+def buscar(r, campo, q, modo="contiene", prefijo="libro:", redisearch=False):
+    """
+    Libros cuyo `campo` coincide con q, ordenados por título.
+    Costo proporcional a los candidatos del índice, no al catálogo (salvo una
+    subcadena de 1-2 caracteres: coincide con casi todo y se recorre el catálogo).
+    Devuelve None si el índice aún no está construido (el llamador recorre todo).
+    """
+    if redisearch:
+        candidatos = _buscar_redisearch(r, campo, q, modo, prefijo)
+    else:
+        if not indice_listo(r):
+            return None
+        claves = _claves_consulta(campo, q, modo)
+        if claves is None:
+            return recorrer(r, campo, q, modo, prefijo)
+        if not claves:
+            return []
+        ids = r.sunion(claves) if modo == "alguna" else r.sinter(claves)
+        ids = sorted(ids)
+        candidatos = []
+        for book_id, doc in zip(ids, get_many(r, [f"{prefijo}{i}" for i in ids])):
+            if not doc:  # borrado sin desindexar (o aún en JSON): limpiar la entrada
+                desindexar(r, book_id)
+                continue
+            if isinstance(doc, dict):
+                candidatos.append(doc)
+    # Los n-gramas dan un superconjunto; RediSearch no pliega tildes igual: se verifica aquí
+    libros = [d for d in candidatos if coincide(d.get(campo, ""), q, modo)]
+    return sorted(libros, key=lambda d: d.get("titulo", "").lower())
+
+
+# ==========================
+# VERSIÓN ASÍNCRONA (redis.asyncio)
+# ==========================
+async def indexar_async(r, doc):
+    keys, args = _argumentos_reindexar(doc["id"], doc.get("version"), terminos_de(doc))
+    return await r.register_script(_REINDEXAR_LUA)(keys=keys, args=args)
+
+
+async def desindexar_async(r, book_id):
+    keys, args = _argumentos_reindexar(book_id, 0, ())
+    return await r.register_script(_REINDEXAR_LUA)(keys=keys, args=args)
+
+
+async def buscar_async(r, campo, q, modo="contiene", prefijo="libro:"):
+    """Como buscar (solo índice propio); None si el índice aún no está construido."""
+    if not _formato_vigente(await r.get(f"{PREFIJO_INDICE}listo")):
+        return None
+    claves = _claves_consulta(campo, q, modo)
+    if claves is None:
+        libros = [d for d in await get_many_async(r, [k async for k in r.scan_iter(match=f"{prefijo}*", count=1000)])
+                  if isinstance(d, dict) and coincide(d.get(campo, ""), q, modo)]
+        return sorted(libros, key=lambda d: d.get("titulo", "").lower())
+    if not claves:
+        return []
+    ids = sorted(await (r.sunion(claves) if modo == "alguna" else r.sinter(claves)))
+    libros = []
+    for book_id, doc in zip(ids, await get_many_async(r, [f"{prefijo}{i}" for i in ids])):
+        if not doc:
+            await desindexar_async(r, book_id)
+        elif isinstance(doc, dict) and coincide(doc.get(campo, ""), q, modo):
+            libros.append(doc)
+    return sorted(libros, key=lambda d: d.get("titulo", "").lower())
+
+
+# ==========================
+# BENCHMARK
+# ==========================
+if __name__ == "__main__":
+    # Requiere KeyDB accesible (variables KEYDB_*). Uso: python Problema_5_2.py [n_libros]
+    # Reconstruir el índice de las apps fuera de las peticiones:
+    #   python Problema_5_2.py reconstruir [prefijo]
+    import os
+    import sys
+    import time
+
+    from Problema_5_1 import get_client, save_many
+
+    if sys.argv[1:2] == ["reconstruir"]:
+        inicio = time.perf_counter()
+        indexados = reconstruir_indice(get_client(), sys.argv[2] if len(sys.argv) > 2 else "libro:")
+        if indexados is None:
+            sys.exit("⏳ Otro proceso ya está reconstruyendo el índice")
+        print(f"📇 {indexados} libros indexados en {time.perf_counter() - inicio:.2f}s")
+        sys.exit()
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    # Base aparte: reconstruir_indice borra el índice completo
+    r = get_client(db=int(os.getenv("KEYDB_BENCH_DB", 15)))
+    prefijo = "libro:"
+    palabras = ["dragón", "señor", "anillos", "noche", "mar", "río", "ciudad", "sombra", "luz", "tiempo"]
+    docs = {}
+    for i in range(n):
+        book_id = str(uuid.uuid4())
+        docs[f"{prefijo}{book_id}"] = {
+            "id": book_id, "titulo": f"{palabras[i % 10]} {palabras[(i * 7) % 10]} {i}",
+            "autor": f"Autor {i % 500}", "genero": "Prueba", "estado": "Leído", "version": 1}
+    save_many(r, docs)
+
+    inicio = time.perf_counter()
+    print(f"📇 {reconstruir_indice(r, prefijo)} libros indexados en {time.perf_counter() - inicio:.2f}s")
+
+    for q, modo in (("senor", "contiene"), ("Dragón Señor 12", "contiene"), ("luz", "prefijo"),
+                    ("d", "prefijo"), ("mar tiempo", "palabras"), ("1234", "contiene"), ("ño", "contiene")):
+        inicio = time.perf_counter()
+        con_indice = buscar(r, "titulo", q, modo, prefijo)
+        t_indice = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        todos = [d for d in get_many(r, scan_keys(r, f"{prefijo}*")) if isinstance(d, dict)]
+        recorrido = sorted((d for d in todos if coincide(d["titulo"], q, modo)),
+                           key=lambda d: d.get("titulo", "").lower())
+        t_recorrido = time.perf_counter() - inicio
+
+        assert [d["id"] for d in con_indice] == [d["id"] for d in recorrido], f"{q!r}: resultados distintos"
+        print(f"🔎 {q!r} ({modo}): {len(con_indice)} resultados | índice {t_indice * 1000:.1f} ms"
+              f" | recorrido {t_recorrido * 1000:.1f} ms")
+
+    delete_many(r, list(docs) + scan_keys(r, f"{PREFIJO_INDICE}*"))
@@ -0,0 +1,222 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CAMPOS_LIBRO = ("id", "titulo", "autor", "genero", "estado", "version")
+
+# Valores codificados: MAGIA + id del códec (1 byte) + cuerpo. Un JSON del formato
+# anterior empieza con "{" o "[" y se reconoce sin encabezado.
+MAGIA = b"\x00"
+ID_JSON, ID_MSGPACK, ID_TUPLA_JSON, ID_TUPLA_MSGPACK, ID_ZSTD = b"j", b"m", b"t", b"u", b"z"
+ZSTD_UMBRAL = int(os.getenv("KEYDB_ZSTD_UMBRAL", 1024))  # bytes; valores menores no se comprimen
+
+
+# ==========================
+# FORMATOS BASE
+# ==========================
+def _json_dumps(obj):
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(datos):
+    return orjson.loads(datos) if orjson else json.loads(datos)
+
+
+def _msgpack_dumps(obj):
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _msgpack_loads(datos):
+    return msgpack.unpackb(datos, raw=False)
+
+
+# ==========================
+# CÓDEC
+# ==========================
+class Codec:
+    """
+    Codifica documentos (dicts) para guardarlos como un solo valor en KeyDB.
+
+    formato: "json" (orjson si está instalado) o "msgpack".
+    campos: si se da, el documento se guarda como lista de valores en ese orden
+            (sin repetir los nombres de campo); las claves fuera del esquema van
+            en un dict final para no perder nada.
+    zstd: comprime con zstandard los valores de más de ZSTD_UMBRAL bytes.
+    Al decodificar se reconoce cualquier formato, incluido el JSON anterior.
+    """
+
+    def __init__(self, formato="json", campos=None, zstd=False):
+        if formato == "msgpack" and msgpack is None:
+            raise RuntimeError("Formato msgpack pedido pero el paquete msgpack no está instalado.")
+        if zstd and zstandard is None:
+            raise RuntimeError("Compresión zstd pedida pero el paquete zstandard no está instalado.")
+        self.formato = formato
+        self.campos = tuple(campos) if campos else None
+        self.zstd = zstd
+        self._comprimir = zstandard.ZstdCompressor(level=3).compress if zstd else None
+
+    def __repr__(self):
+        return f"Codec({self.formato!r}, tupla={bool(self.campos)}, zstd={self.zstd})"
+
+    def codificar(self, doc):
+        dumps = _msgpack_dumps if self.formato == "msgpack" else _json_dumps
+        if self.campos:
+            extra = {k: v for k, v in doc.items() if k not in self.campos}
+            valores = [doc.get(c) for c in self.campos]
+            if extra:
+                valores.append(extra)
+            cuerpo = dumps(valores)
+            codigo = ID_TUPLA_MSGPACK if self.formato == "msgpack" else ID_TUPLA_JSON
+        else:
+            cuerpo = dumps(doc)
+            codigo = ID_MSGPACK if self.formato == "msgpack" else ID_JSON
+        valor = MAGIA + codigo + cuerpo
+        if self._comprimir and len(valor) > ZSTD_UMBRAL:
+            return MAGIA + ID_ZSTD + self._comprimir(valor)
+        return valor
+
+    def decodificar(self, valor):
+        return decodificar(valor, self.campos)
+
+
+_descomprimir = zstandard.ZstdDecompressor().decompress if zstandard else None
+
+
+def decodificar(valor, campos=CAMPOS_LIBRO):
+    """Decodifica un valor de cualquier códec o un JSON del formato anterior (str o bytes)."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        valor = valor.encode("utf-8")
+    if not valor.startswith(MAGIA):
+        return _json_loads(valor)  # formato anterior: json.dumps directo
+    codigo, cuerpo = valor[1:2], valor[2:]
+    if codigo == ID_ZSTD:
+        if _descomprimir is None:
+            raise RuntimeError("Valor comprimido con zstd pero zstandard no está instalado.")
+        return decodificar(_descomprimir(cuerpo), campos)
+    if codigo in (ID_JSON, ID_TUPLA_JSON):
+        datos = _json_loads(cuerpo)
+    elif codigo in (ID_MSGPACK, ID_TUPLA_MSGPACK):
+        if msgpack is None:
+            raise RuntimeError("Valor en msgpack pero el paquete msgpack no está instalado.")
+        datos = _msgpack_loads(cuerpo)
+    else:
+        raise ValueError(f"Códec desconocido: {codigo!r}")
+    if codigo in (ID_TUPLA_JSON, ID_TUPLA_MSGPACK):
+        campos = campos or CAMPOS_LIBRO
+        doc = {c: v for c, v in zip(campos, datos) if v is not None}
+        if len(datos) > len(campos):
+            doc.update(datos[len(campos)])
+        return doc
+    return datos
+
+
+def codec_desde_entorno(campos=None):
+    """
+    KEYDB_CODEC = json | msgpack | tupla (lista en orden de esquema)
+    KEYDB_ZSTD  = true para comprimir valores grandes
+    Sin KEYDB_CODEC: msgpack si está instalado, si no JSON (orjson).
+    """
+    nombre = os.getenv("KEYDB_CODEC", "msgpack" if msgpack else "json").lower()
+    zstd = os.getenv("KEYDB_ZSTD", "False").lower() == "true"
+    if nombre == "tupla":
+        return Codec("msgpack" if msgpack else "json", campos or CAMPOS_LIBRO, zstd)
+    return Codec(nombre, None, zstd)
+
+
+# ==========================
+# BENCHMARK
+# ==========================
+def _libros(n):
+    estados = ("Leído", "No leído", "Pendiente")
+    return [{"id": f"{i:08x}-0000-4000-8000-{i:012x}", "titulo": f"Crónica del libro número {i}",
+             "autor": f"Autora Número {i % 5000}", "genero": ("Novela", "Ensayo", "Poesía")[i % 3],
+             "estado": estados[i % 3], "version": 1} for i in range(n)]
+
+
+def _codecs():
+    codecs = {"json (anterior)": None, "json": Codec("json"), "tupla json": Codec("json", CAMPOS_LIBRO)}
+    if msgpack:
+        codecs.update({"msgpack": Codec("msgpack"), "tupla msgpack": Codec("msgpack", CAMPOS_LIBRO)})
+    if zstandard:
+        codecs["tupla + zstd"] = Codec("msgpack" if msgpack else "json", CAMPOS_LIBRO, zstd=True)
+    return codecs
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_5_3.py [n_libros] [muestra_memoria]
+    # La parte de memoria requiere KeyDB (variables KEYDB_*); usa la base KEYDB_BENCH_DB.
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    muestra = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    libros = _libros(n)
+    print(f"📚 {n} libros | orjson: {bool(orjson)} | msgpack: {bool(msgpack)} | zstd: {bool(zstandard)}")
+
+    codificados = {}
+    for nombre, codec in _codecs().items():
+        codificar = codec.codificar if codec else (lambda d: json.dumps(d).encode("utf-8"))
+        inicio = time.perf_counter()
+        valores = [codificar(d) for d in libros]
+        t_cod = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        leidos = [decodificar(v) for v in valores]
+        t_dec = time.perf_counter() - inicio
+        assert leidos[-1] == libros[-1], f"{nombre}: ida y vuelta distinta"
+        codificados[nombre] = valores[:muestra]
+        promedio = sum(map(len, valores)) / n
+        print(f"🔧 {nombre:16} {promedio:6.1f} B/libro | codificar {n / t_cod:>10,.0f}/s"
+              f" | decodificar {n / t_dec:>10,.0f}/s")
+    del libros
+
+    try:
+        from Problema_5_1 import get_client, delete_many
+
+        r = get_client(db=int(os.getenv("KEYDB_BENCH_DB", 15)), binario=True)
+        r.ping()
+    except Exception as e:  # sin servidor: solo se mide la parte local
+        print(f"⚠️ Sin KeyDB para MEMORY USAGE ({e})")
+        sys.exit(0)
+
+    def memoria(claves):
+        pipe = r.pipeline(transaction=False)
+        for clave in claves:
+            pipe.memory_usage(clave, samples=0)
+        return sum(pipe.execute())
+
+    ejemplo = _libros(muestra)
+    claves = [f"bench_codec:{i}" for i in range(muestra)]
+    pipe = r.pipeline(transaction=False)
+    for clave, doc in zip(claves, ejemplo):
+        pipe.hset(clave, mapping=doc)
+    pipe.execute()
+    print(f"💾 {'hash (actual)':16} {memoria(claves) / muestra:6.1f} B/libro en el servidor"
+          f" -> {memoria(claves) / muestra * n / 2**20:8.1f} MiB para {n}")
+    delete_many(r, claves)
+
+    for nombre, valores in codificados.items():
+        pipe = r.pipeline(transaction=False)
+        for clave, valor in zip(claves, valores):
+            pipe.set(clave, valor)
+        pipe.execute()
+        total = memoria(claves)
+        print(f"💾 {nombre:16} {total / muestra:6.1f} B/libro en el servidor -> {total / muestra * n / 2**20:8.1f} MiB para {n}")
+        delete_many(r, claves)
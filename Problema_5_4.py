@@ -0,0 +1,42 @@
+# ==========================
+# SCRIPTS LUA COMPARTIDOS
+# ==========================
+# Fuentes únicas de los scripts atómicos sobre libros-hash que usan Problema_5,
+# Problema 6 (app y app_async) y Problema 8. Cada app los registra una sola vez
+# con register_script y reutiliza el objeto Script (EVALSHA en cada llamada).
+
+# KEYS[1] = libro; ARGV = campo1, valor1, ... Crea el hash completo solo si no
+# existe: un lector nunca ve un libro a medio escribir. Devuelve 1 si lo creó.
+CREAR_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+# KEYS[1] = libro; ARGV[1] = versión leída ('' para no comprobarla), luego
+# campo, valor, ... Escribe solo los campos cambiados si la versión no cambió.
+# Devuelve la versión nueva, 0 si hubo conflicto o -1 si el libro no existe.
+CAS_UPDATE_LUA = """
+local actual = redis.call('HGET', KEYS[1], 'version')
+if not actual then return -1 end
+if ARGV[1] ~= '' and actual ~= ARGV[1] then return 0 end
+if #ARGV > 1 then redis.call('HSET', KEYS[1], unpack(ARGV, 2)) end
+return redis.call('HINCRBY', KEYS[1], 'version', 1)
+"""
+
+# KEYS[1] = libro guardado como JSON (formato anterior). Lo convierte a hash con
+# version = 1 de forma atómica. Devuelve 1 si migró, 0 si ya era otro tipo.
+MIGRAR_LUA = """
+if redis.call('TYPE', KEYS[1])['ok'] ~= 'string' then return 0 end
+local doc = cjson.decode(redis.call('GET', KEYS[1]))
+local campos = {}
+for k, v in pairs(doc) do
+    table.insert(campos, k)
+    table.insert(campos, tostring(v))
+end
+table.insert(campos, 'version')
+table.insert(campos, '1')
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(campos))
+return 1
+"""
@@ -1,15 +1,62 @@
 import os
+import queue
 import sqlite3
-from flask import Flask, render_template, request, redirect, url_for, flash
+from contextlib import closing
+from flask import Flask, render_template, request, redirect, url_for, flash, g
+from Problema_7_2 import ConstructorConsultas
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "dev")
 
-DB_NAME = "biblioteca.db"
+DB_NAME = os.getenv("DB_NAME", "biblioteca.db")
+POR_PAGINA = 25
+MAX_POR_PAGINA = 200
+MAX_RESULTADOS = 500
+
+FILTRO_LIBROS = ConstructorConsultas("libros", columnas_texto=("titulo", "autor", "genero", "estado"),
+                                     columnas_rango=("id",))
+
+
+def conectar():
+    """Conexión configurada una sola vez; después se reutiliza desde el pool."""
+    conn = sqlite3.connect(DB_NAME, timeout=5, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")  # lectores concurrentes con un escritor
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA cache_size = -16000")  # ~16 MB por conexión
+    return conn
+
+
+# Pool pequeño de conexiones ya configuradas, compartido por los hilos del servidor
+_pool = queue.LifoQueue(maxsize=int(os.getenv("DB_POOL_SIZE", 8)))
+
+
+def get_db():
+    """Una conexión por petición, guardada en flask.g y reutilizada por toda la vista."""
+    if "db" not in g:
+        try:
+            g.db = _pool.get_nowait()
+        except queue.Empty:
+            g.db = conectar()
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db(exc):
+    conn = g.pop("db", None)
+    if conn is None:
+        return
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
 
 
 def init_db():
-    with sqlite3.connect(DB_NAME) as conn:
+    # closing: el with de sqlite3 solo confirma la transacción, no cierra la conexión
+    with closing(conectar()) as conn, conn:
         conn.execute("""
                      CREATE TABLE IF NOT EXISTS libros
                      (
@@ -36,6 +83,8 @@ def init_db():
                          NULL
                      )
                      """)
+        for sentencia in FILTRO_LIBROS.indices():
+            conn.execute(sentencia)
 
 
 init_db()
@@ -43,9 +92,16 @@ init_db()
 
 @app.route("/")
 def index():
-    with sqlite3.connect(DB_NAME) as conn:
-        libros = conn.execute("SELECT * FROM libros").fetchall()
-    return render_template("index.html", libros=libros)
+    pagina = max(request.args.get("pagina", 1, type=int), 1)
+    por_pagina = min(max(request.args.get("por_pagina", POR_PAGINA, type=int), 1), MAX_POR_PAGINA)
+
+    conn = get_db()
+    total = conn.execute("SELECT COUNT(*) FROM libros").fetchone()[0]
+    libros = conn.execute("SELECT id, titulo, autor, genero, estado FROM libros ORDER BY id LIMIT ? OFFSET ?",
+                          (por_pagina, (pagina - 1) * por_pagina)).fetchall()
+    total_paginas = max((total + por_pagina - 1) // por_pagina, 1)
+    return render_template("index.html", libros=libros, pagina=pagina, por_pagina=por_pagina,
+                           total=total, total_paginas=total_paginas)
 
 
 @app.route("/agregar", methods=["GET", "POST"])
@@ -56,7 +112,8 @@ def agregar():
         genero = request.form["genero"]
         estado = request.form["estado"]
 
-        with sqlite3.connect(DB_NAME) as conn:
+        conn = get_db()
+        with conn:
             conn.execute("INSERT INTO libros (titulo, autor, genero, estado) VALUES (?, ?, ?, ?)",
                          (titulo, autor, genero, estado))
         flash("Libro agregado correctamente", "success")
@@ -67,16 +124,14 @@ def agregar():
 
 @app.route("/editar/<int:id>", methods=["GET", "POST"])
 def editar(id):
-    with sqlite3.connect(DB_NAME) as conn:
-        libro = conn.execute("SELECT * FROM libros WHERE id = ?", (id,)).fetchone()
-
+    conn = get_db()
     if request.method == "POST":
         titulo = request.form["titulo"]
         autor = request.form["autor"]
         genero = request.form["genero"]
         estado = request.form["estado"]
 
-        with sqlite3.connect(DB_NAME) as conn:
+        with conn:
             conn.execute("""UPDATE libros
                             SET titulo=?,
                                 autor=?,
@@ -87,13 +142,15 @@ def editar(id):
         flash("Libro actualizado correctamente", "info")
         return redirect(url_for("index"))
 
+    libro = conn.execute("SELECT * FROM libros WHERE id = ?", (id,)).fetchone()
     return render_template("form_edit.html", libro=libro)
 
 
 @app.route("/eliminar/<int:id>", methods=["GET", "POST"])
 def eliminar(id):
     if request.method == "POST":
-        with sqlite3.connect(DB_NAME) as conn:
+        conn = get_db()
+        with conn:
             conn.execute("DELETE FROM libros WHERE id = ?", (id,))
         flash("Libro eliminado", "danger")
         return redirect(url_for("index"))
@@ -104,12 +161,21 @@ def eliminar(id):
 @app.route("/buscar", methods=["GET", "POST"])
 def buscar():
     if request.method == "POST":
-        criterio = request.form["criterio"]
-        termino = f"%{request.form['termino']}%"
-        query = f"SELECT * FROM libros WHERE {criterio} LIKE ?"
-
-        with sqlite3.connect(DB_NAME) as conn:
-            resultados = conn.execute(query, (termino,)).fetchall()
+        # modo: "prefijo" usa los índices; "contiene" (por defecto) recorre la tabla
+        modo = request.form.get("modo", "contiene")
+        filtros = [(request.form["criterio"], modo, request.form["termino"].strip())]
+        # Filtros adicionales opcionales, p. ej. autor=...&estado=...
+        for columna in sorted(FILTRO_LIBROS.columnas_texto):
+            if columna != request.form["criterio"] and request.form.get(columna):
+                filtros.append((columna, "igual" if columna == "estado" else modo, request.form[columna].strip()))
+
+        try:
+            query, params = FILTRO_LIBROS.compilar(filtros, limite=MAX_RESULTADOS)
+        except ValueError:
+            flash("Criterio de búsqueda inválido", "danger")
+            return redirect(url_for("index"))
+
+        resultados = get_db().execute(query, params).fetchall()
 
         return render_template("search_results.html", resultados=resultados)
 
@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+# Base de datos aparte para no tocar biblioteca.db
+os.environ.setdefault("DB_NAME", os.path.join(tempfile.mkdtemp(), "carga.db"))
+
+from Problema_7 import app  # noqa: E402
+
+
+# ==========================
+# SERVIDOR WSGI CON HILOS
+# ==========================
+class ServidorConHilos(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class ManejadorSilencioso(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_servidor(puerto=0):
+    servidor = make_server("127.0.0.1", puerto, app,
+                           server_class=ServidorConHilos, handler_class=ManejadorSilencioso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+# ==========================
+# GENERADOR DE CARGA
+# ==========================
+class SinRedireccion(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args):
+        return None
+
+
+_opener = urllib.request.build_opener(SinRedireccion)
+SIN_RESPUESTA = 0  # estado anotado cuando la petición falla antes de recibir un código HTTP
+
+
+def _peticion(url, datos=None):
+    inicio = time.perf_counter()
+    try:
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos else None
+        with _opener.open(url, data=cuerpo, timeout=30) as res:
+            res.read()
+            estado = res.status
+    except urllib.error.HTTPError as e:
+        estado = e.code
+    except OSError:  # URLError, conexión reiniciada, timeout: el hilo sigue y se cuenta como error
+        estado = SIN_RESPUESTA
+    return estado, time.perf_counter() - inicio
+
+
+def lector(base, duracion, resultados):
+    fin = time.time() + duracion
+    pagina = 1
+    while time.time() < fin:
+        resultados.append(("lectura",) + _peticion(f"{base}/?pagina={pagina}"))
+        pagina = pagina % 20 + 1
+
+
+def escritor(base, duracion, resultados, id_hilo):
+    fin = time.time() + duracion
+    i = 0
+    while time.time() < fin:
+        datos = {"titulo": f"Libro {id_hilo}-{i}", "autor": f"Autor {id_hilo}",
+                 "genero": "Carga", "estado": "No leído"}
+        resultados.append(("escritura",) + _peticion(f"{base}/agregar", datos))
+        i += 1
+
+
+def resumen(tipo, filas, duracion):
+    latencias = sorted(f[2] for f in filas)
+    if not latencias:
+        print(f"  {tipo:<10} sin peticiones")
+        return
+    errores = sum(1 for f in filas if f[1] >= 500)
+    sin_respuesta = sum(1 for f in filas if f[1] == SIN_RESPUESTA)
+    p = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000
+    print(f"  {tipo:<10} {len(latencias):>7} pet. | {len(latencias) / duracion:8.1f} pet/s | "
+          f"p50 {p(0.5):6.1f} ms | p99 {p(0.99):6.1f} ms | errores 5xx: {errores} | sin respuesta: {sin_respuesta}")
+
+
+if __name__ == "__main__":
+    # Uso: python Problema_7_1.py [lectores] [escritores] [segundos]
+    lectores = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    escritores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duracion = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    servidor = iniciar_servidor()
+    base = f"http://127.0.0.1:{servidor.server_port}"
+    resultados = []
+
+    hilos = [threading.Thread(target=lector, args=(base, duracion, resultados)) for _ in range(lectores)]
+    hilos += [threading.Thread(target=escritor, args=(base, duracion, resultados, i)) for i in range(escritores)]
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+    servidor.shutdown()
+
+    print(f"📊 {lectores} lectores + {escritores} escritores durante {total:.1f}s")
+    for tipo in ("lectura", "escritura"):
+        resumen(tipo, [f for f in resultados if f[0] == tipo], total)
@@ -0,0 +1,94 @@
+# ==========================
+# CONSTRUCTOR DE FILTROS SQL
+# ==========================
+# Compila filtros de varios campos a SQL parametrizado. Solo se aceptan
+# columnas y operadores de una lista blanca, así ningún dato del usuario llega
+# al texto de la consulta. El mismo conjunto de filtros produce siempre el
+# mismo texto SQL, y sqlite3 reutiliza la sentencia preparada de su caché.
+
+ESCAPE = "\\"
+
+
+def escapar_like(valor):
+    """Escapa los comodines de LIKE para buscar el texto literal."""
+    return (str(valor).replace(ESCAPE, ESCAPE * 2)
+            .replace("%", ESCAPE + "%").replace("_", ESCAPE + "_"))
+
+
+class ConstructorConsultas:
+    """
+    Operadores:
+    - igual:     columna = ?              (texto sin distinguir mayúsculas)
+    - prefijo:   columna LIKE 'x%'        (usa un índice COLLATE NOCASE)
+    - contiene:  columna LIKE '%x%'       (siempre recorre la tabla)
+    - desde / hasta: columna >= ? / columna <= ?   (rangos)
+    """
+
+    OPERADORES = ("igual", "prefijo", "contiene", "desde", "hasta")
+
+    def __init__(self, tabla, columnas_texto=(), columnas_rango=(), seleccion="*", orden="id"):
+        self.tabla = tabla
+        self.columnas_texto = set(columnas_texto)
+        self.columnas_rango = set(columnas_rango)
+        self.seleccion = seleccion
+        self.orden = orden
+        self._cache = {}
+
+    @property
+    def columnas(self):
+        return self.columnas_texto | self.columnas_rango
+
+    def indices(self):
+        """Sentencias CREATE INDEX que permiten usar índices en igual/prefijo."""
+        return [f"CREATE INDEX IF NOT EXISTS idx_{self.tabla}_{col} ON {self.tabla} ({col} COLLATE NOCASE)"
+                for col in sorted(self.columnas_texto)]
+
+    def _condicion(self, columna, operador):
+        if columna not in self.columnas:
+            raise ValueError(f"Columna no permitida: {columna}")
+        if operador not in self.OPERADORES:
+            raise ValueError(f"Operador no permitido: {operador}")
+        if operador in ("desde", "hasta"):
+            if columna not in self.columnas_rango:
+                raise ValueError(f"La columna {columna} no admite rangos")
+            return f"{columna} {'>=' if operador == 'desde' else '<='} ?"
+        if columna not in self.columnas_texto:
+            if operador != "igual":
+                raise ValueError(f"La columna {columna} no admite búsquedas de texto")
+            return f"{columna} = ?"
+        if operador == "igual":
+            return f"{columna} = ? COLLATE NOCASE"
+        return f"{columna} LIKE ? ESCAPE '{ESCAPE}'"
+
+    def _sql(self, firma, con_limite):
+        clave = (firma, con_limite)
+        if clave not in self._cache:
+            condiciones = [self._condicion(col, op) for col, op in firma]
+            sql = f"SELECT {self.seleccion} FROM {self.tabla}"
+            if condiciones:
+                sql += " WHERE " + " AND ".join(condiciones)
+            sql += f" ORDER BY {self.orden}"
+            if con_limite:
+                sql += " LIMIT ?"
+            self._cache[clave] = sql
+        return self._cache[clave]
+
+    def compilar(self, filtros, limite=None):
+        """
+        filtros: iterable de (columna, operador, valor); los valores vacíos se ignoran.
+        Devuelve (sql, parámetros). Lanza ValueError si la columna u operador no es válido.
+        """
+        firma, params = [], []
+        for columna, operador, valor in filtros:
+            if valor is None or valor == "":
+                continue
+            firma.append((columna, operador))
+            if operador == "prefijo":
+                params.append(escapar_like(valor) + "%")
+            elif operador == "contiene":
+                params.append("%" + escapar_like(valor) + "%")
+            else:
+                params.append(valor)
+        if limite:
+            params.append(limite)
+        return self._sql(tuple(firma), bool(limite)), params
@@ -1,13 +1,75 @@
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
 import requests
 import time
 
 BASE_URL = "https://pokeapi.co/api/v2/"
+# Recursos recortados en memoria: ~1300 /pokemon + ~1000 especies + listados de un
+# recorrido de la Pokédex completa caben sin que el segundo recorrido vuelva a descargar
+CACHE_MAX = 4096
 
+_sesion = requests.Session()
 
-def get_json(url):
-    """Descarga y devuelve JSON de una URL con manejo de errores."""
+
+# -----------------------------
+# 🔹 Acceso a la API
+# -----------------------------
+
+def canonizar(url):
+    """
+    Forma única de una URL de la PokeAPI: acepta rutas relativas ("type/grass"),
+    mayúsculas, ids con ceros a la izquierda, con o sin barra final y
+    parámetros en cualquier orden.
+    """
+    partes = urlsplit(url if "://" in url else BASE_URL + url.lstrip("/"))
+    ruta = partes.path
+    prefijo = urlsplit(BASE_URL).path
+    if ruta.startswith(prefijo):
+        ruta = ruta[len(prefijo):]
+    segmentos = [s.lower() for s in ruta.split("/") if s]
+    if len(segmentos) == 2 and segmentos[1].isdigit():
+        segmentos[1] = str(int(segmentos[1]))
+    consulta = urlencode(sorted(parse_qsl(partes.query)))
+    return BASE_URL + "/".join(segmentos) + "/" + (f"?{consulta}" if consulta else "")
+
+
+def alias(url, datos):
+    """
+    Otras URLs canónicas del mismo recurso según su cuerpo: pokemon/25/ y
+    pokemon/pikachu/ devuelven el mismo JSON, así que ambas quedan en cache.
+    """
+    url = canonizar(url)
+    segmentos = url[len(BASE_URL):].rstrip("/").split("/")
+    if "?" in url or len(segmentos) != 2 or not isinstance(datos, dict):
+        return []
+    return [canonizar(f"{segmentos[0]}/{datos[c]}") for c in ("id", "name")
+            if c in datos and canonizar(f"{segmentos[0]}/{datos[c]}") != url]
+
+
+# Campos que usan los análisis; el resto (movimientos, textos, sprites...) es la
+# mayor parte de cada respuesta y no se guarda. Misma forma que el JSON original.
+CAMPOS_USADOS = {
+    "pokemon": ("id", "name", "height", "weight", "stats", "types", "species"),
+    "pokemon-species": ("id", "name", "is_legendary", "is_mythical", "evolves_from_species",
+                        "evolution_chain", "habitat"),
+}
+
+
+def recortar(url, datos):
+    """Deja solo CAMPOS_USADOS si la URL es un elemento de esos recursos; los listados quedan enteros."""
+    url = canonizar(url)
+    segmentos = url[len(BASE_URL):].rstrip("/").split("/")
+    campos = CAMPOS_USADOS.get(segmentos[0]) if len(segmentos) == 2 and "?" not in url else None
+    if not campos or not isinstance(datos, dict):
+        return datos
+    return {c: datos[c] for c in campos if c in datos}
+
+
+def _descargar(url):
     try:
-        res = requests.get(url)
+        res = _sesion.get(url)
         res.raise_for_status()
         return res.json()
     except requests.exceptions.RequestException as e:
@@ -15,6 +77,85 @@ def get_json(url):
         return None
 
 
+class SingleFlight:
+    """
+    Cache LRU + coalescencia por URL canónica. Si varios hilos piden el mismo
+    recurso a la vez, solo uno descarga y los demás esperan su resultado;
+    las repeticiones posteriores salen de memoria. Los fallos no se guardan.
+    Cada recurso ocupa una sola entrada (recortada): sus otros nombres van al
+    mapa `nombres` (alias -> URL canónica) y no cuentan para el límite.
+    """
+
+    def __init__(self, descargar, max_items=CACHE_MAX):
+        self.descargar = descargar
+        self.max_items = max_items
+        self.cache = OrderedDict()
+        self.nombres = {}
+        self.en_vuelo = {}
+        self.lock = threading.Lock()
+        self.solicitudes = self.descargas = self.aciertos = self.compartidas = 0
+
+    def _guardar(self, clave, datos):
+        self.cache[clave] = datos
+        self.cache.move_to_end(clave)
+        while len(self.cache) > self.max_items:
+            self.cache.popitem(last=False)
+
+    def get(self, url):
+        clave = canonizar(url)
+        with self.lock:
+            clave = self.nombres.get(clave, clave)
+            self.solicitudes += 1
+            if clave in self.cache:
+                self.aciertos += 1
+                self.cache.move_to_end(clave)
+                return self.cache[clave]
+            evento = self.en_vuelo.get(clave)
+            lider = evento is None
+            if lider:
+                evento = self.en_vuelo[clave] = threading.Event()
+                evento.resultado = None
+            else:
+                self.compartidas += 1
+        if not lider:
+            evento.wait()
+            return evento.resultado
+
+        try:
+            datos = self.descargar(clave)
+            evento.resultado = recortar(clave, datos) if datos is not None else None
+        finally:
+            with self.lock:
+                self.descargas += 1
+                if evento.resultado is not None:
+                    self._guardar(clave, evento.resultado)
+                    for otra in alias(clave, evento.resultado):
+                        self.nombres[otra] = clave
+                del self.en_vuelo[clave]
+            evento.set()
+        return evento.resultado
+
+    def reporte(self):
+        ahorradas = self.aciertos + self.compartidas
+        return {"solicitudes": self.solicitudes, "descargas": self.descargas,
+                "aciertos_cache": self.aciertos, "compartidas": self.compartidas,
+                "ahorradas": ahorradas,
+                "porcentaje_ahorro": round(100 * ahorradas / self.solicitudes, 1) if self.solicitudes else 0.0}
+
+
+_api = SingleFlight(_descargar)
+
+
+def get_json(url):
+    """Descarga y devuelve JSON de una URL con manejo de errores (con cache y coalescencia)."""
+    return _api.get(url)
+
+
+def reporte_peticiones():
+    """Peticiones solicitadas vs. descargadas en esta ejecución."""
+    return _api.reporte()
+
+
 # -----------------------------
 # 🔹 Clasificación por tipos
 # -----------------------------
@@ -69,14 +210,20 @@ def cadena_evolutiva(pokemon_nombre):
 
 
 def electricos_sin_evolucion():
-    """Lista Pokémon eléctricos sin evoluciones."""
+    """Lista Pokémon eléctricos cuya cadena evolutiva tiene una sola especie."""
     electric_type = get_json(f"{BASE_URL}type/electric")
     if not electric_type:
         return []
     result = []
     for p in electric_type["pokemon"]:
-        species = get_json(f"{BASE_URL}pokemon-species/{p['pokemon']['name']}")
-        if species and not species["evolves_from_species"] and not species["evolution_chain"]["url"]:
+        # La especie sale del propio Pokémon: las formas (pikachu-rock-star) no tienen especie homónima
+        poke_data = get_json(p["pokemon"]["url"])
+        species = get_json(poke_data["species"]["url"]) if poke_data else None
+        if not species or species["evolves_from_species"] or not species["evolution_chain"]:
+            continue
+        # Toda especie tiene cadena (su URL nunca está vacía): "sin evolución" es una cadena de un solo eslabón
+        evo_chain = get_json(species["evolution_chain"]["url"])
+        if evo_chain and not evo_chain["chain"]["evolves_to"]:
             result.append(p["pokemon"]["name"])
     return result
 
@@ -105,12 +252,17 @@ def mas_rapido_no_legendario():
     """Pokémon más rápido no legendario."""
     # Requiere recorrer TODA la API o filtrado especial
     url = f"{BASE_URL}pokemon?limit=10000"
+    # Para recorridos largos y reanudables ver Problema_9_1.py
     all_pokemon = get_json(url)
     max_speed = {"name": None, "value": -1}
+    if not all_pokemon:
+        return max_speed
     for p in all_pokemon["results"]:
         poke_data = get_json(p["url"])
-        species = get_json(f"{BASE_URL}pokemon-species/{poke_data['name']}")
-        if not species["is_legendary"]:
+        if not poke_data:
+            continue
+        species = get_json(poke_data["species"]["url"])
+        if species and not species["is_legendary"]:
             speed_stat = next(stat["base_stat"] for stat in poke_data["stats"] if stat["stat"]["name"] == "speed")
             if speed_stat > max_speed["value"]:
                 max_speed = {"name": poke_data["name"], "value": speed_stat}
@@ -138,6 +290,8 @@ def pokemon_menor_peso():
     url = f"{BASE_URL}pokemon?limit=10000"
     all_pokemon = get_json(url)
     min_weight = {"name": None, "value": float("inf")}
+    if not all_pokemon:
+        return min_weight
     for p in all_pokemon["results"]:
         poke_data = get_json(p["url"])
         if poke_data and poke_data["weight"] < min_weight["value"]:
@@ -155,3 +309,6 @@ if __name__ == "__main__":
     print("💨 Más rápido no legendario:", mas_rapido_no_legendario())
     print("🍃 Hábitat más común planta:", habitat_mas_comun_planta())
     print("⚖️ Pokémon más ligero:", pokemon_menor_peso())
+    r = reporte_peticiones()
+    print(f"📉 {r['solicitudes']} peticiones pedidas, {r['descargas']} descargadas, "
+          f"{r['ahorradas']} ahorradas ({r['porcentaje_ahorro']}%)")
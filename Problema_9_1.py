@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from Problema_9 import BASE_URL, alias, canonizar
+
+REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+# ==========================
+# RESÚMENES POR RECURSO
+# ==========================
+# El checkpoint guarda solo lo que usan los análisis; un /pokemon completo
+# pesa cientos de KB por los movimientos y la Pokédex entera no cabría en disco.
+def resumen_pokemon(datos):
+    return {"name": datos["name"], "height": datos["height"], "weight": datos["weight"],
+            "stats": {s["stat"]["name"]: s["base_stat"] for s in datos["stats"]},
+            "types": [t["type"]["name"] for t in datos["types"]],
+            "species": datos["species"]["url"]}
+
+
+def resumen_especie(datos):
+    return {"name": datos["name"], "is_legendary": datos["is_legendary"],
+            "is_mythical": datos["is_mythical"],
+            "evolves_from_species": (datos["evolves_from_species"] or {}).get("name"),
+            "evolution_chain": (datos["evolution_chain"] or {}).get("url"),
+            "habitat": (datos["habitat"] or {}).get("name")}
+
+
+RESUMENES = {"pokemon": resumen_pokemon, "pokemon-species": resumen_especie}
+
+
+def resumir(url, datos):
+    """Aplica el resumen del recurso si la URL apunta a un elemento; los listados se guardan tal cual."""
+    partes = urlsplit(url).path.rstrip("/").split("/")
+    if len(partes) >= 2 and partes[-2] in RESUMENES:
+        return RESUMENES[partes[-2]](datos)
+    return datos
+
+
+def aprender_nombres(datos, destino):
+    """
+    Registra en `destino` nombre -> URL canónica para cada {"name", "url"} de un
+    listado: después de bajar type/fire, pedir pokemon/charmander reutiliza
+    pokemon/4/ en lugar de descargarlo otra vez bajo otro nombre.
+    """
+    pendientes = [datos]
+    while pendientes:
+        x = pendientes.pop()
+        if isinstance(x, list):
+            pendientes.extend(x)
+        elif isinstance(x, dict):
+            if x.keys() == {"name", "url"} and str(x["url"]).startswith(BASE_URL):
+                url = canonizar(x["url"])
+                nombre = canonizar(f"{url[len(BASE_URL):].split('/')[0]}/{x['name']}")
+                if nombre != url:
+                    destino[nombre] = url
+            else:
+                pendientes.extend(x.values())
+
+
+# ==========================
+# LIMITADOR DE TASA
+# ==========================
+class TokenBucket:
+    """
+    Cubeta de fichas: admite ráfagas de hasta `capacidad` peticiones y luego
+    limita a `tasa` por segundo. El lock hace que los que esperan salgan en orden.
+    """
+
+    def __init__(self, tasa, capacidad=None):
+        self.tasa = tasa
+        self.capacidad = capacidad or max(1, int(tasa))
+        self.fichas = float(self.capacidad)
+        self.ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def adquirir(self):
+        async with self._lock:
+            while True:
+                ahora = time.monotonic()
+                self.fichas = min(self.capacidad, self.fichas + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                await asyncio.sleep((1 - self.fichas) / self.tasa)
+
+
+# ==========================
+# CHECKPOINT EN DISCO
+# ==========================
+class Checkpoint:
+    """
+    Registro NDJSON de url canónica -> resumen (más sus alias). Cada respuesta se anexa y se vacía al
+    disco al llegar, así un corte (Ctrl+C, caída de red) pierde a lo sumo la
+    línea en curso. Las descargas fallidas no se anotan y se reintentan al reanudar.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.datos = {}
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        continue  # última línea a medio escribir
+                    for url in [registro["url"], *registro.get("alias", [])]:
+                        self.datos[url] = registro["valor"]
+        self._archivo = open(ruta, "a", encoding="utf-8")
+
+    def __contains__(self, url):
+        return url in self.datos
+
+    def get(self, url):
+        return self.datos.get(url)
+
+    def guardar(self, url, valor, alias=()):
+        for clave in [url, *alias]:
+            self.datos[clave] = valor
+        registro = {"url": url, "valor": valor, "alias": list(alias)} if alias else {"url": url, "valor": valor}
+        self._archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+# ==========================
+# ESTADÍSTICAS
+# ==========================
+class Estadisticas:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.solicitudes = 0
+        self.peticiones = 0
+        self.aciertos_cache = 0
+        self.compartidas = 0
+        self.reintentos = 0
+        self.errores = 0
+
+    def resumen(self):
+        transcurrido = time.perf_counter() - self.inicio
+        ahorradas = self.aciertos_cache + self.compartidas
+        return {"solicitudes": self.solicitudes, "peticiones": self.peticiones,
+                "peticiones_por_segundo": round(self.peticiones / transcurrido, 1) if transcurrido else 0.0,
+                "aciertos_cache": self.aciertos_cache, "compartidas": self.compartidas,
+                "ratio_cache": round(self.aciertos_cache / self.solicitudes, 3) if self.solicitudes else 0.0,
+                "ahorradas": ahorradas,
+                "reintentos": self.reintentos, "errores": self.errores,
+                "segundos": round(transcurrido, 2)}
+
+    def __str__(self):
+        r = self.resumen()
+        return (f"{r['peticiones']} peticiones ({r['peticiones_por_segundo']}/s) | "
+                f"cache {r['aciertos_cache']} ({r['ratio_cache']:.0%}) | compartidas {r['compartidas']} | "
+                f"reintentos {r['reintentos']} | errores {r['errores']} | {r['segundos']}s")
+
+
+# ==========================
+# CRAWLER ASÍNCRONO
+# ==========================
+class Crawler:
+    """
+    Descargas concurrentes contra la PokeAPI con:
+    - a lo sumo `concurrencia` peticiones en vuelo,
+    - a lo sumo `tasa` peticiones por segundo (TokenBucket),
+    - reintentos con backoff exponencial y jitter ante 429/5xx y errores de red
+      (respeta Retry-After),
+    - checkpoint opcional en disco para reanudar un recorrido interrumpido,
+    - single-flight por URL canónica: pedidos simultáneos del mismo recurso
+      esperan la misma descarga en vez de lanzar otra.
+    Un recurso que falla definitivamente devuelve None en vez de abortar el recorrido.
+    """
+
+    def __init__(self, tasa=20, concurrencia=10, reintentos=5, timeout=30, checkpoint=None):
+        self.bucket = TokenBucket(tasa)
+        self.concurrencia = concurrencia
+        self.reintentos = reintentos
+        self.timeout = timeout
+        self.checkpoint = Checkpoint(checkpoint) if checkpoint else None
+        self.memoria = {}
+        self._en_vuelo = {}
+        self.nombres = {}
+        if self.checkpoint:
+            for valor in self.checkpoint.datos.values():
+                aprender_nombres(valor, self.nombres)
+        self.stats = Estadisticas()
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        self._sesion = None
+
+    async def __aenter__(self):
+        self._sesion = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrencia))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._sesion.close()
+        if self.checkpoint:
+            self.checkpoint.cerrar()
+
+    def _en_cache(self, url):
+        if url in self.memoria:
+            return True
+        if self.checkpoint and url in self.checkpoint:
+            self.memoria[url] = self.checkpoint.get(url)
+            return True
+        return False
+
+    async def _descargar(self, url):
+        for intento in range(self.reintentos + 1):
+            espera = min(30.0, 0.5 * 2 ** intento) * random.uniform(0.5, 1.0)
+            try:
+                async with self._semaforo:
+                    await self.bucket.adquirir()
+                    self.stats.peticiones += 1
+                    async with self._sesion.get(url) as res:
+                        if res.status < 400:
+                            return await res.json()
+                        if res.status not in REINTENTABLES:
+                            print(f"❌ {url}: HTTP {res.status}")
+                            break
+                        if res.headers.get("Retry-After", "").isdigit():
+                            espera = float(res.headers["Retry-After"])
+                        motivo = f"HTTP {res.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                motivo = repr(e)
+            if intento < self.reintentos:
+                self.stats.reintentos += 1
+                await asyncio.sleep(espera)
+        else:
+            print(f"❌ {url}: {motivo} tras {self.reintentos} reintentos")
+        self.stats.errores += 1
+        return None
+
+    async def _descargar_y_guardar(self, url):
+        datos = await self._descargar(url)
+        if datos is None:
+            return None
+        valor = resumir(url, datos)
+        if valor is datos:
+            aprender_nombres(datos, self.nombres)
+        otras = alias(url, datos)
+        for clave in [url, *otras]:
+            self.memoria[clave] = valor
+        if self.checkpoint:
+            self.checkpoint.guardar(url, valor, otras)
+        return valor
+
+    async def obtener(self, url):
+        """Resumen del recurso en `url` (ver RESUMENES) o None si no se pudo descargar."""
+        url = canonizar(url)
+        url = self.nombres.get(url, url)
+        self.stats.solicitudes += 1
+        if self._en_cache(url):
+            self.stats.aciertos_cache += 1
+            return self.memoria[url]
+        tarea = self._en_vuelo.get(url)
+        if tarea is None:
+            tarea = self._en_vuelo[url] = asyncio.ensure_future(self._descargar_y_guardar(url))
+            tarea.add_done_callback(lambda _: self._en_vuelo.pop(url, None))
+        else:
+            self.stats.compartidas += 1
+        # shield: cancelar a quien espera no debe cancelar la descarga que otros comparten
+        return await asyncio.shield(tarea)
+
+    async def mapear(self, urls, progreso=200):
+        """Descarga todas las URLs concurrentemente; devuelve {url: valor} en el orden recibido, sin las fallidas."""
+        urls = list(dict.fromkeys(canonizar(url) for url in urls))
+        resultados = {}
+        hechos = 0
+
+        async def uno(url):
+            nonlocal hechos
+            resultados[url] = await self.obtener(url)
+            hechos += 1
+            if progreso and hechos % progreso == 0:
+                print(f"⏳ {hechos}/{len(urls)} | {self.stats}")
+
+        await asyncio.gather(*(uno(url) for url in urls))
+        return {url: resultados[url] for url in urls if resultados[url] is not None}
+
+
+# ==========================
+# RECORRIDOS DE LA POKÉDEX COMPLETA
+# ==========================
+async def todos_los_pokemon(crawler):
+    listado = await crawler.obtener(f"{BASE_URL}pokemon?limit=10000")
+    if not listado:
+        return {}
+    return await crawler.mapear(p["url"] for p in listado["results"])
+
+
+async def mas_rapido_no_legendario(crawler, pokemon=None):
+    """Igual que en Problema_9, pero la especie se toma de la URL del propio Pokémon (las formas no tienen especie homónima)."""
+    pokemon = pokemon if pokemon is not None else await todos_los_pokemon(crawler)
+    especies = await crawler.mapear(p["species"] for p in pokemon.values())
+    max_speed = {"name": None, "value": -1}
+    for p in pokemon.values():
+        especie = especies.get(p["species"])
+        if especie and not especie["is_legendary"] and p["stats"]["speed"] > max_speed["value"]:
+            max_speed = {"name": p["name"], "value": p["stats"]["speed"]}
+    return max_speed
+
+
+async def pokemon_menor_peso(crawler, pokemon=None):
+    pokemon = pokemon if pokemon is not None else await todos_los_pokemon(crawler)
+    min_weight = {"name": None, "value": float("inf")}
+    for p in pokemon.values():
+        if p["weight"] < min_weight["value"]:
+            min_weight = {"name": p["name"], "value": p["weight"]}
+    return min_weight
+
+
+async def main(args):
+    async with Crawler(tasa=args.tasa, concurrencia=args.concurrencia,
+                       reintentos=args.reintentos, checkpoint=args.checkpoint) as crawler:
+        pokemon = await todos_los_pokemon(crawler)
+        print(f"📦 {len(pokemon)} Pokémon descargados")
+        print("💨 Más rápido no legendario:", await mas_rapido_no_legendario(crawler, pokemon))
+        print("⚖️ Pokémon más ligero:", await pokemon_menor_peso(crawler, pokemon))
+        print(f"📊 {crawler.stats}")
+        print(f"📉 {crawler.stats.resumen()['ahorradas']} peticiones ahorradas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recorridos de toda la PokeAPI con límite de tasa y checkpoint")
+    parser.add_argument("--tasa", type=float, default=20, help="peticiones por segundo")
+    parser.add_argument("--concurrencia", type=int, default=10, help="peticiones en vuelo a la vez")
+    parser.add_argument("--reintentos", type=int, default=5)
+    parser.add_argument("--checkpoint", default="pokeapi_checkpoint.ndjson",
+                        help="archivo de progreso; se reanuda desde él si existe")
+    parser.add_argument("--reiniciar", action="store_true", help="descarta el checkpoint y empieza de cero")
+    args = parser.parse_args()
+    if args.reiniciar and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print(f"\n⏸️ Interrumpido; el progreso quedó en {args.checkpoint}")
@@ -0,0 +1,314 @@
+import argparse
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+
+from Problema_9 import BASE_URL, canonizar
+from Problema_9_1 import Crawler
+
+
+# ==========================
+# REPORTES
+# ==========================
+class Reporte(ABC):
+    """
+    Un análisis de Problema_9 partido en plan + cálculo. El runner pide a cada
+    reporte qué recursos necesita en cada nivel (listados -> pokemon ->
+    especies -> cadenas), descarga la unión una sola vez y luego recorre los
+    Pokémon una vez, pasándole a `observar` solo los que el reporte planeó.
+    """
+
+    def listados(self):
+        return []
+
+    def pokemon(self, ctx):
+        return []
+
+    def especies(self, ctx):
+        return []
+
+    def cadenas(self, ctx):
+        return []
+
+    def observar(self, url, pokemon, ctx):
+        pass
+
+    @abstractmethod
+    def resultado(self, ctx):
+        """Texto final del reporte, con lo observado en la pasada."""
+
+
+class Contexto:
+    def __init__(self):
+        self.listados = {}
+        self.pokemon = {}
+        self.especies = {}
+        self.cadenas = {}
+
+    def especie_de(self, pokemon):
+        return self.especies.get(canonizar(pokemon["species"]))
+
+
+def _mejor(actual, nombre, valor, orden, mayor=True):
+    """Conserva el primero en el orden del plan ante empates, como el recorrido secuencial."""
+    clave = (valor if mayor else -valor, -orden)
+    if actual is None or clave > actual[0]:
+        return clave, {"name": nombre, "value": valor}
+    return actual
+
+
+class TipoEnRegion(Reporte):
+    def __init__(self, tipo, region):
+        self.tipo, self.region = canonizar(f"type/{tipo}"), canonizar(f"pokedex/{region}")
+
+    def listados(self):
+        return [self.region, self.tipo]
+
+    def resultado(self, ctx):
+        region, tipo = ctx.listados.get(self.region), ctx.listados.get(self.tipo)
+        if not region or not tipo:
+            return []
+        entries = {p["pokemon_species"]["name"] for p in region["pokemon_entries"]}
+        return sorted(entries & {p["pokemon"]["name"] for p in tipo["pokemon"]})
+
+
+class TipoAltura(Reporte):
+    def __init__(self, tipo, altura_min):
+        self.tipo, self.altura_min = canonizar(f"type/{tipo}"), altura_min
+        self.encontrados = {}
+
+    def listados(self):
+        return [self.tipo]
+
+    def pokemon(self, ctx):
+        tipo = ctx.listados.get(self.tipo)
+        self.urls = [canonizar(p["pokemon"]["url"]) for p in tipo["pokemon"]] if tipo else []
+        return self.urls
+
+    def observar(self, url, pokemon, ctx):
+        if pokemon["height"] > self.altura_min:
+            self.encontrados[url] = pokemon["name"]
+
+    def resultado(self, ctx):
+        return [self.encontrados[url] for url in self.urls if url in self.encontrados]
+
+
+class CadenaEvolutiva(Reporte):
+    def __init__(self, nombre):
+        self.especie = canonizar(f"pokemon-species/{nombre}")
+
+    def listados(self):
+        return [self.especie]
+
+    def cadenas(self, ctx):
+        especie = ctx.listados.get(self.especie)
+        return [especie["evolution_chain"]] if especie and especie["evolution_chain"] else []
+
+    def resultado(self, ctx):
+        cadena = next((ctx.cadenas.get(canonizar(url)) for url in self.cadenas(ctx)), None)
+        if not cadena:
+            return []
+
+        def recorrer_cadena(chain):
+            result = [chain["species"]["name"]]
+            for evo in chain["evolves_to"]:
+                result.extend(recorrer_cadena(evo))
+            return result
+
+        return recorrer_cadena(cadena["chain"])
+
+
+class SinEvolucion(Reporte):
+    """Pokémon de un tipo cuya cadena evolutiva tiene una sola especie."""
+
+    def __init__(self, tipo):
+        self.tipo = canonizar(f"type/{tipo}")
+        self.encontrados = {}
+
+    def listados(self):
+        return [self.tipo]
+
+    def pokemon(self, ctx):
+        tipo = ctx.listados.get(self.tipo)
+        self.urls = [canonizar(p["pokemon"]["url"]) for p in tipo["pokemon"]] if tipo else []
+        return self.urls
+
+    def especies(self, ctx):
+        return [ctx.pokemon[url]["species"] for url in self.urls if url in ctx.pokemon]
+
+    def cadenas(self, ctx):
+        especies = (ctx.especie_de(ctx.pokemon[url]) for url in self.urls if url in ctx.pokemon)
+        return [e["evolution_chain"] for e in especies if e and e["evolution_chain"]]
+
+    def observar(self, url, pokemon, ctx):
+        especie = ctx.especie_de(pokemon)
+        if not especie or especie["evolves_from_species"] or not especie["evolution_chain"]:
+            return
+        cadena = ctx.cadenas.get(canonizar(especie["evolution_chain"]))
+        if cadena and not cadena["chain"]["evolves_to"]:
+            self.encontrados[url] = pokemon["name"]
+
+    def resultado(self, ctx):
+        return [self.encontrados[url] for url in self.urls if url in self.encontrados]
+
+
+class MayorStatRegion(Reporte):
+    def __init__(self, region, stat="attack"):
+        self.region, self.stat = canonizar(f"pokedex/{region}"), stat
+        self.mejor = None
+
+    def listados(self):
+        return [self.region]
+
+    def pokemon(self, ctx):
+        region = ctx.listados.get(self.region)
+        urls = [canonizar(f"pokemon/{e['pokemon_species']['name']}") for e in region["pokemon_entries"]] if region else []
+        self.orden = {url: i for i, url in enumerate(urls)}
+        return urls
+
+    def observar(self, url, pokemon, ctx):
+        nombre = url[len(BASE_URL):].split("/")[1]  # el original reporta el nombre de la especie
+        self.mejor = _mejor(self.mejor, nombre, pokemon["stats"][self.stat], self.orden[url])
+
+    def resultado(self, ctx):
+        return self.mejor[1] if self.mejor else {"name": None, "value": -1}
+
+
+class _TodaLaPokedex(Reporte):
+    LISTADO = canonizar("pokemon?limit=10000")
+
+    def listados(self):
+        return [self.LISTADO]
+
+    def pokemon(self, ctx):
+        listado = ctx.listados.get(self.LISTADO)
+        urls = [canonizar(p["url"]) for p in listado["results"]] if listado else []
+        self.orden = {url: i for i, url in enumerate(urls)}
+        return urls
+
+
+class MasRapidoNoLegendario(_TodaLaPokedex):
+    def __init__(self):
+        self.mejor = None
+
+    def especies(self, ctx):
+        return [ctx.pokemon[url]["species"] for url in self.orden if url in ctx.pokemon]
+
+    def observar(self, url, pokemon, ctx):
+        especie = ctx.especie_de(pokemon)
+        if especie and not especie["is_legendary"]:
+            self.mejor = _mejor(self.mejor, pokemon["name"], pokemon["stats"]["speed"], self.orden[url])
+
+    def resultado(self, ctx):
+        return self.mejor[1] if self.mejor else {"name": None, "value": -1}
+
+
+class MenorPeso(_TodaLaPokedex):
+    def __init__(self):
+        self.mejor = None
+
+    def observar(self, url, pokemon, ctx):
+        self.mejor = _mejor(self.mejor, pokemon["name"], pokemon["weight"], self.orden[url], mayor=False)
+
+    def resultado(self, ctx):
+        return self.mejor[1] if self.mejor else {"name": None, "value": float("inf")}
+
+
+class HabitatMasComun(Reporte):
+    def __init__(self, tipo):
+        self.tipo = canonizar(f"type/{tipo}")
+        self.habitats = {}
+
+    def listados(self):
+        return [self.tipo]
+
+    def pokemon(self, ctx):
+        tipo = ctx.listados.get(self.tipo)
+        self.urls = [canonizar(p["pokemon"]["url"]) for p in tipo["pokemon"]] if tipo else []
+        return self.urls
+
+    def especies(self, ctx):
+        return [ctx.pokemon[url]["species"] for url in self.urls if url in ctx.pokemon]
+
+    def observar(self, url, pokemon, ctx):
+        especie = ctx.especie_de(pokemon)
+        if especie and especie["habitat"]:
+            self.habitats[especie["habitat"]] = self.habitats.get(especie["habitat"], 0) + 1
+
+    def resultado(self, ctx):
+        return max(self.habitats, key=self.habitats.get) if self.habitats else None
+
+
+# Los mismos ocho análisis que el __main__ de Problema_9
+REPORTES = {
+    "fuego_kanto": lambda: TipoEnRegion("fire", "kanto"),
+    "agua_altura": lambda: TipoAltura("water", 10),
+    "evolucion_bulbasaur": lambda: CadenaEvolutiva("bulbasaur"),
+    "electricos_sin_evolucion": lambda: SinEvolucion("electric"),
+    "mayor_ataque_johto": lambda: MayorStatRegion("original-johto", "attack"),
+    "mas_rapido_no_legendario": MasRapidoNoLegendario,
+    "habitat_planta": lambda: HabitatMasComun("grass"),
+    "menor_peso": MenorPeso,
+}
+
+
+# ==========================
+# RUNNER
+# ==========================
+async def ejecutar(nombres, crawler):
+    """Planea, descarga la unión de recursos nivel por nivel y calcula todo en una pasada."""
+    reportes = {nombre: REPORTES[nombre]() for nombre in nombres}
+    ctx = Contexto()
+    fases = {}
+
+    async def fase(nombre, destino, plan):
+        inicio = time.perf_counter()
+        urls = [url for r in reportes.values() for url in plan(r)]
+        destino.update(await crawler.mapear(urls))
+        fases[nombre] = {"recursos": len(set(map(canonizar, urls))), "segundos": round(time.perf_counter() - inicio, 3)}
+
+    await fase("listados", ctx.listados, lambda r: r.listados())
+    # Pedidos por nombre (cadena evolutiva) o por URL (tipos): todos pasan por la misma cache
+    await fase("pokemon", ctx.pokemon, lambda r: r.pokemon(ctx))
+    await fase("especies", ctx.especies, lambda r: r.especies(ctx))
+    await fase("cadenas", ctx.cadenas, lambda r: r.cadenas(ctx))
+
+    inicio = time.perf_counter()
+    interesados = {}
+    for r in reportes.values():
+        for url in r.pokemon(ctx):
+            interesados.setdefault(url, []).append(r)
+    for url, pokemon in ctx.pokemon.items():
+        for r in interesados.get(url, ()):
+            r.observar(url, pokemon, ctx)
+    resultados = {nombre: r.resultado(ctx) for nombre, r in reportes.items()}
+    fases["calculo"] = {"segundos": round(time.perf_counter() - inicio, 3)}
+    return {"reportes": resultados, "fases": fases, "peticiones": crawler.stats.resumen()}
+
+
+async def main(args):
+    nombres = args.reportes.split(",") if args.reportes else list(REPORTES)
+    desconocidos = set(nombres) - set(REPORTES)
+    if desconocidos:
+        raise SystemExit(f"Reportes desconocidos: {sorted(desconocidos)}; disponibles: {list(REPORTES)}")
+    async with Crawler(tasa=args.tasa, concurrencia=args.concurrencia, checkpoint=args.checkpoint) as crawler:
+        salida = await ejecutar(nombres, crawler)
+    texto = json.dumps(salida, ensure_ascii=False, indent=2, default=str)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+        print(f"💾 Resultados guardados en {args.salida}")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Todos los análisis de Problema_9 con un solo recorrido de la API")
+    parser.add_argument("--reportes", help=f"lista separada por comas (por defecto todos): {','.join(REPORTES)}")
+    parser.add_argument("--tasa", type=float, default=20, help="peticiones por segundo")
+    parser.add_argument("--concurrencia", type=int, default=10, help="peticiones en vuelo a la vez")
+    parser.add_argument("--checkpoint", default="pokeapi_checkpoint.ndjson",
+                        help="archivo de progreso compartido con Problema_9_1.py")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    asyncio.run(main(parser.parse_args()))